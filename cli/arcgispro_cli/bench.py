@@ -0,0 +1,231 @@
+"""Benchmark suite behind ``arcgis bench``.
+
+Each case is timed (best of N, without tracing) and then run once more
+under ``tracemalloc`` for its peak Python allocation. Results can be saved
+as a baseline JSON file and later runs compared against it; a case that is
+slower or allocates more than the baseline by more than the tolerance is a
+regression.
+"""
+
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .paths import load_context_files
+
+BENCH_FORMAT = 1
+
+# Allowed relative slowdown / memory growth before a case counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Absolute slack so tiny, noisy cases don't flag regressions
+MIN_TIME_SLACK = 0.005  # seconds
+MIN_MEMORY_SLACK = 256 * 1024  # bytes
+
+
+class BenchError(Exception):
+    """Raised when a benchmark case fails or a baseline can't be used."""
+
+
+@dataclass
+class BenchResult:
+    """Best wall time and peak traced memory of one case."""
+
+    name: str
+    seconds: float
+    peak_bytes: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seconds": round(self.seconds, 6), "peakBytes": self.peak_bytes}
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str  # "seconds" or "peakBytes"
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int = 3) -> BenchResult:
+    """Time ``fn`` (best of ``repeat``) and record its peak traced memory."""
+    # Warm-up: populates .arcgispro/cache and imports command modules
+    fn()
+
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchResult(name, best, peak)
+
+
+def _invoke(args: List[str]) -> None:
+    from click.testing import CliRunner
+
+    from .cli import main
+
+    result = CliRunner().invoke(main, args)
+    if result.exit_code != 0:
+        raise BenchError(f"arcgis {' '.join(args)} exited with {result.exit_code}: {result.output.strip()[:200]}")
+
+
+def _load_without_cache(arcgispro_path: Path) -> None:
+    previous = os.environ.get("ARCGISPRO_CLI_NO_CACHE")
+    os.environ["ARCGISPRO_CLI_NO_CACHE"] = "1"
+    try:
+        dict(load_context_files(arcgispro_path))
+    finally:
+        if previous is None:
+            del os.environ["ARCGISPRO_CLI_NO_CACHE"]
+        else:
+            os.environ["ARCGISPRO_CLI_NO_CACHE"] = previous
+
+
+def _tui_tree(project_root: Path) -> None:
+    """Mount the TUI headless and expand the first map."""
+    import asyncio
+
+    from .tui.app import ArcGISProCLIApp
+    from .tui.panels.project_tree import ProjectTree
+
+    async def run() -> None:
+        app = ArcGISProCLIApp(repo_path=str(project_root), show_banner=False, watch=False)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            tree = app.query_one(ProjectTree)
+            if tree.root.children:
+                tree.root.children[0].expand()
+                await pilot.pause()
+
+    asyncio.run(run())
+
+
+def bench_cases(arcgispro_path: Path) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the benchmark cases for an export.
+
+    Covers context loading (with and without the parse cache), every query
+    command, ``status``, and TUI tree construction.
+    """
+    project_root = arcgispro_path.parent
+    path_args = ["--path", str(project_root)]
+
+    context = load_context_files(arcgispro_path)
+    maps = context.get("maps") or []
+    layers = context.get("layers") or []
+    map_name = maps[0].get("name") if maps else None
+    layer_name = layers[len(layers) // 2].get("name") if layers else None
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "load_context_files": lambda: dict(load_context_files(arcgispro_path)),
+        "load_context_files (no cache)": lambda: _load_without_cache(arcgispro_path),
+    }
+
+    commands = [["project"], ["maps"], ["layers"], ["tables"], ["connections"], ["status"]]
+    if map_name:
+        commands.insert(2, ["map", map_name])
+    if layer_name:
+        commands.insert(-3, ["layer", layer_name])
+        commands.insert(-3, ["fields", layer_name])
+    for args in commands:
+        name = f"arcgis {args[0]}"
+        cases[name] = lambda args=args: _invoke(args + path_args)
+        if args[0] in ("layers", "tables"):
+            cases[f"{name} --json"] = lambda args=args: _invoke(args + path_args + ["--json"])
+
+    cases["tui tree"] = lambda: _tui_tree(project_root)
+    return cases
+
+
+def run_benchmarks(arcgispro_path: Path, repeat: int = 3, only: Optional[List[str]] = None,
+                   progress: Optional[Callable[[str], None]] = None) -> List[BenchResult]:
+    """
+    Run the benchmark cases against an export.
+
+    Args:
+        arcgispro_path: The .arcgispro folder to benchmark
+        repeat: Timed runs per case (the best is kept)
+        only: Substrings; when given, only matching case names run
+        progress: Called with each case name before it runs
+
+    Returns:
+        One BenchResult per case, in run order
+    """
+    # Measure the direct code paths, never a running `arcgis serve`, and
+    # keep benchmark runs out of the export's metrics ring
+    flags = ("ARCGISPRO_CLI_NO_DAEMON", "ARCGISPRO_CLI_NO_METRICS")
+    previous = {flag: os.environ.get(flag) for flag in flags}
+    os.environ.update({flag: "1" for flag in flags})
+    try:
+        results = []
+        for name, fn in bench_cases(arcgispro_path).items():
+            if only and not any(part in name for part in only):
+                continue
+            if progress:
+                progress(name)
+            results.append(measure(name, fn, repeat))
+        return results
+    finally:
+        for flag, value in previous.items():
+            if value is None:
+                del os.environ[flag]
+            else:
+                os.environ[flag] = value
+
+
+def results_to_baseline(results: List[BenchResult], spec: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Serialize results in the baseline file format."""
+    return {
+        "format": BENCH_FORMAT,
+        "spec": spec,
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "results": {r.name: r.to_dict() for r in results},
+    }
+
+
+def compare_to_baseline(results: List[BenchResult], baseline: Dict[str, Any],
+                        spec: Optional[Dict[str, Any]], tolerance: float = DEFAULT_TOLERANCE) -> List[Regression]:
+    """
+    Return the cases that regressed against ``baseline``.
+
+    Cases missing from the baseline are ignored.
+
+    Raises:
+        BenchError: If the baseline has another format or export size.
+    """
+    if baseline.get("format") != BENCH_FORMAT:
+        raise BenchError("Baseline was written by an incompatible version of arcgis bench")
+    if baseline.get("spec") != spec:
+        raise BenchError("Baseline was recorded for a different export size")
+
+    regressions = []
+    recorded = baseline.get("results") or {}
+    for result in results:
+        base = recorded.get(result.name)
+        if not base:
+            continue
+        if (result.seconds > base["seconds"] * (1 + tolerance)
+                and result.seconds - base["seconds"] > MIN_TIME_SLACK):
+            regressions.append(Regression(result.name, "seconds", base["seconds"], result.seconds))
+        if (result.peak_bytes > base["peakBytes"] * (1 + tolerance)
+                and result.peak_bytes - base["peakBytes"] > MIN_MEMORY_SLACK):
+            regressions.append(Regression(result.name, "peakBytes", base["peakBytes"], result.peak_bytes))
+    return regressions
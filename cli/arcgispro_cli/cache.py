@@ -0,0 +1,196 @@
+"""Persistent binary cache for parsed context files.
+
+Parsing ``layers.json`` dominates the runtime of most query commands on large
+projects. The parsed value of each context file is pickled under
+``.arcgispro/cache/`` together with a stamp of the source file (mtime, size
+and SHA-256). A matching mtime + size is a cache hit without reading the
+source; if only the mtime changed, the hash decides. A Snapshot from
+ProExporter rewrites (or deletes) the context files, which changes the stamp
+and invalidates the entry automatically.
+
+Set ``ARCGISPRO_CLI_NO_CACHE=1`` to bypass the cache entirely.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from .metrics import count
+from .profiling import profiled, span
+
+# Bump when the on-disk layout of cache entries changes.
+CACHE_FORMAT = 1
+
+CACHE_DIRNAME = "cache"
+
+
+def get_cache_folder(arcgispro_path: Path) -> Path:
+    """Get the cache subfolder path."""
+    return arcgispro_path / CACHE_DIRNAME
+
+
+def cache_enabled() -> bool:
+    """Return False when ARCGISPRO_CLI_NO_CACHE is set to a truthy value."""
+    value = os.getenv("ARCGISPRO_CLI_NO_CACHE")
+    if not value:
+        return True
+    return value.strip().lower() in {"0", "false", "no", ""}
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for a file, or None if it cannot be stat'ed."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def cache_entry_path(arcgispro_path: Path, source: Path) -> Path:
+    """Map a source file to its cache entry, e.g. context/layers.json -> context.layers.json.pickle."""
+    try:
+        rel = source.relative_to(arcgispro_path).as_posix()
+    except ValueError:
+        rel = hashlib.sha1(str(source).encode("utf-8")).hexdigest()
+    return get_cache_folder(arcgispro_path) / (rel.replace("/", ".") + ".pickle")
+
+
+@profiled("parse json")
+def _parse(raw: bytes) -> Optional[Any]:
+    try:
+        return json.loads(raw.decode("utf-8-sig"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def _read_entry(entry: Path):
+    """Return (header, file) with the file positioned at the pickled value."""
+    f = open(entry, "rb")
+    try:
+        header = pickle.load(f)
+    except Exception:
+        f.close()
+        raise
+    return header, f
+
+
+# Returned by read_entry when an entry is missing, unreadable or stale.
+MISS = object()
+
+
+def read_entry(entry: Path, header: tuple) -> Any:
+    """Return the value of a cache entry whose header equals ``header``, else MISS."""
+    try:
+        stored, f = _read_entry(entry)
+        with f:
+            if stored == header:
+                return pickle.load(f)
+    except Exception:
+        pass
+    return MISS
+
+
+def write_entry(entry: Path, header: tuple, value: Any) -> None:
+    """Atomically write a cache entry; failures (read-only share, etc.) are ignored."""
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(entry.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    except OSError:
+        pass
+
+
+def has_fresh_entry(arcgispro_path: Path, source: Path, use_cache: bool = True) -> bool:
+    """Whether ``load_cached_json`` would be served from the cache without reading ``source``."""
+    stamp = file_stamp(source)
+    if stamp is None or not use_cache or not cache_enabled():
+        return False
+    try:
+        header, f = _read_entry(cache_entry_path(arcgispro_path, source))
+        f.close()
+    except Exception:
+        return False
+    return header[:4] == (CACHE_FORMAT, str(source), stamp[0], stamp[1])
+
+
+def load_cached_json(arcgispro_path: Path, source: Path, use_cache: bool = True) -> Optional[Any]:
+    """
+    Load a JSON file through the binary cache.
+
+    Behaves like ``paths.load_json_file``: returns None when the file is
+    missing or not valid JSON.
+
+    Args:
+        arcgispro_path: Path to .arcgispro folder (owner of the cache folder)
+        source: Path to the JSON file
+        use_cache: False to parse the file without reading or writing
+            cache entries (as with ARCGISPRO_CLI_NO_CACHE)
+
+    Returns:
+        Parsed JSON, or None if file doesn't exist or is invalid.
+    """
+    stamp = file_stamp(source)
+    if stamp is None:
+        return None
+
+    if not use_cache or not cache_enabled():
+        try:
+            raw = source.read_bytes()
+        except OSError:
+            return None
+        count("cacheMisses")
+        count("bytesRead", len(raw))
+        return _parse(raw)
+
+    entry = cache_entry_path(arcgispro_path, source)
+    header = None
+    try:
+        header, f = _read_entry(entry)
+        with f:
+            if header[:4] == (CACHE_FORMAT, str(source), stamp[0], stamp[1]):
+                with span("cache read"):
+                    value = pickle.load(f)
+                count("cacheHits")
+                count("bytesRead", f.tell())
+                return value
+    except Exception:
+        header = None
+
+    try:
+        raw = source.read_bytes()
+    except OSError:
+        return None
+    count("bytesRead", len(raw))
+    digest = hashlib.sha256(raw).hexdigest()
+
+    # Touched but unchanged (e.g. copied or re-synced): reuse the cached value
+    if header is not None and header[:2] == (CACHE_FORMAT, str(source)) and header[3:] == (stamp[1], digest):
+        try:
+            _, f = _read_entry(entry)
+            with f:
+                value = pickle.load(f)
+            count("cacheHits")
+        except Exception:
+            count("cacheMisses")
+            value = _parse(raw)
+    else:
+        count("cacheMisses")
+        value = _parse(raw)
+
+    if value is not None:
+        write_entry(entry, (CACHE_FORMAT, str(source), stamp[0], stamp[1], digest), value)
+    return value
@@ -0,0 +1,210 @@
+"""Parallel .aprx discovery with an incrementally refreshed catalog.
+
+``scan_aprx`` walks a folder tree with ``os.scandir`` on a thread pool
+(one task per directory), honouring a depth limit, ignore patterns for
+folder names and an overall timeout.
+
+With a catalog, each visited directory's listing (its mtime, the .aprx
+files in it with size and mtime, and its subfolder names) is saved in the
+per-user cache folder. On the next scan a directory whose mtime is
+unchanged is not listed again: one ``stat`` replaces the ``scandir`` and
+the remembered files and subfolders are reused. Adding, removing or
+renaming an entry changes the mtime of the directory holding it, so those
+changes are picked up.
+"""
+
+import fnmatch
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CATALOG_FILENAME = "aprx-catalog.json"
+CATALOG_FORMAT = 1
+
+# Roots remembered in the catalog (most recently scanned win)
+CATALOG_ROOTS = 16
+
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_WORKERS = 16
+
+# Folder names never descended into: hidden folders, and folders that hold
+# many files but never a project (geodatabases, Pro's per-project caches)
+DEFAULT_IGNORE = (".*", "*.gdb", "__pycache__", "node_modules", "ImportLog", "GpMessages", "Index")
+
+
+@dataclass
+class AprxFile:
+    path: Path
+    size: int
+    mtime: float
+
+
+@dataclass
+class ScanResult:
+    """Outcome of ``scan_aprx``."""
+
+    files: List[AprxFile] = field(default_factory=list)
+    scanned: int = 0  # directories listed with scandir
+    reused: int = 0  # directories taken from the catalog after one stat
+    complete: bool = True  # False when the timeout stopped the walk
+
+    @property
+    def paths(self) -> List[Path]:
+        return [f.path for f in self.files]
+
+
+def _ignored(name: str, ignore: Iterable[str]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in ignore)
+
+
+def _list_dir(path: str) -> Tuple[int, List[list], List[str]]:
+    """Return (mtime_ns, [[name, size, mtime]] of .aprx files, subfolder names)."""
+    mtime = os.stat(path).st_mtime_ns
+    files: List[list] = []
+    subdirs: List[str] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.name.lower().endswith(".aprx") and entry.is_file():
+                    st = entry.stat()
+                    files.append([entry.name, st.st_size, st.st_mtime])
+            except OSError:
+                continue
+    return mtime, files, subdirs
+
+
+def _visit(path: str, previous: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """Return a directory's listing and whether it came from the catalog."""
+    if previous is not None:
+        if os.stat(path).st_mtime_ns == previous.get("mtime"):
+            return previous, True
+    mtime, files, subdirs = _list_dir(path)
+    return {"mtime": mtime, "files": files, "subdirs": subdirs}, False
+
+
+def scan_aprx(
+    root: Path,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    ignore: Iterable[str] = DEFAULT_IGNORE,
+    timeout: Optional[float] = None,
+    workers: int = DEFAULT_WORKERS,
+    use_catalog: bool = False,
+) -> ScanResult:
+    """
+    Find .aprx files under ``root``.
+
+    Args:
+        root: Folder to search
+        max_depth: Subfolder levels below ``root`` to descend into
+        ignore: fnmatch patterns for folder names to skip
+        timeout: Seconds after which the walk stops (results are partial)
+        workers: Directory listing threads
+        use_catalog: Reuse and update the persistent catalog
+
+    Returns:
+        ScanResult with the files sorted by path
+    """
+    root = Path(root).absolute()
+    ignore = tuple(ignore)
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    catalog = _load_catalog() if use_catalog else {}
+    root_key = os.path.normcase(str(root))
+    known: Dict[str, Dict[str, Any]] = (catalog.get(root_key) or {}).get("dirs") or {}
+    visited: Dict[str, Dict[str, Any]] = {}
+    result = ScanResult()
+
+    pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="arcgis-scan")
+    try:
+        pending = {pool.submit(_visit, str(root), known.get(".")): (".", 0)}
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                result.complete = False
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel, depth = pending.pop(future)
+                try:
+                    listing, reused = future.result()
+                except OSError:
+                    continue
+                visited[rel] = listing
+                if reused:
+                    result.reused += 1
+                else:
+                    result.scanned += 1
+                folder = root if rel == "." else root / rel
+                for name, size, mtime in listing["files"]:
+                    result.files.append(AprxFile(folder / name, size, mtime))
+                if depth >= max_depth:
+                    continue
+                for name in listing["subdirs"]:
+                    if _ignored(name, ignore):
+                        continue
+                    child = name if rel == "." else f"{rel}/{name}"
+                    pending[pool.submit(_visit, str(folder / name), known.get(child))] = (child, depth + 1)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    result.files.sort(key=lambda f: str(f.path).lower())
+    if use_catalog:
+        # A partial walk keeps the old listings of the folders it didn't reach
+        dirs = visited if result.complete else {**known, **visited}
+        _save_catalog(catalog, root_key, dirs)
+    return result
+
+
+def get_catalog_path() -> Path:
+    from .paths import get_user_cache_folder
+
+    return get_user_cache_folder() / CATALOG_FILENAME
+
+
+def _load_catalog() -> Dict[str, Any]:
+    from .cache import cache_enabled
+
+    if not cache_enabled():
+        return {}
+    try:
+        with open(get_catalog_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != CATALOG_FORMAT:
+        return {}
+    roots = data.get("roots")
+    return roots if isinstance(roots, dict) else {}
+
+
+def _save_catalog(catalog: Dict[str, Any], root_key: str, dirs: Dict[str, Any]) -> None:
+    from .cache import cache_enabled
+
+    if not cache_enabled():
+        return
+    roots = {k: v for k, v in catalog.items() if k != root_key}
+    roots[root_key] = {"scannedAt": time.time(), "dirs": dirs}
+    roots = dict(list(roots.items())[-CATALOG_ROOTS:])
+
+    path = get_catalog_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".aprx-catalog.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"format": CATALOG_FORMAT, "roots": roots}, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+    except OSError:
+        pass
@@ -9,6 +9,11 @@ Commands:
     arcgis clean         - Remove generated files
     arcgis open          - Open folder or select project
     arcgis launch        - Launch ArcGIS Pro
+    arcgis compact       - Split fields/sample data into per-layer shards
+    arcgis serve         - Run a query daemon for fast repeated queries
+    arcgis bench         - Benchmark commands against a synthetic export
+    arcgis metrics       - Latency percentiles / OpenMetrics from recorded runs
+    arcgis index         - Build the SQLite database for `arcgis sql`
     
     # Query
     arcgis project       - Show project info
@@ -22,29 +27,200 @@ Commands:
     arcgis notebooks     - List Jupyter notebooks
     arcgis context       - Print full markdown summary
     arcgis diagram       - Render project structure diagram
+    arcgis sql <query>   - Run a read-only SQL query against the context
+    arcgis search <terms> - Ranked search over names, fields and sources
+    arcgis samples <name> - Export sample rows as CSV/NDJSON/Parquet/Arrow
+    arcgis geom-stats    - Geometry complexity and payload estimate per layer
+    arcgis diff <a> <b>  - Structural diff between two snapshots
+    arcgis history       - Save/list/show/restore deduplicated past exports
 """
 
+import importlib
 import sys
 import io
+import time
 
 import click
-from rich.console import Console
 
-from . import __version__
-from .commands import clean, open_project, install, query, launch, notebooks, tui, diagram
-from .tui.banner import _colorize_logo
+from . import __version__, metrics
+from .profiling import print_summary, span, start_profiling, stop_profiling, write_report
 
 # Ensure Unicode output on Windows
 if sys.stdout.encoding != "utf-8":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
 
-console = Console()
 
+# Subcommands are registered by name with a static help string and imported
+# only when invoked, so `arcgis --version` or `arcgis project --json` don't pay
+# for Textual, Pillow or the Rich table machinery of unrelated commands.
+# name -> (module:attribute, short help)
+LAZY_COMMANDS = {
+    # Setup commands
+    "install": ("arcgispro_cli.commands.install:install_cmd", "Install the ProExporter add-in for ArcGIS Pro."),
+    "uninstall": ("arcgispro_cli.commands.install:uninstall_cmd", "Show instructions for uninstalling the add-in."),
+    "status": ("arcgispro_cli.commands.query:status_cmd", "Show export status and validate files."),
+    "clean": ("arcgispro_cli.commands.clean:clean_cmd", "Remove generated files from .arcgispro/ folder."),
+    "open": ("arcgispro_cli.commands.open_project:open_cmd", "Select the active ArcGIS Pro project."),
+    "launch": ("arcgispro_cli.commands.launch:launch_cmd", "Launch ArcGIS Pro."),
+    "compact": (
+        "arcgispro_cli.commands.compact:compact_cmd",
+        "Split fields and sample data out of layers.json/tables.json.",
+    ),
+    "serve": ("arcgispro_cli.commands.serve:serve_cmd", "Run a query daemon that keeps the context in memory."),
+    "bench": (
+        "arcgispro_cli.commands.bench:bench_cmd",
+        "Benchmark context loading, query commands and the TUI tree.",
+    ),
+    "metrics": (
+        "arcgispro_cli.commands.metrics:metrics_cmd",
+        "Show per-command latency percentiles from recorded invocations.",
+    ),
+    "index": ("arcgispro_cli.commands.sql:index_cmd", "Build the SQLite database used by `arcgis sql`."),
+    # Query commands
+    "project": ("arcgispro_cli.commands.query:project_cmd", "Show project information."),
+    "maps": ("arcgispro_cli.commands.query:maps_cmd", "List all maps in the project."),
+    "map": ("arcgispro_cli.commands.query:map_cmd", "Show details for a specific map."),
+    "layers": ("arcgispro_cli.commands.query:layers_cmd", "List all layers."),
+    "layer": (
+        "arcgispro_cli.commands.query:layer_cmd",
+        "Show details for a specific layer, including field schema.",
+    ),
+    "fields": ("arcgispro_cli.commands.query:fields_cmd", "Show field schema for a layer."),
+    "tables": ("arcgispro_cli.commands.query:tables_cmd", "List standalone tables."),
+    "connections": ("arcgispro_cli.commands.query:connections_cmd", "List data connections (geodatabases, folders)."),
+    "notebooks": ("arcgispro_cli.commands.notebooks:notebooks_cmd", "List Jupyter notebooks in the project."),
+    "context": (
+        "arcgispro_cli.commands.query:context_cmd",
+        "Print the full markdown context summary (for pasting to AI).",
+    ),
+    "diagram": (
+        "arcgispro_cli.commands.diagram:diagram_cmd",
+        "Render Mermaid diagrams for the exported ArcGIS Pro project structure.",
+    ),
+    "sql": ("arcgispro_cli.commands.sql:sql_cmd", "Run a read-only SQL query against the exported context."),
+    "search": (
+        "arcgispro_cli.commands.search:search_cmd",
+        "Search layers, tables, fields and notebooks by relevance.",
+    ),
+    "samples": (
+        "arcgispro_cli.commands.samples:samples_cmd",
+        "Export the sample rows of a layer (or --all) in columnar form.",
+    ),
+    "geom-stats": (
+        "arcgispro_cli.commands.geomstats:geom_stats_cmd",
+        "Estimate geometry complexity per layer from its sample geometries.",
+    ),
+    "diff": (
+        "arcgispro_cli.commands.diff:diff_cmd",
+        "Compare two snapshots: added, removed and changed maps, layers, tables and fields.",
+    ),
+    "history": ("arcgispro_cli.commands.history:history_cmd", "Keep deduplicated copies of past exports."),
+    "tui": ("arcgispro_cli.commands.tui:tui_cmd", "Launch the interactive Textual UI"),
+}
 
-@click.group(invoke_without_command=True)
+
+def _finish_profile(show, output):
+    profiler = stop_profiling()
+    if profiler is None:
+        return
+    if output:
+        try:
+            write_report(profiler, output)
+        except OSError as e:
+            click.echo(f"arcgis: can't write profile to {output}: {e}", err=True)
+    if show:
+        print_summary(profiler)
+
+
+class LazyGroup(click.Group):
+    """Click group that imports a subcommand's module only when it is used."""
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            import_path, _ = self.lazy_commands[cmd_name]
+            module_name, attr = import_path.split(":")
+            with span("import"):
+                self.add_command(getattr(importlib.import_module(module_name), attr), name=cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def invoke(self, ctx):
+        # Start profiling before the subcommand is resolved so its import is
+        # measured too; the report is emitted when the context closes (also
+        # after SystemExit from the command).
+        profile = ctx.params.get("profile")
+        memory = ctx.params.get("profile_memory")
+        output = ctx.params.get("profile_output")
+        if profile or memory or output:
+            start_profiling(memory=memory)
+            ctx.call_on_close(lambda: _finish_profile(show=profile or memory, output=output))
+
+        metrics.reset()
+        started = time.perf_counter()
+        exit_code = 0
+        try:
+            return super().invoke(ctx)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            raise
+        except click.exceptions.Exit as e:
+            exit_code = e.exit_code
+            raise
+        except click.ClickException as e:
+            exit_code = e.exit_code
+            raise
+        except BaseException:
+            exit_code = 1
+            raise
+        finally:
+            command = ctx.meta.get("arcgis.command")
+            if command:
+                metrics.record_invocation(command, time.perf_counter() - started, exit_code)
+
+    def resolve_command(self, ctx, args):
+        cmd_name, cmd, args = super().resolve_command(ctx, args)
+        ctx.meta["arcgis.command"] = cmd_name
+        return cmd_name, cmd, args
+
+    def format_commands(self, ctx, formatter):
+        """List commands using the static help strings (no imports)."""
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(n) for n in names)
+
+        rows = []
+        for name in names:
+            if name in self.commands:
+                cmd = self.commands[name]
+                if cmd.hidden:
+                    continue
+                rows.append((name, cmd.get_short_help_str(limit)))
+            else:
+                # Placeholder command, only used to truncate the help like click does
+                placeholder = click.Command(name, help=self.lazy_commands[name][1])
+                rows.append((name, placeholder.get_short_help_str(limit)))
+
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS, invoke_without_command=True)
 @click.version_option(version=__version__, prog_name="arcgis")
+@click.option("--profile", is_flag=True, envvar="ARCGISPRO_CLI_PROFILE",
+              help="Print a per-phase timing table to stderr (env: ARCGISPRO_CLI_PROFILE=1).")
+@click.option("--profile-memory", is_flag=True, envvar="ARCGISPRO_CLI_PROFILE_MEMORY",
+              help="Also trace peak Python memory (slows the run down).")
+@click.option("--profile-output", type=click.Path(dir_okay=False), envvar="ARCGISPRO_CLI_PROFILE_OUTPUT",
+              help="Write the profile as JSON to this file (*.jsonl: append one line per run).")
 @click.pass_context
-def main(ctx):
+def main(ctx, profile, profile_memory, profile_output):
     """ArcGIS Pro CLI - Query exported session context.
     
     This tool reads exports from the .arcgispro/ folder created by the
@@ -62,33 +238,14 @@ def main(ctx):
     """
     ctx.ensure_object(dict)
     if ctx.invoked_subcommand is None:
+        from rich.console import Console
+        from .tui.banner import _colorize_logo
+
+        console = Console()
         console.print(_colorize_logo())
         console.print()
         console.print(ctx.get_help())
 
 
-# Setup commands
-main.add_command(install.install_cmd, name="install")
-main.add_command(install.uninstall_cmd, name="uninstall")
-main.add_command(query.status_cmd, name="status")
-main.add_command(clean.clean_cmd, name="clean")
-main.add_command(open_project.open_cmd, name="open")
-main.add_command(launch.launch_cmd, name="launch")
-
-# Query commands
-main.add_command(query.project_cmd, name="project")
-main.add_command(query.maps_cmd, name="maps")
-main.add_command(query.map_cmd, name="map")
-main.add_command(query.layers_cmd, name="layers")
-main.add_command(query.layer_cmd, name="layer")
-main.add_command(query.fields_cmd, name="fields")
-main.add_command(query.tables_cmd, name="tables")
-main.add_command(query.connections_cmd, name="connections")
-main.add_command(notebooks.notebooks_cmd, name="notebooks")
-main.add_command(query.context_cmd, name="context")
-main.add_command(diagram.diagram_cmd, name="diagram")
-main.add_command(tui.tui_cmd, name="tui")
-
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,141 @@
+"""bench command - Time commands against a synthetic (or real) export."""
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich import box
+from pathlib import Path
+
+from ..bench import DEFAULT_TOLERANCE
+
+console = Console()
+
+
+@click.command("bench")
+@click.option("--size", type=click.Choice(["small", "medium", "large"]), default="small", show_default=True,
+              help="Synthetic export size")
+@click.option("--maps", type=int, help="Override the number of maps")
+@click.option("--layers", type=int, help="Override the total number of layers")
+@click.option("--tables", type=int, help="Override the total number of standalone tables")
+@click.option("--fields", type=int, help="Override fields per layer/table")
+@click.option("--rows", type=int, help="Override sample rows per layer/table")
+@click.option("--vertices", type=int, help="Override vertices per sample line/polygon")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Benchmark an existing export instead")
+@click.option("--keep", type=click.Path(file_okay=False), help="Write the synthetic export here and keep it")
+@click.option("--repeat", "-n", type=int, default=3, show_default=True, help="Timed runs per case (best is kept)")
+@click.option("--case", "cases", multiple=True, help="Only run cases whose name contains this (repeatable)")
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False), help="Fail on regressions against this file")
+@click.option("--save-baseline", type=click.Path(dir_okay=False), help="Write results as a baseline file")
+@click.option("--tolerance", type=float, default=DEFAULT_TOLERANCE, show_default=True,
+              help="Allowed relative slowdown/memory growth")
+@click.option("--json", "as_json", is_flag=True, help="Output results as JSON")
+def bench_cmd(size, maps, layers, tables, fields, rows, vertices, path, keep, repeat, cases,
+              baseline, save_baseline, tolerance, as_json):
+    """Benchmark context loading, query commands and the TUI tree.
+
+    Generates a synthetic export shaped like the ProExporter output, then
+    reports wall time (best of --repeat) and peak traced memory per case.
+
+    \b
+    Examples:
+        arcgis bench                                   # Small synthetic export
+        arcgis bench --size medium --case layers       # Only the layers cases
+        arcgis bench --save-baseline benchmarks/baseline.json
+        arcgis bench --baseline benchmarks/baseline.json   # Exit 1 on regressions
+    """
+    import json as json_lib
+    import shutil
+    import tempfile
+    from dataclasses import replace
+
+    from ..bench import BenchError, compare_to_baseline, results_to_baseline, run_benchmarks
+    from ..paths import find_arcgispro_folder
+    from ..synthetic import EXPORT_SIZES, generate_export
+
+    spec = None
+    temp_root = None
+    if path:
+        arcgispro_path = find_arcgispro_folder(Path(path))
+        if not arcgispro_path:
+            console.print("[red]✗[/red] No .arcgispro folder found")
+            raise SystemExit(1)
+    else:
+        overrides = {
+            "maps": maps, "layers": layers, "tables": tables,
+            "fields": fields, "sample_rows": rows, "vertices": vertices,
+        }
+        spec = replace(EXPORT_SIZES[size], **{k: v for k, v in overrides.items() if v is not None})
+        if keep:
+            root = Path(keep)
+        else:
+            root = temp_root = Path(tempfile.mkdtemp(prefix="arcgis-bench-"))
+        if not as_json:
+            console.print(f"[dim]Generating synthetic export in {root} ...[/dim]")
+        arcgispro_path = generate_export(root, spec)
+
+    spec_dict = spec.to_dict() if spec else None
+    try:
+        progress = None if as_json else (lambda name: console.print(f"[dim]• {name}[/dim]"))
+        results = run_benchmarks(arcgispro_path, repeat=repeat, only=list(cases) or None, progress=progress)
+    except BenchError as e:
+        console.print(f"[red]✗[/red] {e}")
+        raise SystemExit(1)
+    finally:
+        if temp_root is not None:
+            shutil.rmtree(temp_root, ignore_errors=True)
+
+    regressions = []
+    baseline_results = {}
+    if baseline:
+        try:
+            with open(baseline, "r", encoding="utf-8") as f:
+                baseline_data = json_lib.load(f)
+            regressions = compare_to_baseline(results, baseline_data, spec_dict, tolerance)
+        except (OSError, ValueError, BenchError) as e:
+            console.print(f"[red]✗[/red] Can't use baseline {baseline}: {e}")
+            raise SystemExit(1)
+        baseline_results = baseline_data.get("results") or {}
+
+    if save_baseline:
+        Path(save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(save_baseline, "w", encoding="utf-8") as f:
+            json_lib.dump(results_to_baseline(results, spec_dict), f, indent=2)
+            f.write("\n")
+
+    if as_json:
+        output = results_to_baseline(results, spec_dict)
+        output["regressions"] = [
+            {"name": r.name, "metric": r.metric, "baseline": r.baseline, "current": r.current}
+            for r in regressions
+        ]
+        console.print(json_lib.dumps(output, indent=2))
+    else:
+        regressed = {(r.name, r.metric) for r in regressions}
+        table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
+        table.add_column("Case", style="cyan")
+        table.add_column("Time (ms)", justify="right")
+        table.add_column("Peak (MB)", justify="right")
+        if baseline:
+            table.add_column("Baseline (ms / MB)", justify="right", style="dim")
+        for r in results:
+            time_cell = f"{r.seconds * 1000:,.1f}"
+            peak_cell = f"{r.peak_bytes / 1e6:,.2f}"
+            if (r.name, "seconds") in regressed:
+                time_cell = f"[red]{time_cell}[/red]"
+            if (r.name, "peakBytes") in regressed:
+                peak_cell = f"[red]{peak_cell}[/red]"
+            row = [r.name, time_cell, peak_cell]
+            if baseline:
+                base = baseline_results.get(r.name)
+                row.append(f"{base['seconds'] * 1000:,.1f} / {base['peakBytes'] / 1e6:,.2f}" if base else "-")
+            table.add_row(*row)
+        console.print(table)
+        if save_baseline:
+            console.print(f"[green]✓[/green] Baseline written to {save_baseline}")
+
+    if regressions:
+        if not as_json:
+            for r in regressions:
+                what = "slower" if r.metric == "seconds" else "more memory"
+                console.print(f"[red]✗[/red] {r.name}: {r.ratio:.2f}x {what} than baseline")
+        raise SystemExit(1)
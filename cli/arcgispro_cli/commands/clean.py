@@ -11,6 +11,7 @@ from ..paths import (
     get_images_folder,
     get_snapshot_folder,
 )
+from ..cache import get_cache_folder
 
 console = Console()
 
@@ -33,6 +34,8 @@ def clean_cmd(path, clean_images, clean_context, clean_snapshot, clean_all, yes)
         --snapshot  Remove snapshot/ folder
         --all       Remove everything
     
+    Saved history (.arcgispro-history/, next to .arcgispro/) is never removed.
+
     By default, asks for confirmation before deleting.
     """
     start_path = Path(path) if path else None
@@ -69,6 +72,9 @@ def clean_cmd(path, clean_images, clean_context, clean_snapshot, clean_all, yes)
             context_folder = get_context_folder(arcgispro_path)
             if context_folder.exists():
                 to_remove.append(context_folder)
+            cache_folder = get_cache_folder(arcgispro_path)
+            if cache_folder.exists():
+                to_remove.append(cache_folder)
             # Also remove meta.json and active_project.txt
             meta_file = arcgispro_path / "meta.json"
             if meta_file.exists():
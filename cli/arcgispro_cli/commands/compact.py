@@ -0,0 +1,70 @@
+"""compact command - Split heavy layer/table payloads into shard files."""
+
+import click
+from rich.console import Console
+from pathlib import Path
+
+from ..paths import find_arcgispro_folder
+from ..shards import SHARDED_KINDS, compact_kind, get_shard_folder, get_shard_index_path
+
+console = Console()
+
+
+@click.command("compact")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--prune", is_flag=True, help="Delete layers.json/tables.json after sharding")
+@click.option("--json", "as_json", is_flag=True, help="Output summary as JSON")
+def compact_cmd(path, prune, as_json):
+    """Split fields and sample data out of layers.json/tables.json.
+
+    Writes a slim context/<kind>.index.json plus one
+    context/<kind>/<id>.json shard per layer or table. Commands that need
+    a single layer's fields then read one small shard instead of the
+    whole export.
+
+    \b
+    Examples:
+        arcgis compact            # Keep the original files
+        arcgis compact --prune    # Remove layers.json/tables.json afterwards
+    """
+    import json as json_lib
+
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        console.print("  Run the Snapshot export from ArcGIS Pro first.")
+        raise SystemExit(1)
+
+    summary = {}
+    for kind in SHARDED_KINDS:
+        try:
+            summary[kind] = compact_kind(arcgispro_path, kind, prune=prune)
+        except ValueError:
+            console.print(f"[red]✗[/red] {kind}.json is not valid JSON")
+            raise SystemExit(1)
+
+    if as_json:
+        console.print(json_lib.dumps(summary, indent=2))
+        return
+
+    if not any(summary.values()):
+        console.print("[yellow]No layers.json or tables.json to compact[/yellow]")
+        return
+
+    console.print()
+    for kind, result in summary.items():
+        if result is None:
+            console.print(f"[dim]• {kind}.json: not found[/dim]")
+            continue
+        index_path = get_shard_index_path(arcgispro_path, kind)
+        shard_dir = get_shard_folder(arcgispro_path, kind)
+        console.print(
+            f"[green]✓[/green] {kind}.json ({result['sourceBytes'] / 1024:,.1f} KB) → "
+            f"{index_path.name} ({result['indexBytes'] / 1024:,.1f} KB) + "
+            f"{result['records']} shard(s) in {shard_dir.name}/"
+        )
+        if prune:
+            console.print(f"  [dim]Removed {kind}.json[/dim]")
+    console.print()
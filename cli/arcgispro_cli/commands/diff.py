@@ -0,0 +1,136 @@
+"""diff command - Structural diff between two snapshots."""
+
+import click
+from rich.console import Console
+from rich.markup import escape
+
+from ..diff import DIFF_KINDS, VOLATILE_KEYS
+
+console = Console()
+
+_MAX_VALUE = 60
+
+
+def _value(value):
+    import json as json_lib
+
+    text = "—" if value is None else json_lib.dumps(value) if not isinstance(value, str) else repr(value)
+    if len(text) > _MAX_VALUE:
+        text = text[:_MAX_VALUE - 1] + "…"
+    return escape(text)
+
+
+def _label(record):
+    name = escape(str(record.get("name") or "?"))
+    map_name = record.get("mapName")
+    return f"{name} [dim]({escape(map_name)})[/dim]" if map_name else name
+
+
+@click.command("diff")
+@click.argument("snapshot_a")
+@click.argument("snapshot_b")
+@click.option("--path", "-p", type=click.Path(exists=True),
+              help="Path to search for the .arcgispro folder whose history @refs name")
+@click.option("--kind", "-k", "kinds", multiple=True, type=click.Choice(DIFF_KINDS),
+              help="Only compare this kind (repeatable)")
+@click.option("--ignore", "ignore_keys", multiple=True, metavar="KEY",
+              help=f"Also ignore this record/field key (repeatable; always ignored: {', '.join(VOLATILE_KEYS)})")
+@click.option("--summary", "summary_only", is_flag=True, help="Only print counts")
+@click.option("--exit-code", is_flag=True, help="Exit with 1 if the snapshots differ")
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def diff_cmd(snapshot_a, snapshot_b, path, kinds, ignore_keys, summary_only, exit_code, as_json):
+    """Compare two snapshots: added, removed and changed maps, layers, tables and fields.
+
+    SNAPSHOT_A and SNAPSHOT_B are project folders, .arcgispro folders or
+    their context folders, or @REF for a snapshot saved with
+    `arcgis history save` (@latest, @~1, @<id>). Records are matched by
+    their stable id (map and name when there is none); records whose
+    content hashes are equal are skipped, the rest are compared key by key
+    and field by field.
+
+    \b
+    Examples:
+        arcgis diff ../before ./
+        arcgis diff @~1 .
+        arcgis diff old/.arcgispro new/.arcgispro -k layers --json
+        arcgis diff a b --summary --exit-code
+    """
+    import json as json_lib
+    from pathlib import Path
+
+    from ..diff import diff_snapshots, resolve_snapshot
+
+    paths = []
+    for snapshot in (snapshot_a, snapshot_b):
+        if snapshot.startswith("@"):
+            resolved = _checkout(path, snapshot)
+        else:
+            resolved = resolve_snapshot(Path(snapshot))
+        if resolved is None:
+            console.print(f"[red]✗[/red] No .arcgispro export in {snapshot}")
+            raise SystemExit(1)
+        paths.append(resolved)
+
+    result = diff_snapshots(paths[0], paths[1], kinds=kinds or DIFF_KINDS,
+                            ignore=VOLATILE_KEYS + tuple(ignore_keys))
+
+    if as_json:
+        click.echo(json_lib.dumps(result.summary() if summary_only else result.to_dict(), indent=2))
+    elif not result:
+        console.print("[green]✓[/green] No differences")
+    else:
+        _print_diff(result, summary_only)
+
+    if exit_code and result:
+        raise SystemExit(1)
+
+
+def _checkout(path, ref):
+    """The .arcgispro folder of a history snapshot (checked out on first use)."""
+    from pathlib import Path
+
+    from ..history import History, HistoryError
+    from ..paths import find_arcgispro_folder
+
+    arcgispro_path = find_arcgispro_folder(Path(path) if path else None)
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        raise SystemExit(1)
+    history = History(arcgispro_path)
+    try:
+        return history.checkout(history.resolve(ref).id)
+    except HistoryError as e:
+        console.print(f"[red]✗[/red] {e}")
+        raise SystemExit(1)
+
+
+def _print_diff(result, summary_only):
+    console.print()
+    for kind, counts in result.summary().items():
+        d = result.kinds[kind]
+        if not d:
+            continue
+        fields = ""
+        if counts["fieldsAdded"] or counts["fieldsRemoved"] or counts["fieldsChanged"]:
+            fields = (f" | fields: [green]+{counts['fieldsAdded']}[/green] [red]-{counts['fieldsRemoved']}[/red] "
+                      f"[yellow]~{counts['fieldsChanged']}[/yellow]")
+        console.print(f"[bold]{kind.title()}[/bold]: [green]+{counts['added']}[/green] "
+                      f"[red]-{counts['removed']}[/red] [yellow]~{counts['changed']}[/yellow]{fields}")
+        if summary_only:
+            continue
+        for record in d.added:
+            console.print(f"  [green]+[/green] {_label(record)}")
+        for record in d.removed:
+            console.print(f"  [red]-[/red] {_label(record)}")
+        for change in d.changed:
+            console.print(f"  [yellow]~[/yellow] {_label({'name': change.name, 'mapName': change.map_name})}")
+            for c in change.changes:
+                console.print(f"      {escape(c.key)}: {_value(c.old)} → {_value(c.new)}")
+            for name in change.fields_added:
+                console.print(f"      [green]+ field[/green] {escape(str(name))}")
+            for name in change.fields_removed:
+                console.print(f"      [red]- field[/red] {escape(str(name))}")
+            for f in change.fields_changed:
+                details = ", ".join(f"{escape(c.key)}: {_value(c.old)} → {_value(c.new)}" for c in f.changes)
+                console.print(f"      [yellow]~ field[/yellow] {escape(f.name)}: {details}")
+        console.print()
@@ -0,0 +1,112 @@
+"""geom-stats command - Geometry complexity report from sample geometries."""
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich import box
+from pathlib import Path
+
+from ..paths import find_arcgispro_folder
+
+console = Console()
+
+
+def _parse_budget(ctx, param, value):
+    from ..geomstats import DEFAULT_BUDGET, parse_size
+
+    if value is None:
+        return DEFAULT_BUDGET
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+@click.command("geom-stats")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--map", "-m", "map_name", help="Only layers of this map")
+@click.option("--budget", "-b", envvar="ARCGISPRO_CLI_GEOM_BUDGET", callback=_parse_budget, metavar="SIZE",
+              help="Flag layers whose estimated payload exceeds this (default 64MB; env: ARCGISPRO_CLI_GEOM_BUDGET)")
+@click.option("--over", "over_only", is_flag=True, help="Only layers over the budget")
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def geom_stats_cmd(path, map_name, budget, over_only, as_json):
+    """Estimate geometry complexity per layer from its sample geometries.
+
+    Counts vertices and parts (rings/paths) of each sampled feature, its
+    bounding box area and the size of its shape buffer, then multiplies the
+    average size by the layer's feature count. Layers whose estimated
+    payload is over --budget are flagged. Layers are listed largest first;
+    the table shows averages and maxima over the sample (--json adds the
+    sample size and bounding box area).
+
+    \b
+    Examples:
+        arcgis geom-stats
+        arcgis geom-stats --budget 256MB --over
+        arcgis geom-stats -m "Map A" --json
+    """
+    import json as json_lib
+
+    from ..geomstats import format_size, geometry_reports
+
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        console.print("  Run the Snapshot export from ArcGIS Pro first.")
+        raise SystemExit(1)
+
+    try:
+        reports = geometry_reports(arcgispro_path, budget=budget, map_name=map_name)
+    except ValueError as e:
+        console.print(f"[red]✗[/red] layers.json is not valid JSON: {e}")
+        raise SystemExit(1)
+
+    reports.sort(key=lambda r: -(r.estimated_bytes or -1))
+    if over_only:
+        reports = [r for r in reports if r.over_budget]
+
+    if as_json:
+        click.echo(json_lib.dumps([r.to_dict() for r in reports], indent=2))
+        return
+
+    if not reports:
+        console.print("[green]✓[/green] No layers over the budget" if over_only else "[yellow]No layers found[/yellow]")
+        return
+
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
+    table.add_column("Layer", style="cyan", overflow="fold")
+    table.add_column("Map", overflow="fold")
+    table.add_column("Type")
+    table.add_column("Vertices", justify="right")
+    table.add_column("Parts", justify="right")
+    table.add_column("B/feature", justify="right")
+    table.add_column("Features", justify="right")
+    table.add_column("Payload", justify="right")
+
+    for r in reports:
+        s = r.stats
+        features = f"{r.feature_count:,}" if r.feature_count is not None else "-"
+        if s is None:
+            table.add_row(Text(r.name), Text(r.map_name or "-"), r.geometry_type or "-",
+                          "-", "-", "-", features, "-", style="dim")
+            continue
+        payload = format_size(r.estimated_bytes)
+        table.add_row(
+            Text(r.name),
+            Text(r.map_name or "-"),
+            r.geometry_type or "-",
+            f"{s.vertices_mean:,.0f}/{s.vertices_max:,}",
+            f"{s.parts_mean:,.1f}/{s.parts_max:,}",
+            f"{s.bytes_mean:,.0f}",
+            features,
+            f"[red]{payload} ⚠[/red]" if r.over_budget else payload,
+        )
+
+    flagged = sum(1 for r in reports if r.over_budget)
+    console.print()
+    console.print(table)
+    if flagged:
+        console.print(f"  [red]{flagged} layer(s) over the {format_size(budget)} budget[/red]")
+    console.print()
@@ -0,0 +1,209 @@
+"""history commands - Save, list, inspect and restore past exports."""
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich import box
+from pathlib import Path
+
+from ..paths import find_arcgispro_folder
+
+console = Console()
+
+_path_option = click.option("--path", "-p", type=click.Path(exists=True),
+                            help="Path to search for .arcgispro folder")
+
+
+def _history(path):
+    from ..history import History
+
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        console.print("  Run the Snapshot export from ArcGIS Pro first.")
+        raise SystemExit(1)
+    return History(arcgispro_path)
+
+
+def _resolve(history, ref):
+    from ..history import HistoryError
+
+    try:
+        return history.resolve(ref)
+    except HistoryError as e:
+        console.print(f"[red]✗[/red] {e}")
+        raise SystemExit(1)
+
+
+def _size(n):
+    from ..geomstats import format_size
+
+    return format_size(n)
+
+
+@click.group("history")
+def history_cmd():
+    """Keep deduplicated copies of past exports.
+
+    Each saved snapshot stores its maps, layers, tables and other records as
+    compressed blobs named by their content hash, so a record that did not
+    change since an earlier snapshot costs nothing. Snapshots are referred
+    to by id (or a unique prefix), "latest" or "~N" (N saves ago).
+
+    The store is kept in .arcgispro-history/ next to .arcgispro/, so a new
+    Snapshot or `arcgis clean --all` leaves it alone.
+
+    \b
+    Examples:
+        arcgis history save -m "before reprojecting"
+        arcgis history list
+        arcgis history show ~1
+        arcgis diff @~1 .
+        arcgis history restore 3f2a9c
+    """
+
+
+@history_cmd.command("save")
+@_path_option
+@click.option("--message", "-m", "label", help="Label for the snapshot")
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def history_save_cmd(path, label, as_json):
+    """Save the current export to the history."""
+    import json as json_lib
+
+    from ..history import HistoryError
+
+    history = _history(path)
+    try:
+        result = history.save(label)
+    except HistoryError as e:
+        console.print(f"[red]✗[/red] {e}")
+        raise SystemExit(1)
+    except OSError as e:
+        console.print(f"[red]✗[/red] Can't write to {history.root}: {e}")
+        raise SystemExit(1)
+
+    if as_json:
+        click.echo(json_lib.dumps({**result.entry.to_dict(), "records": result.records,
+                                   "newBlobs": result.new_blobs, "newBytes": result.new_bytes,
+                                   "unchanged": result.unchanged}, indent=2))
+    elif result.unchanged:
+        console.print(f"[dim]Unchanged since {result.entry.id} ({result.entry.saved_at})[/dim]")
+    else:
+        console.print(f"[green]✓[/green] Saved snapshot [bold]{result.entry.id}[/bold]: "
+                      f"{result.records:,} record(s), {result.new_blobs:,} new ({_size(result.new_bytes)})")
+
+
+@history_cmd.command("list")
+@_path_option
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def history_list_cmd(path, as_json):
+    """List saved snapshots, newest first."""
+    import json as json_lib
+
+    history = _history(path)
+    entries = list(reversed(history.entries()))
+
+    if as_json:
+        click.echo(json_lib.dumps([e.to_dict() for e in entries], indent=2))
+        return
+
+    if not entries:
+        console.print("[yellow]No snapshots saved[/yellow] (arcgis history save)")
+        return
+
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
+    table.add_column("", style="dim", justify="right")
+    table.add_column("Id", style="cyan")
+    table.add_column("Saved")
+    table.add_column("Exported", style="dim")
+    table.add_column("Label")
+    for n, e in enumerate(entries):
+        table.add_row(f"~{n}", e.id, e.saved_at, e.exported_at or "-", Text(e.label or ""))
+
+    blobs, size = history.storage()
+    console.print()
+    console.print(table)
+    console.print(f"  [dim]{blobs:,} blob(s), {_size(size)} in {history.root}[/dim]")
+    console.print()
+
+
+@history_cmd.command("show")
+@click.argument("ref", default="latest")
+@_path_option
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def history_show_cmd(ref, path, as_json):
+    """Show a snapshot and where its files are checked out.
+
+    The snapshot is written out once to
+    .arcgispro-history/checkouts/<id>/, which any command can read with
+    --path (e.g. arcgis layers -p .arcgispro-history/checkouts/<id>).
+    """
+    import json as json_lib
+
+    from ..history import HistoryError
+
+    history = _history(path)
+    entry = _resolve(history, ref)
+    try:
+        counts = history.summary(entry.id)
+        checkout = history.checkout(entry.id)
+    except HistoryError as e:
+        console.print(f"[red]✗[/red] {e}")
+        raise SystemExit(1)
+
+    if as_json:
+        click.echo(json_lib.dumps({**entry.to_dict(), "records": counts,
+                                   "checkout": str(checkout.parent)}, indent=2))
+        return
+
+    console.print()
+    console.print(f"[bold]Snapshot {entry.id}[/bold]" + (f" — {entry.label}" if entry.label else ""))
+    console.print(f"  Saved: {entry.saved_at}")
+    if entry.exported_at:
+        console.print(f"  Exported: {entry.exported_at}")
+    if entry.project:
+        console.print(f"  Project: {entry.project}")
+    console.print("  " + " | ".join(f"{kind.title()}: {n:,}" for kind, n in counts.items()))
+    console.print(f"  Checkout: [dim]{checkout.parent}[/dim]")
+    console.print()
+
+
+@history_cmd.command("restore")
+@click.argument("ref")
+@_path_option
+@click.option("--no-save", is_flag=True, help="Don't save the current export first")
+@click.option("--yes", "-y", is_flag=True, help="Skip confirmation")
+def history_restore_cmd(ref, path, no_save, yes):
+    """Replace the current context files with a saved snapshot.
+
+    The current export is saved to the history first (unless --no-save),
+    so a restore can itself be undone.
+    """
+    from ..history import HistoryError
+
+    history = _history(path)
+    entry = _resolve(history, ref)
+
+    if not yes and not click.confirm(f"Replace the context in {history.arcgispro_path} with snapshot {entry.id}?"):
+        console.print("[dim]Cancelled.[/dim]")
+        return
+
+    try:
+        if not no_save:
+            try:
+                saved = history.save(f"before restoring {entry.id}")
+                console.print(f"[dim]Saved the current export as {saved.entry.id}[/dim]")
+            except HistoryError:
+                pass  # no current export to keep
+        written = history.restore(entry.id)
+    except HistoryError as e:
+        console.print(f"[red]✗[/red] {e}")
+        raise SystemExit(1)
+    except OSError as e:
+        console.print(f"[red]✗[/red] Restore failed: {e}")
+        raise SystemExit(1)
+
+    console.print(f"[green]✓[/green] Restored snapshot [bold]{entry.id}[/bold] ({len(written)} file(s))")
@@ -0,0 +1,115 @@
+"""metrics command - Aggregate recorded query latencies."""
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich import box
+from pathlib import Path
+
+console = Console()
+
+
+@click.command("metrics")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--command", "-c", "commands", multiple=True, help="Only these commands (repeatable)")
+@click.option("--openmetrics", is_flag=True, help="Output OpenMetrics text (node_exporter textfile format)")
+@click.option("--output", "-o", type=click.Path(dir_okay=False),
+              help="Write to this file atomically instead of stdout (OpenMetrics unless --json)")
+@click.option("--clear", is_flag=True, help="Delete the recorded invocations")
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def metrics_cmd(path, commands, openmetrics, output, clear, as_json):
+    """Show per-command latency percentiles from recorded invocations.
+
+    Every query command appends a small record (latency, bytes read, cache
+    hits/misses, context size) to a per-user cache folder; set
+    ARCGISPRO_CLI_NO_METRICS=1 to stop recording.
+
+    \b
+    Examples:
+        arcgis metrics                           # p50/p95/p99 per command
+        arcgis metrics --openmetrics             # Prometheus/OpenMetrics text
+        arcgis metrics -o /var/lib/node_exporter/textfile/arcgis.prom
+    """
+    import json as json_lib
+    import os
+    import tempfile
+
+    from ..metrics import QUANTILES, clear_records, iter_records, summarize, to_openmetrics
+    from ..paths import find_arcgispro_folder
+
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        raise SystemExit(1)
+
+    if clear:
+        clear_records(arcgispro_path)
+        console.print("[green]✓[/green] Cleared recorded metrics")
+        return
+
+    records = iter_records(arcgispro_path)
+    if commands:
+        records = (r for r in records if r["command"] in commands)
+    summary = summarize(records)
+
+    if as_json:
+        text = json_lib.dumps({"project": str(arcgispro_path.parent), "commands": summary}, indent=2) + "\n"
+    elif openmetrics or output:
+        text = to_openmetrics(summary, str(arcgispro_path.parent))
+    else:
+        text = None
+
+    if output:
+        # Write-then-rename so a textfile collector never reads a partial file
+        target = Path(output)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+                f.write(text)
+            os.replace(tmp, target)
+        except OSError as e:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            console.print(f"[red]✗[/red] Can't write {output}: {e}")
+            raise SystemExit(1)
+        return
+
+    if text is not None:
+        click.echo(text, nl=False)
+        return
+
+    if not summary:
+        console.print("[yellow]No recorded invocations yet[/yellow]")
+        return
+
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
+    table.add_column("Command", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("Errors", justify="right")
+    for q in QUANTILES:
+        table.add_column(f"p{q * 100:g} (ms)", justify="right")
+    table.add_column("Read (KB)", justify="right")
+    table.add_column("Cache hits", justify="right")
+
+    for s in summary:
+        lookups = s["cacheHits"] + s["cacheMisses"]
+        hits = f"{s['cacheHits'] / lookups:.0%}" if lookups else "-"
+        table.add_row(
+            s["command"],
+            str(s["runs"]),
+            str(s["errors"]) if s["errors"] else "",
+            *(f"{s['quantiles'][str(q)] * 1000:,.1f}" for q in QUANTILES),
+            f"{s['bytesReadMean'] / 1024:,.1f}",
+            hits,
+        )
+
+    console.print()
+    console.print(table)
+    latest = max(summary, key=lambda s: s["lastSeen"] or 0)
+    if latest["contextBytes"] is not None:
+        console.print(f"  Context size: {latest['contextBytes'] / 1024:,.1f} KB")
+    console.print()
@@ -4,15 +4,20 @@ import click
 from rich.console import Console
 from pathlib import Path
 
-from ..paths import find_arcgispro_folder, find_aprx_files
+from ..catalog import DEFAULT_IGNORE, DEFAULT_MAX_DEPTH, scan_aprx
 
 console = Console()
 
 
 @click.command("open")
 @click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .aprx files")
+@click.option("--depth", type=click.IntRange(0), default=DEFAULT_MAX_DEPTH, show_default=True,
+              help="Subfolder levels to search")
+@click.option("--ignore", "ignore", multiple=True, help="Skip folders matching this pattern (repeatable)")
+@click.option("--timeout", type=click.FloatRange(0, min_open=True), help="Stop searching after this many seconds")
+@click.option("--no-catalog", is_flag=True, help="List every folder instead of reusing the cached catalog")
 @click.argument("project", required=False)
-def open_cmd(path, project):
+def open_cmd(path, depth, ignore, timeout, no_catalog, project):
     """Select the active ArcGIS Pro project.
     
     If PROJECT is not specified, searches for .aprx files in the
@@ -20,10 +25,15 @@ def open_cmd(path, project):
     
     The selected project path is written to .arcgispro/active_project.txt
     
+    Folder listings are kept in a per-user catalog; on repeat runs only
+    folders whose modification time changed are listed again. Hidden
+    folders, file geodatabases and Pro's per-project caches are skipped.
+    
     \b
     Examples:
         arcgispro open                    # Search and select
         arcgispro open MyProject.aprx     # Select specific project
+        arcgispro open -p //share/gis --depth 4 --timeout 5
     """
     search_path = Path(path) if path else Path.cwd()
     
@@ -49,7 +59,18 @@ def open_cmd(path, project):
     console.print(f"[bold]Searching for .aprx files in:[/bold] {search_path}")
     console.print()
     
-    aprx_files = find_aprx_files(search_path)
+    result = scan_aprx(
+        search_path,
+        max_depth=depth,
+        ignore=DEFAULT_IGNORE + tuple(ignore),
+        timeout=timeout,
+        use_catalog=not no_catalog,
+    )
+    aprx_files = result.paths
+    if not result.complete:
+        console.print(f"[yellow]Search stopped after {timeout:g}s; results may be incomplete[/yellow]")
+    console.print(f"[dim]({result.scanned} folder(s) listed, {result.reused} from catalog)[/dim]")
+    console.print()
     
     if not aprx_files:
         console.print("[yellow]No .aprx files found[/yellow]")
@@ -7,9 +7,32 @@ from rich.panel import Panel
 from rich import box
 from pathlib import Path
 
-from ..paths import find_arcgispro_folder, load_context_files, load_json_file, get_context_folder
+from ..daemon import open_context
+from ..index import get_context_index
+from ..shards import load_record_details
+from ..paths import (
+    CONTEXT_FILES,
+    HEAVY_RECORD_KEYS,
+    filter_records,
+    find_active_map,
+    find_arcgispro_folder,
+    get_context_folder,
+    load_context_files,
+    load_json_file,
+)
+from ..profiling import span
 
-console = Console()
+
+class _Console(Console):
+    """Console whose printing is recorded as the ``render`` phase under --profile."""
+
+    def print(self, *args, **kwargs):
+        with span("render"):
+            super().print(*args, **kwargs)
+
+
+console = _Console()
+err_console = _Console(stderr=True)
 
 
 def require_context(path=None):
@@ -25,15 +48,161 @@ def require_context(path=None):
     return arcgispro_path
 
 
+def _parse_bbox(ctx, param, value):
+    """Click callback: "xmin,ymin,xmax,ymax" -> tuple of floats."""
+    if value is None:
+        return None
+    from ..spatial import parse_bbox
+
+    try:
+        return parse_bbox(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+_wkid_option = click.option("--wkid", type=int,
+                            help="Spatial reference of the box (default: each map's own; 4326/3857 are converted)")
+
+
+def _print_json(value):
+    """Print a value as indented JSON."""
+    import json as json_lib
+
+    with span("serialize"):
+        text = json_lib.dumps(value, indent=2)
+    console.print(text)
+
+
+def _layers_table(title=None):
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold", title=title, title_justify="left")
+    table.add_column("Layer", style="cyan")
+    table.add_column("Map")
+    table.add_column("Type")
+    table.add_column("Geometry")
+    table.add_column("Features", justify="right")
+    table.add_column("V", justify="center")
+    return table
+
+
+def _layer_row(layer):
+    visible = "✓" if layer.get("isVisible") else ""
+    broken_mark = " ⚠" if layer.get("isBroken") else ""
+    feature_count = layer.get("featureCount")
+    features = f"{feature_count:,}" if feature_count is not None else "-"
+    return (
+        f"{layer.get('name', 'Unknown')}{broken_mark}",
+        layer.get("mapName", "-"),
+        layer.get("layerType", "-"),
+        layer.get("geometryType", "-") or "-",
+        features,
+        visible
+    )
+
+
+def _tables_table(title=None):
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold", title=title, title_justify="left")
+    table.add_column("Table", style="cyan")
+    table.add_column("Map")
+    table.add_column("Rows", justify="right")
+    table.add_column("Source Type")
+    return table
+
+
+def _table_row(t):
+    row_count = t.get("rowCount")
+    rows = f"{row_count:,}" if row_count is not None else "-"
+    return (
+        t.get("name", "Unknown"),
+        t.get("mapName", "-"),
+        rows,
+        t.get("dataSourceType", "-")
+    )
+
+
+def _connections_table(title=None):
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold", title=title, title_justify="left")
+    table.add_column("Name", style="cyan")
+    table.add_column("Type")
+    table.add_column("Path")
+    return table
+
+
+def _connection_row(conn):
+    return (
+        conn.get("name", "Unknown"),
+        conn.get("connectionType", "-"),
+        conn.get("path", "-")
+    )
+
+
+# kind -> (table factory, row builder, noun)
+_LISTINGS = {
+    "layers": (_layers_table, _layer_row, "layers"),
+    "tables": (_tables_table, _table_row, "standalone tables"),
+    "connections": (_connections_table, _connection_row, "connections"),
+}
+
+
+def _recursive_option(fn):
+    fn = click.option("--workers", type=int, help="Loader threads for --recursive")(fn)
+    fn = click.option("--recursive", "-r", "recursive_root", type=click.Path(exists=True, file_okay=False),
+                      help="Query every .arcgispro export under this folder")(fn)
+    return fn
+
+
+def _print_recursive(root, kind, as_json, workers=None, **filters):
+    """
+    Print ``kind`` records of every export under ``root`` as projects finish loading.
+
+    JSON output is one array with one record per line, each tagged with its
+    ``project``; table output is one table per project with matches.
+    """
+    import json as json_lib
+    from ..projects import DEFAULT_WORKERS, query_projects
+
+    new_table, row, noun = _LISTINGS[kind]
+    projects = failed = total = 0
+    first = True
+    results = query_projects(root, kind, details=as_json, workers=workers or DEFAULT_WORKERS, **filters)
+    for result in results:
+        projects += 1
+        if result.error:
+            failed += 1
+            err_console.print(f"[red]✗[/red] {result.project}: {result.error}")
+            continue
+        total += len(result.records)
+        if as_json:
+            with span("serialize"):
+                lines = [json_lib.dumps(r) for r in result.records]
+            for line in lines:
+                click.echo(("[\n" if first else ",\n") + line, nl=False)
+                first = False
+        elif result.records:
+            table = new_table(title=f"[bold]{result.project}[/bold]")
+            for record in result.records:
+                table.add_row(*row(record))
+            console.print(table)
+
+    if as_json:
+        click.echo("[]" if first else "\n]")
+    if not projects:
+        err_console.print(f"[red]✗[/red] No .arcgispro folders found under {root}")
+        raise SystemExit(1)
+    if not as_json:
+        summary = f"{total:,} {noun} in {projects - failed:,} project(s)"
+        if failed:
+            summary += f", [red]{failed:,} failed[/red]"
+        console.print(summary)
+        console.print()
+
+
 @click.command("project")
 @click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
 def project_cmd(path, as_json):
     """Show project information."""
-    import json as json_lib
-    
     arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
+    context = open_context(arcgispro_path)
     project = context.get("project")
     
     if not project:
@@ -41,7 +210,7 @@ def project_cmd(path, as_json):
         raise SystemExit(1)
     
     if as_json:
-        console.print(json_lib.dumps(project, indent=2))
+        _print_json(project)
         return
     
     console.print()
@@ -55,17 +224,23 @@ def project_cmd(path, as_json):
 
 @click.command("maps")
 @click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--intersects", "bbox", metavar="XMIN,YMIN,XMAX,YMAX", callback=_parse_bbox,
+              help="Only maps whose extent intersects this box")
+@_wkid_option
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def maps_cmd(path, as_json):
+def maps_cmd(path, bbox, wkid, as_json):
     """List all maps in the project."""
-    import json as json_lib
-    
     arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
+    context = open_context(arcgispro_path)
     maps = context.get("maps") or []
+
+    if bbox is not None:
+        from ..spatial import load_spatial_index
+
+        maps = [maps[i] for i in load_spatial_index(arcgispro_path).maps_intersecting(bbox, wkid) if i < len(maps)]
     
     if as_json:
-        console.print(json_lib.dumps(maps, indent=2))
+        _print_json(maps)
         return
     
     if not maps:
@@ -89,19 +264,19 @@ def maps_cmd(path, as_json):
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
 def map_cmd(name, path, as_json):
     """Show details for a specific map. If no name given, shows the active map."""
-    import json as json_lib
-    
     arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
+    context = open_context(arcgispro_path)
     maps = context.get("maps") or []
     
     if not maps:
         console.print("[yellow]No maps found[/yellow]")
         raise SystemExit(1)
     
+    index = get_context_index(context)
+    
     # Find the map
     if name:
-        target = next((m for m in maps if m.get("name", "").lower() == name.lower()), None)
+        target = index.map_named(name)
         if not target:
             console.print(f"[red]Map '{name}' not found[/red]")
             console.print("Available maps:")
@@ -109,15 +284,14 @@ def map_cmd(name, path, as_json):
                 console.print(f"  • {m.get('name')}")
             raise SystemExit(1)
     else:
-        target = next((m for m in maps if m.get("isActiveMap")), maps[0] if maps else None)
+        target = index.active_map()
     
     if as_json:
-        console.print(json_lib.dumps(target, indent=2))
+        _print_json(target)
         return
     
     # Show layers in this map
-    layers = context.get("layers") or []
-    map_layers = [l for l in layers if l.get("mapName") == target.get("name")]
+    map_layers = index.layers_in_map(target.get("name"))
     
     console.print()
     console.print(Panel.fit(f"[bold]{target.get('name', 'Unknown')}[/bold]", title="Map"))
@@ -141,68 +315,83 @@ def map_cmd(name, path, as_json):
 @click.option("--map", "-m", "map_name", help="Filter by map name")
 @click.option("--active", "active_map", is_flag=True, help="Only layers in the active map")
 @click.option("--broken", is_flag=True, help="Show only broken layers")
+@click.option("--bbox", metavar="XMIN,YMIN,XMAX,YMAX", callback=_parse_bbox,
+              help="Only layers whose sample geometries fall in this box")
+@_wkid_option
+@_recursive_option
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def layers_cmd(path, map_name, active_map, broken, as_json):
-    """List all layers."""
-    import json as json_lib
-    
-    arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
-    layers = context.get("layers") or []
-    
+def layers_cmd(path, map_name, active_map, broken, bbox, wkid, recursive_root, workers, as_json):
+    """List all layers.
+
+    --bbox answers from a spatial index over the bounding boxes of each
+    layer's sample geometries (built once per export, in .arcgispro/cache);
+    layers without sample geometries never match.
+    """
     # Apply filters
     if map_name and active_map:
         console.print("[red]✗[/red] Use either --map or --active (not both)")
         raise SystemExit(1)
 
+    if recursive_root and bbox is not None:
+        console.print("[red]✗[/red] --bbox can't be combined with --recursive")
+        raise SystemExit(1)
+
+    if recursive_root:
+        _print_recursive(recursive_root, "layers", as_json, workers,
+                         map_name=map_name, broken=broken, active=active_map)
+        return
+
+    arcgispro_path = require_context(path)
+    context = open_context(arcgispro_path)
+
     if active_map:
-        maps = context.get("maps") or []
-        active = next((m for m in maps if m.get("isActiveMap")), maps[0] if maps else None)
+        active = find_active_map(context)
         if not active:
             console.print("[yellow]No maps found[/yellow]")
             return
         map_name = active.get("name")
 
-    if map_name:
-        layers = [l for l in layers if l.get("mapName", "").lower() == str(map_name).lower()]
+    hits = None
+    if bbox is not None:
+        from ..spatial import load_spatial_index
+
+        hits = set(load_spatial_index(arcgispro_path).layers_intersecting(bbox, wkid))
+
+    def in_bbox(records):
+        if hits is None:
+            return records
+        # Index positions follow the record order of layers.json
+        return (rec for i, rec in enumerate(records) if i in hits)
 
-    if broken:
-        layers = [l for l in layers if l.get("isBroken")]
-    
     if as_json:
-        console.print(json_lib.dumps(layers, indent=2))
+        with span("filter"):
+            layers = [
+                load_record_details(arcgispro_path, "layers", l)
+                for l in filter_records(in_bbox(context.get("layers") or []), map_name, broken)
+            ]
+        _print_json(layers)
         return
     
-    if not layers:
+    table = _layers_table()
+    
+    # The table only shows summary columns: skip the (potentially huge)
+    # fields/sampleData values, streaming only very large uncached files.
+    records = context.records("layers", exclude=HEAVY_RECORD_KEYS)
+    try:
+        with span("filter"):
+            for layer in filter_records(in_bbox(records), map_name, broken):
+                table.add_row(*_layer_row(layer))
+    except ValueError:
+        # Invalid layers.json: treat like the missing-file case
+        table = None
+    
+    if table is None or not table.rows:
         msg = "No layers found"
         if broken:
             msg = "No broken layers found"
         console.print(f"[yellow]{msg}[/yellow]")
         return
     
-    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
-    table.add_column("Layer", style="cyan")
-    table.add_column("Map")
-    table.add_column("Type")
-    table.add_column("Geometry")
-    table.add_column("Features", justify="right")
-    table.add_column("V", justify="center")
-    
-    for layer in layers:
-        visible = "✓" if layer.get("isVisible") else ""
-        broken_mark = " ⚠" if layer.get("isBroken") else ""
-        feature_count = layer.get("featureCount")
-        features = f"{feature_count:,}" if feature_count is not None else "-"
-        
-        table.add_row(
-            f"{layer.get('name', 'Unknown')}{broken_mark}",
-            layer.get("mapName", "-"),
-            layer.get("layerType", "-"),
-            layer.get("geometryType", "-") or "-",
-            features,
-            visible
-        )
-    
     console.print()
     console.print(table)
     console.print()
@@ -214,24 +403,17 @@ def layers_cmd(path, map_name, active_map, broken, as_json):
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
 def layer_cmd(name, path, as_json):
     """Show details for a specific layer, including field schema."""
-    import json as json_lib
-    
     arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
-    layers = context.get("layers") or []
+    context = open_context(arcgispro_path)
+    index = get_context_index(context)
     
-    # Find the layer (case-insensitive partial match)
-    matches = [l for l in layers if name.lower() in l.get("name", "").lower()]
+    # Find the layer, preferring exact name matches over case-insensitive partial ones
+    matches = index.layers_named(name) or index.find_layers(name)
 
     if not matches:
         console.print(f"[red]Layer '{name}' not found[/red]")
         raise SystemExit(1)
 
-    # Prefer exact name matches when possible
-    exact = [l for l in matches if l.get("name", "").lower() == name.lower()]
-    if exact:
-        matches = exact
-
     # If still ambiguous (multiple distinct layer names), force the user to disambiguate.
     distinct_names = sorted({(l.get("name") or "").lower() for l in matches if l.get("name")})
     if len(distinct_names) > 1:
@@ -242,7 +424,7 @@ def layer_cmd(name, path, as_json):
         raise SystemExit(1)
 
     # Same layer name can appear in multiple maps. Treat those as one logical layer.
-    layer = matches[0]
+    layer = load_record_details(arcgispro_path, "layers", matches[0])
     map_names = [m.get("mapName") for m in matches if m.get("mapName")]
     # Preserve order, de-dupe
     seen = set()
@@ -250,7 +432,7 @@ def layer_cmd(name, path, as_json):
 
     if as_json:
         # Keep JSON output backward compatible (single layer object)
-        console.print(json_lib.dumps(layer, indent=2))
+        _print_json(layer)
         return
 
     console.print()
@@ -265,11 +447,10 @@ def layer_cmd(name, path, as_json):
         console.print("  Map: -")
 
     # If map metadata is available, show which of the above maps are active
-    maps = context.get("maps") or []
-    if map_names and maps:
+    if map_names and index.has_maps():
         active_names = []
         for mn in map_names:
-            m = next((mm for mm in maps if (mm.get("name") or "").lower() == str(mn).lower()), None)
+            m = index.map_named(mn)
             if m and m.get("isActiveMap") is True:
                 active_names.append(mn)
 
@@ -331,21 +512,19 @@ def layer_cmd(name, path, as_json):
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
 def fields_cmd(layer_name, path, as_json):
     """Show field schema for a layer."""
-    import json as json_lib
-    
     arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
-    layers = context.get("layers") or []
+    context = open_context(arcgispro_path)
+    index = get_context_index(context)
     
     # Find the layer
-    matches = [l for l in layers if layer_name.lower() in l.get("name", "").lower()]
+    matches = index.find_layers(layer_name)
     
     if not matches:
         console.print(f"[red]Layer '{layer_name}' not found[/red]")
         raise SystemExit(1)
     
     if len(matches) > 1:
-        exact = [l for l in matches if l.get("name", "").lower() == layer_name.lower()]
+        exact = index.layers_named(layer_name)
         if exact:
             matches = exact
         else:
@@ -354,11 +533,11 @@ def fields_cmd(layer_name, path, as_json):
                 console.print(f"  • {l.get('name')}")
             raise SystemExit(1)
     
-    layer = matches[0]
+    layer = load_record_details(arcgispro_path, "layers", matches[0])
     fields = layer.get("fields") or []
     
     if as_json:
-        console.print(json_lib.dumps(fields, indent=2))
+        _print_json(fields)
         return
     
     if not fields:
@@ -397,73 +576,73 @@ def fields_cmd(layer_name, path, as_json):
 @click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
 @click.option("--map", "-m", "map_name", help="Filter by map name")
 @click.option("--active", "active_map", is_flag=True, help="Only tables in the active map")
+@_recursive_option
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def tables_cmd(path, map_name, active_map, as_json):
+def tables_cmd(path, map_name, active_map, recursive_root, workers, as_json):
     """List standalone tables."""
-    import json as json_lib
-    
-    arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
-    tables = context.get("tables") or []
-
     # Apply filters
     if map_name and active_map:
         console.print("[red]✗[/red] Use either --map or --active (not both)")
         raise SystemExit(1)
 
+    if recursive_root:
+        _print_recursive(recursive_root, "tables", as_json, workers, map_name=map_name, active=active_map)
+        return
+
+    arcgispro_path = require_context(path)
+    context = open_context(arcgispro_path)
+
     if active_map:
-        maps = context.get("maps") or []
-        active = next((m for m in maps if m.get("isActiveMap")), maps[0] if maps else None)
+        active = find_active_map(context)
         if not active:
             console.print("[yellow]No maps found[/yellow]")
             return
         map_name = active.get("name")
 
-    if map_name:
-        tables = [t for t in tables if t.get("mapName", "").lower() == str(map_name).lower()]
-
     if as_json:
-        console.print(json_lib.dumps(tables, indent=2))
+        with span("filter"):
+            tables = [
+                load_record_details(arcgispro_path, "tables", t)
+                for t in filter_records(context.get("tables") or [], map_name)
+            ]
+        _print_json(tables)
         return
 
-    if not tables:
+    table = _tables_table()
+    
+    records = context.records("tables", exclude=HEAVY_RECORD_KEYS)
+    try:
+        with span("filter"):
+            for t in filter_records(records, map_name):
+                table.add_row(*_table_row(t))
+    except ValueError:
+        table = None
+
+    if table is None or not table.rows:
         console.print("[yellow]No standalone tables found[/yellow]")
         return
     
     console.print()
-    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
-    table.add_column("Table", style="cyan")
-    table.add_column("Map")
-    table.add_column("Rows", justify="right")
-    table.add_column("Source Type")
-    
-    for t in tables:
-        row_count = t.get("rowCount")
-        rows = f"{row_count:,}" if row_count is not None else "-"
-        table.add_row(
-            t.get("name", "Unknown"),
-            t.get("mapName", "-"),
-            rows,
-            t.get("dataSourceType", "-")
-        )
-    
     console.print(table)
     console.print()
 
 
 @click.command("connections")
 @click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@_recursive_option
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def connections_cmd(path, as_json):
+def connections_cmd(path, recursive_root, workers, as_json):
     """List data connections (geodatabases, folders)."""
-    import json as json_lib
-    
+    if recursive_root:
+        _print_recursive(recursive_root, "connections", as_json, workers)
+        return
+
     arcgispro_path = require_context(path)
-    context = load_context_files(arcgispro_path)
+    context = open_context(arcgispro_path)
     connections = context.get("connections") or []
     
     if as_json:
-        console.print(json_lib.dumps(connections, indent=2))
+        _print_json(connections)
         return
     
     if not connections:
@@ -471,17 +650,10 @@ def connections_cmd(path, as_json):
         return
     
     console.print()
-    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
-    table.add_column("Name", style="cyan")
-    table.add_column("Type")
-    table.add_column("Path")
+    table = _connections_table()
     
     for conn in connections:
-        table.add_row(
-            conn.get("name", "Unknown"),
-            conn.get("connectionType", "-"),
-            conn.get("path", "-")
-        )
+        table.add_row(*_connection_row(conn))
     
     console.print(table)
     console.print()
@@ -512,7 +684,6 @@ def status_cmd(path, strict, as_json):
     This is intentionally "doctor-lite": it tries to detect common export problems and
     prints clear next steps.
     """
-    import json as json_lib
     from datetime import datetime, timezone
     from ..paths import list_image_files, get_context_folder, get_snapshot_folder, get_images_folder
 
@@ -581,14 +752,8 @@ def status_cmd(path, strict, as_json):
 
     # File validation (existence + JSON parse)
     files = [
-        ("meta.json", arcgispro_path / "meta.json", context.get("meta")),
-        ("project.json", context_dir / "project.json", context.get("project")),
-        ("maps.json", context_dir / "maps.json", context.get("maps")),
-        ("layers.json", context_dir / "layers.json", context.get("layers")),
-        ("tables.json", context_dir / "tables.json", context.get("tables")),
-        ("connections.json", context_dir / "connections.json", context.get("connections")),
-        ("layouts.json", context_dir / "layouts.json", context.get("layouts")),
-        ("geoprocessing.json", context_dir / "geoprocessing.json", context.get("geoprocessing")),
+        (context.path_for(key).name, context.path_for(key), context.get(key))
+        for key in CONTEXT_FILES
     ]
 
     file_results = []
@@ -632,7 +797,7 @@ def status_cmd(path, strict, as_json):
     }
 
     if as_json:
-        console.print(json_lib.dumps(summary, indent=2))
+        _print_json(summary)
         if strict and problems:
             raise SystemExit(1)
         return
@@ -0,0 +1,140 @@
+"""samples command - Export sample rows as CSV, NDJSON, Parquet or Arrow."""
+
+import click
+from rich.console import Console
+from pathlib import Path
+
+from ..paths import find_arcgispro_folder
+from ..samples import FORMATS
+
+console = Console(stderr=True)
+
+
+@click.command("samples")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--all", "all_records", is_flag=True, help="Every layer (or table) with sample rows")
+@click.option("--tables", is_flag=True, help="Read standalone tables instead of layers")
+@click.option("--map", "-m", "map_name", help="Only layers/tables of this map")
+@click.option("--columns", "-c", help="Comma-separated attribute columns to keep")
+@click.option("--geometry", is_flag=True, help="Add the GeoJSON geometry as a _geometry column")
+@click.option("--format", "-f", "fmt", type=click.Choice(FORMATS),
+              help="Output format (default: from the --output suffix, else CSV)")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write to this file instead of stdout")
+@click.argument("name", required=False)
+def samples_cmd(path, all_records, tables, map_name, columns, geometry, fmt, output, name):
+    """Export the sample rows of a layer (or --all) in columnar form.
+
+    Rows are typed by the layer's field schema and prefixed with _map and
+    _name columns. Parquet and Arrow output need pyarrow
+    (pip install pyarrow); a file without a known suffix is written as
+    Parquet when it is installed, CSV otherwise.
+
+    With --columns only those attributes are copied out of each layer and
+    CSV output skips the first pass over the field schemas. Geometries are
+    left out unless --geometry is given.
+
+    \b
+    Examples:
+        arcgis samples Parcels
+        arcgis samples --all -c PARCEL_ID,OWNER,ACRES -o parcels.parquet
+        arcgis samples --tables --all -f ndjson > rows.ndjson
+    """
+    import io
+    import sys
+
+    from ..samples import (
+        ARROW_FORMATS,
+        SampleSourceError,
+        collect_schema,
+        format_for,
+        iter_sample_batches,
+        output_columns,
+        project,
+        pyarrow_available,
+        write_arrow,
+        write_csv,
+        write_ndjson,
+    )
+
+    if bool(name) == all_records:
+        raise click.UsageError("Give a layer name or --all")
+
+    fmt = format_for(output, fmt)
+    if fmt in ARROW_FORMATS:
+        if not output:
+            raise click.UsageError(f"{fmt} output needs --output")
+        if not pyarrow_available():
+            console.print(f"[red]✗[/red] {fmt} output needs pyarrow (pip install pyarrow); use -f csv or -f ndjson")
+            raise SystemExit(1)
+
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        console.print("  Run the Snapshot export from ArcGIS Pro first.")
+        raise SystemExit(1)
+
+    kind = "tables" if tables else "layers"
+    wanted = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    options = dict(kind=kind, name=name, map_name=map_name)
+
+    try:
+        # NDJSON rows carry their own keys; the other formats need the columns up front
+        schema = None
+        if fmt != "ndjson":
+            if wanted is not None and fmt == "csv":
+                schema = project([], wanted)
+            else:
+                schema = project(collect_schema(arcgispro_path, **options), wanted)
+            schema = output_columns(schema, geometry)
+        batches = iter_sample_batches(arcgispro_path, columns=wanted, geometry=geometry, **options)
+
+        if fmt in ARROW_FORMATS:
+            try:
+                rows = write_arrow(batches, schema, Path(output), fmt)
+            except SampleSourceError:
+                raise
+            except ValueError as e:  # pyarrow.ArrowInvalid: a value that doesn't fit its column
+                console.print(f"[red]✗[/red] Can't convert the sample rows to {fmt}: {e}")
+                raise SystemExit(1)
+        else:
+            if output:
+                out = open(output, "w", encoding="utf-8", newline="")
+            else:
+                sys.stdout.flush()
+                out = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=True)
+            try:
+                rows = write_csv(batches, schema, out) if fmt == "csv" else write_ndjson(batches, out)
+            finally:
+                if output:
+                    out.close()
+                else:
+                    out.detach()
+    except SampleSourceError as e:
+        console.print(f"[red]✗[/red] {e}")
+        raise SystemExit(1)
+    except BrokenPipeError:
+        # The reader stopped early (e.g. `| head`): exit quietly, and keep the
+        # interpreter's final flush of stdout from failing again
+        _silence_stdout()
+        raise SystemExit(1)
+    except OSError as e:
+        console.print(f"[red]✗[/red] Can't write {output or 'to stdout'}: {e}")
+        raise SystemExit(1)
+
+    if name and not rows:
+        console.print(f"[yellow]No sample rows for {name}[/yellow]")
+    elif output:
+        console.print(f"[green]✓[/green] Wrote {rows:,} row(s) to {output} ({fmt})")
+
+
+def _silence_stdout():
+    import io
+    import os
+    import sys
+
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    except (OSError, ValueError, io.UnsupportedOperation):
+        pass
@@ -0,0 +1,71 @@
+"""search command - Ranked full-text search over the export."""
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich import box
+from pathlib import Path
+
+from ..paths import find_arcgispro_folder
+from ..search import SEARCH_KINDS
+
+console = Console()
+
+
+@click.command("search")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--kind", "-k", "kinds", multiple=True, type=click.Choice(SEARCH_KINDS),
+              help="Only results of this kind (repeatable)")
+@click.option("--limit", "-n", type=click.IntRange(1), default=20, show_default=True, help="Maximum results")
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+@click.argument("terms", nargs=-1, required=True)
+def search_cmd(path, kinds, limit, as_json, terms):
+    """Search layers, tables, fields and notebooks by relevance.
+
+    Matches layer and table names, definition queries and data source
+    paths, field names, aliases and domains, and notebook descriptions.
+    CamelCase and snake_case names are split into words, and a word that
+    matches nothing is treated as a prefix.
+
+    \b
+    Examples:
+        arcgis search parcel id
+        arcgis search -k field owner
+        arcgis search roads --json
+    """
+    import json as json_lib
+
+    from ..search import load_search_index
+
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        console.print("  Run the Snapshot export from ArcGIS Pro first.")
+        raise SystemExit(1)
+
+    query = " ".join(terms)
+    hits = load_search_index(arcgispro_path).search(query, kinds=kinds or None, limit=limit)
+
+    if as_json:
+        click.echo(json_lib.dumps([h.to_dict() for h in hits], indent=2))
+        return
+
+    if not hits:
+        console.print(f"[yellow]No matches for[/yellow] {query}")
+        return
+
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
+    table.add_column("Score", justify="right", style="dim")
+    table.add_column("Kind")
+    table.add_column("Name", style="cyan")
+    table.add_column("In")
+    table.add_column("Detail", style="dim", overflow="fold")
+    for hit in hits:
+        where = " › ".join(part for part in (hit.map_name, hit.owner) if part)
+        table.add_row(f"{hit.score:.2f}", hit.kind, Text(hit.name), Text(where), Text(hit.detail or ""))
+
+    console.print()
+    console.print(table)
+    console.print()
@@ -0,0 +1,75 @@
+"""serve command - Keep the parsed context in memory for fast queries."""
+
+import click
+from rich.console import Console
+from pathlib import Path
+
+from ..daemon import DaemonError, QueryServer, connect
+from ..paths import find_arcgispro_folder
+
+console = Console()
+
+
+@click.command("serve")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--status", "show_status", is_flag=True, help="Check whether a daemon is running")
+@click.option("--stop", is_flag=True, help="Stop the running daemon")
+@click.option("--poll-interval", type=float, default=1.0, show_default=True,
+              help="Seconds between checks for re-exported context files")
+def serve_cmd(path, show_status, stop, poll_interval):
+    """Run a query daemon that keeps the context in memory.
+
+    While it runs, query commands (layers, layer, fields, map, ...) for
+    this export are answered by the daemon instead of re-reading the JSON
+    files. Re-exports from ArcGIS Pro are picked up automatically. Runs in
+    the foreground; press Ctrl+C to stop.
+
+    \b
+    Examples:
+        arcgis serve              # Start (leave running in another terminal)
+        arcgis serve --status     # Is a daemon running?
+        arcgis serve --stop       # Stop it
+    """
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        console.print("  Run the Snapshot export from ArcGIS Pro first.")
+        raise SystemExit(1)
+
+    client = connect(arcgispro_path)
+    info = None
+    if client is not None:
+        try:
+            info = client.call("ping")
+        except DaemonError:
+            info = None
+
+    if show_status or stop:
+        if info is None:
+            console.print("[yellow]No daemon running[/yellow]")
+            raise SystemExit(1)
+        if stop:
+            client.call("shutdown")
+            console.print(f"[green]✓[/green] Stopped daemon (pid {info['pid']})")
+            return
+        console.print(f"[green]✓[/green] Daemon running (pid {info['pid']})")
+        console.print(f"  Serving: {info['path']}")
+        console.print(f"  Requests: {info['requests']} | Reloads: {info['reloads']}")
+        return
+
+    if info is not None:
+        console.print(f"[yellow]A daemon is already running (pid {info['pid']})[/yellow]")
+        raise SystemExit(1)
+
+    server = QueryServer(arcgispro_path, poll_interval=poll_interval)
+    server.warm()
+    console.print(f"[green]✓[/green] Serving {arcgispro_path}")
+    console.print(f"  Address: [dim]{server.address}[/dim]")
+    console.print("  Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    console.print("[dim]Daemon stopped.[/dim]")
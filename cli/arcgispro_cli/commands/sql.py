@@ -0,0 +1,153 @@
+"""index and sql commands - Query the context with SQL."""
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich import box
+from pathlib import Path
+
+from ..paths import find_arcgispro_folder
+
+console = Console()
+
+
+def _require_context(path):
+    start_path = Path(path) if path else None
+    arcgispro_path = find_arcgispro_folder(start_path)
+    if not arcgispro_path:
+        console.print("[red]✗[/red] No .arcgispro folder found")
+        console.print("  Run the Snapshot export from ArcGIS Pro first.")
+        raise SystemExit(1)
+    return arcgispro_path
+
+
+@click.command("index")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--force", is_flag=True, help="Rebuild even if the context files are unchanged")
+@click.option("--json", "as_json", is_flag=True, help="Output summary as JSON")
+def index_cmd(path, force, as_json):
+    """Build the SQLite database used by `arcgis sql`.
+
+    Writes maps, layers, tables, fields, connections, layouts, map frames
+    and geoprocessing history to .arcgispro/cache/context.sqlite. The
+    database is only rebuilt when a context file changed; `arcgis sql`
+    refreshes it on demand, so running this is optional.
+
+    \b
+    Examples:
+        arcgis index
+        arcgis index --force
+    """
+    import json as json_lib
+    import sqlite3
+
+    from ..sqlindex import IndexBuildError, build_index, table_counts
+
+    arcgispro_path = _require_context(path)
+    try:
+        db_path, rebuilt = build_index(arcgispro_path, force=force)
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+        try:
+            counts = table_counts(conn)
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error, IndexBuildError) as e:
+        console.print(f"[red]✗[/red] Can't build the database: {e}")
+        raise SystemExit(1)
+
+    if as_json:
+        click.echo(json_lib.dumps({"database": str(db_path), "rebuilt": rebuilt, "rows": counts}, indent=2))
+        return
+
+    console.print()
+    state = "Built" if rebuilt else "Up to date"
+    console.print(f"[green]✓[/green] {state}: [dim]{db_path}[/dim]")
+    console.print("  " + ", ".join(f"{name}: {n:,}" for name, n in counts.items()))
+    console.print()
+
+
+@click.command("sql")
+@click.option("--path", "-p", type=click.Path(exists=True), help="Path to search for .arcgispro folder")
+@click.option("--json", "as_json", is_flag=True, help="Output rows as a JSON array of objects")
+@click.option("--csv", "as_csv", is_flag=True, help="Output rows as CSV with a header line")
+@click.option("--schema", is_flag=True, help="Print the database schema instead of running a query")
+@click.argument("query", required=False)
+def sql_cmd(path, as_json, as_csv, schema, query):
+    """Run a read-only SQL query against the exported context.
+
+    Tables: project, maps, layers, tables, fields, connections, layouts,
+    map_frames, geoprocessing. Views layer_fields and table_fields join
+    fields to their layer or table. Name columns compare
+    case-insensitively. The database is rebuilt first if the export
+    changed.
+
+    \b
+    Examples:
+        arcgis sql "SELECT name, feature_count FROM layers WHERE is_broken"
+        arcgis sql "SELECT map_name, layer_name FROM layer_fields
+                    WHERE field_name = 'PARCEL_ID' AND feature_count > 1000000"
+        arcgis sql --csv "SELECT * FROM connections" > connections.csv
+        arcgis sql --schema
+    """
+    import csv
+    import io
+    import json as json_lib
+    import sqlite3
+
+    from ..sqlindex import IndexBuildError, connect
+
+    if as_json and as_csv:
+        raise click.UsageError("--json and --csv are mutually exclusive")
+    if not schema and not query:
+        raise click.UsageError("Missing argument 'QUERY'")
+
+    arcgispro_path = _require_context(path)
+    try:
+        conn = connect(arcgispro_path)
+    except (OSError, sqlite3.Error, IndexBuildError) as e:
+        console.print(f"[red]✗[/red] Can't build the database: {e}")
+        raise SystemExit(1)
+    try:
+        if schema:
+            rows = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name != 'sources' ORDER BY rowid"
+            )
+            for (statement,) in rows:
+                click.echo(statement + ";")
+            return
+        try:
+            cursor = conn.execute(query)
+            columns = [d[0] for d in cursor.description or ()]
+            rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            console.print(f"[red]✗[/red] {e}")
+            raise SystemExit(1)
+    finally:
+        conn.close()
+
+    if as_json:
+        click.echo(json_lib.dumps([dict(zip(columns, row)) for row in rows], indent=2))
+        return
+
+    if as_csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
+        click.echo(buffer.getvalue(), nl=False)
+        return
+
+    if not columns:
+        return
+
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold")
+    for name in columns:
+        table.add_column(name)
+    for row in rows:
+        table.add_row(*(Text("NULL", style="dim") if v is None else Text(str(v)) for v in row))
+
+    console.print()
+    console.print(table)
+    console.print(f"[dim]{len(rows)} row(s)[/dim]")
+    console.print()
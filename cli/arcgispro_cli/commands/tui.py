@@ -4,8 +4,9 @@ import click
 @click.command("tui", help="Launch the interactive Textual UI")
 @click.option("--repo", default=".", help="Working directory (optional)")
 @click.option("--no-banner", is_flag=True, help="Disable the ASCII banner")
-def tui_cmd(repo: str, no_banner: bool) -> None:
+@click.option("--no-watch", is_flag=True, help="Don't pick up new Snapshots automatically")
+def tui_cmd(repo: str, no_banner: bool, no_watch: bool) -> None:
     """Start the ArcGIS Pro TUI."""
     from arcgispro_cli.tui.app import ArcGISProCLIApp
 
-    ArcGISProCLIApp(repo_path=repo, show_banner=(not no_banner)).run()
+    ArcGISProCLIApp(repo_path=repo, show_banner=(not no_banner), watch=(not no_watch)).run()
@@ -0,0 +1,397 @@
+"""Resident query daemon for the exported context.
+
+``arcgis serve`` keeps one parsed ``LazyContext`` (and its ``ContextIndex``)
+in memory and answers requests over a local socket: a Unix domain socket on
+POSIX, a named pipe on Windows (both via ``multiprocessing.connection``).
+Requests and responses are JSON objects.
+
+The daemon advertises itself in ``.arcgispro/cache/daemon.json`` (address and
+a per-run auth key). Query commands call ``open_context``, which returns a
+``RemoteContext`` when a daemon answers and falls back to reading the files
+directly otherwise. Set ``ARCGISPRO_CLI_NO_DAEMON=1`` to never use a daemon.
+
+Re-exports are picked up by polling the context files (``watch.ContextWatcher``).
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .cache import get_cache_folder
+from .paths import CONTEXT_FILES, LazyContext, load_context_files
+from .profiling import profiled, span
+
+DAEMON_INFO_FILENAME = "daemon.json"
+
+# Seconds between polls of the context files for re-exports
+POLL_INTERVAL = 1.0
+
+# ContextIndex methods that clients may call remotely
+INDEX_METHODS = {
+    "has_maps",
+    "map_named",
+    "map_by_id",
+    "active_map",
+    "layers_named",
+    "layer_by_id",
+    "layers_in_map",
+    "layer_count",
+    "find_layers",
+    "tables_named",
+    "table_by_id",
+    "tables_in_map",
+}
+
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be reached or reports an error."""
+
+
+def get_daemon_info_path(arcgispro_path: Path) -> Path:
+    """Get the file advertising a running daemon for this export."""
+    return get_cache_folder(arcgispro_path) / DAEMON_INFO_FILENAME
+
+
+def daemon_address(arcgispro_path: Path):
+    """Return (address, family) for the daemon serving ``arcgispro_path``."""
+    digest = hashlib.sha1(str(arcgispro_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    if sys.platform == "win32":
+        return rf"\\.\pipe\arcgispro-cli-{digest}", "AF_PIPE"
+    # Unix socket paths are length-limited, so keep them out of deep project folders
+    return os.path.join(tempfile.gettempdir(), f"arcgispro-cli-{digest}.sock"), "AF_UNIX"
+
+
+def daemon_enabled() -> bool:
+    """Return False when ARCGISPRO_CLI_NO_DAEMON is set to a truthy value."""
+    value = os.getenv("ARCGISPRO_CLI_NO_DAEMON")
+    if not value:
+        return True
+    return value.strip().lower() in {"0", "false", "no", ""}
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+
+class DaemonClient:
+    """Connection to a running daemon."""
+
+    def __init__(self, conn, arcgispro_path: Path):
+        self._conn = conn
+        self.arcgispro_path = arcgispro_path
+
+    def call(self, op: str, **params: Any) -> Any:
+        """Send one request and return its result."""
+        try:
+            with span("daemon call"):
+                self._conn.send_bytes(json.dumps({"op": op, **params}).encode("utf-8"))
+                response = json.loads(self._conn.recv_bytes().decode("utf-8"))
+        except (OSError, EOFError, ValueError) as e:
+            raise DaemonError(f"Daemon request failed: {e}") from e
+        if not response.get("ok"):
+            raise DaemonError(response.get("error") or "Daemon request failed")
+        return response.get("result")
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except OSError:
+            pass
+
+
+def read_daemon_info(arcgispro_path: Path) -> Optional[Dict[str, Any]]:
+    """Return the advertised daemon info, or None."""
+    try:
+        with open(get_daemon_info_path(arcgispro_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def connect(arcgispro_path: Path) -> Optional[DaemonClient]:
+    """Connect to the daemon serving ``arcgispro_path``, or return None."""
+    info = read_daemon_info(arcgispro_path)
+    if not info:
+        return None
+
+    from multiprocessing.connection import Client
+
+    try:
+        conn = Client(info["address"], family=info["family"], authkey=bytes.fromhex(info["authkey"]))
+    except Exception:
+        # Nothing listening, stale info file, or AuthenticationError from a
+        # daemon that restarted with a new key
+        return None
+    return DaemonClient(conn, arcgispro_path)
+
+
+class RemoteIndex:
+    """``ContextIndex`` stand-in whose lookups run in the daemon."""
+
+    def __init__(self, context: "RemoteContext"):
+        self._context = context
+
+    def __getattr__(self, name: str):
+        if name not in INDEX_METHODS:
+            raise AttributeError(name)
+
+        def lookup(*args):
+            local = self._context.local
+            if local is None:
+                try:
+                    return self._context.client.call("index", method=name, args=list(args))
+                except DaemonError:
+                    local = self._context.fall_back()
+            return getattr(local.index, name)(*args)
+
+        return lookup
+
+
+class RemoteContext(Mapping):
+    """
+    ``LazyContext`` counterpart backed by a daemon.
+
+    Keys are fetched from the daemon on first access; ``records`` and
+    ``index`` lookups are answered by the daemon so only the needed records
+    cross the socket. If the daemon stops answering (it exited, restarted
+    or timed out after the first ping), the rest of the invocation reads the
+    files directly.
+    """
+
+    def __init__(self, client: DaemonClient):
+        self.client = client
+        self.arcgispro_path = client.arcgispro_path
+        self.touched: List[str] = []
+        self.local: Optional[LazyContext] = None
+        self._values: Dict[str, Any] = {}
+        self.index = RemoteIndex(self)
+
+    def fall_back(self) -> LazyContext:
+        """Stop using the daemon and return the direct-read context."""
+        if self.local is None:
+            self.client.close()
+            self.local = load_context_files(self.arcgispro_path)
+        return self.local
+
+    def path_for(self, key: str) -> Path:
+        return LazyContext(self.arcgispro_path).path_for(key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in CONTEXT_FILES:
+            raise KeyError(key)
+        if key not in self._values:
+            value = None
+            if self.local is None:
+                try:
+                    value = self.client.call("get", key=key)
+                except DaemonError:
+                    self.fall_back()
+            if self.local is not None:
+                value = self.local.get(key)
+            self._values[key] = value
+            self.touched.append(key)
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CONTEXT_FILES)
+
+    def __len__(self) -> int:
+        return len(CONTEXT_FILES)
+
+    def records(self, key: str, exclude: Iterable[str] = ()) -> Iterator[Dict[str, Any]]:
+        if self.local is None:
+            try:
+                rows = self.client.call("get", key=key, exclude=list(exclude))
+            except DaemonError:
+                self.fall_back()
+            else:
+                yield from rows or []
+                return
+        yield from self.local.records(key, exclude=exclude)
+
+
+@profiled("daemon")
+def open_context(arcgispro_path: Path) -> Mapping:
+    """
+    Return the context for ``arcgispro_path``, served by a daemon if one runs.
+
+    Falls back to ``paths.load_context_files`` when no daemon answers.
+    """
+    if daemon_enabled():
+        client = connect(arcgispro_path)
+        if client is not None:
+            try:
+                client.call("ping")
+                return RemoteContext(client)
+            except DaemonError:
+                client.close()
+    return load_context_files(arcgispro_path)
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+
+
+class QueryServer:
+    """Serve one export's context to CLI clients until stopped."""
+
+    def __init__(self, arcgispro_path: Path, poll_interval: float = POLL_INTERVAL):
+        from .watch import ContextWatcher
+
+        self.arcgispro_path = arcgispro_path
+        self.address, self.family = daemon_address(arcgispro_path)
+        self.authkey = secrets.token_bytes(32)
+        self.poll_interval = poll_interval
+        self.context = load_context_files(arcgispro_path)
+        self.watcher = ContextWatcher(self.context)
+        self.requests = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._listener = None
+
+    # -- Lifecycle -------------------------------------------------------
+
+    def warm(self) -> None:
+        """Parse every context file and build the index up front."""
+        with self._lock:
+            for key in CONTEXT_FILES:
+                self.context.get(key)
+            self.context.index
+
+    def write_info(self) -> None:
+        info = {
+            "address": self.address,
+            "family": self.family,
+            "authkey": self.authkey.hex(),
+            "pid": os.getpid(),
+            "startedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        info_path = get_daemon_info_path(self.arcgispro_path)
+        info_path.parent.mkdir(parents=True, exist_ok=True)
+        info_path.write_text(json.dumps(info, indent=2), encoding="utf-8")
+
+    def _remove_info(self) -> None:
+        info = read_daemon_info(self.arcgispro_path)
+        if info and info.get("pid") == os.getpid():
+            try:
+                get_daemon_info_path(self.arcgispro_path).unlink()
+            except OSError:
+                pass
+
+    def serve_forever(self) -> None:
+        """Accept connections until ``stop`` is called or a shutdown request arrives."""
+        from multiprocessing.connection import Listener
+
+        if self.family == "AF_UNIX" and os.path.exists(self.address):
+            # Left behind by a daemon that didn't shut down cleanly
+            os.unlink(self.address)
+
+        self._listener = Listener(self.address, family=self.family, authkey=self.authkey)
+        self.write_info()
+        threading.Thread(target=self._poll_loop, daemon=True).start()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn = self._listener.accept()
+                except Exception:
+                    # Failed handshake or listener closed during shutdown
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            self._remove_info()
+
+    def stop(self) -> None:
+        """Stop accepting connections (safe to call from any thread)."""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        # Wake the blocking accept() with a throwaway connection
+        from multiprocessing.connection import Client
+
+        try:
+            Client(self.address, family=self.family, authkey=self.authkey).close()
+        except Exception:
+            pass
+
+    def _poll_loop(self) -> None:
+        while not self._stopping.wait(self.poll_interval):
+            self.poll()
+
+    def poll(self) -> List[str]:
+        """Invalidate re-exported files; re-advertise if the info file was deleted."""
+        with self._lock:
+            changed = self.watcher.poll_and_invalidate()
+            if changed:
+                self.reloads += 1
+        if self.arcgispro_path.is_dir() and not get_daemon_info_path(self.arcgispro_path).exists():
+            # A Snapshot replaces the whole .arcgispro folder, cache included
+            try:
+                self.write_info()
+            except OSError:
+                pass
+        return changed
+
+    # -- Requests --------------------------------------------------------
+
+    def _serve_connection(self, conn) -> None:
+        with conn:
+            while True:
+                try:
+                    raw = conn.recv_bytes()
+                except (EOFError, OSError):
+                    return
+                if self._stopping.is_set():
+                    # Stopped: hang up so the client reads the files itself
+                    return
+                try:
+                    result = self.handle(json.loads(raw.decode("utf-8")))
+                    response = {"ok": True, "result": result}
+                except Exception as e:
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                try:
+                    conn.send_bytes(json.dumps(response).encode("utf-8"))
+                except OSError:
+                    return
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        """Answer one request dict."""
+        op = request.get("op")
+        with self._lock:
+            self.requests += 1
+            if op == "ping":
+                return {
+                    "pid": os.getpid(),
+                    "path": str(self.arcgispro_path),
+                    "requests": self.requests,
+                    "reloads": self.reloads,
+                    "loaded": list(self.context.touched),
+                }
+            if op == "get":
+                key = request["key"]
+                if key not in CONTEXT_FILES:
+                    raise KeyError(key)
+                exclude = request.get("exclude")
+                if exclude:
+                    return list(self.context.records(key, exclude=exclude))
+                return self.context.get(key)
+            if op == "index":
+                method = request.get("method")
+                if method not in INDEX_METHODS:
+                    raise ValueError(f"Unknown index method: {method}")
+                return getattr(self.context.index, method)(*request.get("args", []))
+        if op == "shutdown":
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {"stopping": True}
+        raise ValueError(f"Unknown op: {op}")
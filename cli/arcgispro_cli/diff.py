@@ -0,0 +1,295 @@
+"""Structural diff between two exports, keyed on stable IDs.
+
+ProExporter gives maps, layers and tables deterministic ids, so two
+snapshots can be lined up record by record (``watch.keyed_records``).
+Each record is reduced to a digest of its content minus the volatile keys
+(export time, sample rows); records whose digests match are skipped
+without looking inside them, and only the remaining ones are compared key
+by key and field by field:
+
+    >>> from arcgispro_cli.diff import diff_snapshots
+    >>> result = diff_snapshots(old_arcgispro_path, new_arcgispro_path)
+    >>> [c.name for c in result.kinds["layers"].changed]
+
+Digests are kept in ``.arcgispro/cache/diff.<kind>.pickle`` next to each
+snapshot, keyed by the file stamp, so diffing against an unchanged
+snapshot again does not rehash it.
+"""
+
+import hashlib
+import marshal
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .cache import CACHE_FORMAT, MISS, cache_enabled, file_stamp, get_cache_folder, read_entry, write_entry
+from .paths import load_context_files
+from .profiling import span
+from .watch import keyed_records
+
+# Bump when the persisted digests change.
+DIFF_FORMAT = 1
+
+DIFF_KINDS = ("maps", "layers", "tables")
+
+# Keys that change on every export without the project changing
+VOLATILE_KEYS = ("exportedAt", "sampleData", "selectionCount")
+
+_MISSING = object()
+
+
+def resolve_snapshot(path: Path) -> Optional[Path]:
+    """
+    Return the .arcgispro folder of a snapshot path, or None.
+
+    Accepts a project folder (containing .arcgispro), the .arcgispro folder
+    itself or its context folder.
+    """
+    path = Path(path)
+    if (path / ".arcgispro" / "context").is_dir():
+        return path / ".arcgispro"
+    if (path / "context").is_dir():
+        return path
+    if path.name == "context" and path.is_dir():
+        return path.parent
+    return None
+
+
+@dataclass
+class Change:
+    """One differing key of a record or field."""
+
+    key: str
+    old: Any = None
+    new: Any = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"key": self.key, "old": self.old, "new": self.new}
+
+
+@dataclass
+class FieldChange:
+    name: str
+    changes: List[Change]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "changes": [c.to_dict() for c in self.changes]}
+
+
+@dataclass
+class RecordChange:
+    """A record present in both snapshots whose content differs."""
+
+    key: str
+    name: str
+    map_name: Optional[str]
+    changes: List[Change] = field(default_factory=list)
+    fields_added: List[str] = field(default_factory=list)
+    fields_removed: List[str] = field(default_factory=list)
+    fields_changed: List[FieldChange] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "mapName": self.map_name,
+            "changes": [c.to_dict() for c in self.changes],
+            "fields": {
+                "added": self.fields_added,
+                "removed": self.fields_removed,
+                "changed": [f.to_dict() for f in self.fields_changed],
+            },
+        }
+
+
+@dataclass
+class KindDiff:
+    """Added, removed and changed records of one kind."""
+
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[RecordChange] = field(default_factory=list)
+    unchanged: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "changed": [c.to_dict() for c in self.changed],
+            "unchanged": self.unchanged,
+        }
+
+
+@dataclass
+class SnapshotDiff:
+    kinds: Dict[str, KindDiff]
+
+    def __bool__(self) -> bool:
+        return any(self.kinds.values())
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {
+            kind: {
+                "added": len(d.added),
+                "removed": len(d.removed),
+                "changed": len(d.changed),
+                "fieldsAdded": sum(len(c.fields_added) for c in d.changed),
+                "fieldsRemoved": sum(len(c.fields_removed) for c in d.changed),
+                "fieldsChanged": sum(len(c.fields_changed) for c in d.changed),
+            }
+            for kind, d in self.kinds.items()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), **{kind: d.to_dict() for kind, d in self.kinds.items()}}
+
+
+def _strip(record: Dict[str, Any], ignore: Sequence[str]) -> Dict[str, Any]:
+    return {k: v for k, v in record.items() if k not in ignore}
+
+
+def record_digest(record: Dict[str, Any], ignore: Sequence[str] = VOLATILE_KEYS) -> bytes:
+    """
+    Digest of a record's content without the ``ignore`` keys.
+
+    marshal is used for speed; it follows key order, so records whose keys
+    were merely reordered get different digests and are then found equal by
+    the key-by-key comparison.
+    """
+    stripped = _strip(record, ignore)
+    try:
+        data = marshal.dumps(stripped)
+    except ValueError:
+        data = repr(stripped).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class _Side:
+    """
+    One snapshot's records of a kind, keyed and digested.
+
+    ``records`` are stripped of the ignored keys; they and the digests are
+    cached together, so the (large) sample rows are not even read back when
+    the snapshot has not changed since it was last diffed.
+    """
+
+    def __init__(self, arcgispro_path: Path, kind: str, ignore: Tuple[str, ...]):
+        context = load_context_files(arcgispro_path)
+        source = context.path_for(kind)
+        header = (CACHE_FORMAT, DIFF_FORMAT, source.name, file_stamp(source), ignore)
+        entry = get_cache_folder(arcgispro_path) / f"diff.{kind}.pickle"
+        use_cache = cache_enabled() and header[3] is not None
+
+        cached = read_entry(entry, header) if use_cache else MISS
+        if cached is not MISS:
+            self.records, self.digests = cached
+            return
+        self.records = self._load(context, arcgispro_path, kind, ignore)
+        self.digests = {key: record_digest(rec, ()) for key, rec in self.records.items()}
+        if use_cache:
+            write_entry(entry, header, (self.records, self.digests))
+
+    @staticmethod
+    def _load(context, arcgispro_path: Path, kind: str, ignore: Tuple[str, ...]) -> Dict[str, Dict[str, Any]]:
+        from .shards import load_record_details
+
+        records = context.get(kind)
+        records = [r for r in records if isinstance(r, dict)] if isinstance(records, list) else []
+        if kind in ("layers", "tables") and context.path_for(kind).name.endswith(".index.json"):
+            # Compacted export: the fields live in the shards
+            records = [load_record_details(arcgispro_path, kind, r) for r in records]
+        return {key: _strip(rec, ignore) for key, rec in keyed_records(records).items()}
+
+
+def _summary(record: Dict[str, Any]) -> Dict[str, Any]:
+    out = {"name": record.get("name")}
+    for key in ("id", "mapName", "layerType", "geometryType", "dataSourcePath"):
+        if record.get(key) is not None:
+            out[key] = record[key]
+    return out
+
+
+def _changes(old: Dict[str, Any], new: Dict[str, Any], ignore: Sequence[str]) -> List[Change]:
+    changes = []
+    for key in list(old) + [k for k in new if k not in old]:
+        if key in ignore:
+            continue
+        a, b = old.get(key, _MISSING), new.get(key, _MISSING)
+        if a != b:
+            changes.append(Change(key, None if a is _MISSING else a, None if b is _MISSING else b))
+    return changes
+
+
+def _keyed_fields(fields: Any) -> Dict[str, Dict[str, Any]]:
+    keyed = {}
+    for f in fields if isinstance(fields, list) else ():
+        if isinstance(f, dict):
+            keyed.setdefault(str(f.get("name") or "").lower(), f)
+    return keyed
+
+
+def compare_records(key: str, old: Dict[str, Any], new: Dict[str, Any],
+                    ignore: Sequence[str] = VOLATILE_KEYS) -> Optional[RecordChange]:
+    """Key-by-key and field-by-field differences (None when equal)."""
+    change = RecordChange(key, str(new.get("name") or ""), new.get("mapName"),
+                          _changes(old, new, tuple(ignore) + ("fields",)))
+    old_fields, new_fields = old.get("fields"), new.get("fields")
+    if old_fields != new_fields:
+        before, after = _keyed_fields(old_fields), _keyed_fields(new_fields)
+        change.fields_added = [after[k].get("name") for k in after if k not in before]
+        change.fields_removed = [before[k].get("name") for k in before if k not in after]
+        for k, f in after.items():
+            if k in before and before[k] != f:
+                changes = _changes(before[k], f, ignore)
+                if changes:
+                    change.fields_changed.append(FieldChange(str(f.get("name")), changes))
+        if not (change.fields_added or change.fields_removed) and list(before) != list(after):
+            change.changes.append(Change("fields (order)", [f.get("name") for f in before.values()],
+                                         [f.get("name") for f in after.values()]))
+    if change.changes or change.fields_added or change.fields_removed or change.fields_changed:
+        return change
+    return None
+
+
+def diff_kind(old: _Side, new: _Side, ignore: Sequence[str]) -> KindDiff:
+    result = KindDiff()
+    for key, record in new.records.items():
+        digest = old.digests.get(key)
+        if digest is None:
+            result.added.append(_summary(record))
+        elif digest == new.digests[key]:
+            result.unchanged += 1
+        else:
+            change = compare_records(key, old.records[key], record, ignore)
+            if change is None:
+                result.unchanged += 1
+            else:
+                result.changed.append(change)
+    result.removed = [_summary(rec) for key, rec in old.records.items() if key not in new.records]
+    return result
+
+
+def diff_snapshots(old_path: Path, new_path: Path, kinds: Sequence[str] = DIFF_KINDS,
+                   ignore: Sequence[str] = VOLATILE_KEYS) -> SnapshotDiff:
+    """
+    Compare two exports.
+
+    Args:
+        old_path: .arcgispro folder of the older snapshot
+        new_path: .arcgispro folder of the newer snapshot
+        kinds: Record kinds to compare (maps, layers, tables)
+        ignore: Record keys left out of the comparison
+
+    Raises:
+        ValueError: A context file is not valid JSON
+    """
+    ignore = tuple(ignore)
+    result = {}
+    for kind in kinds:
+        with span(f"diff {kind}"):
+            result[kind] = diff_kind(_Side(old_path, kind, ignore), _Side(new_path, kind, ignore), ignore)
+    return SnapshotDiff(result)
+
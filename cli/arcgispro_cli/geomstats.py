@@ -0,0 +1,358 @@
+"""Geometry complexity of layers, measured on their sample geometries.
+
+Each layer's ``sampleData`` carries a few GeoJSON geometries. For every
+sampled feature this counts vertices and parts (rings of polygons, paths of
+lines), takes the bounding box area and estimates the size of the feature's
+Esri shape buffer. Averages over the sample are extrapolated to the layer's
+``featureCount`` to estimate how many bytes a script reading the whole layer
+will have to move, and layers above a budget are flagged.
+
+The per-feature numbers are reduced with NumPy when it is installed: the
+coordinates of all sampled features of a layer are flattened into one array
+and reduced per feature with ``ufunc.reduceat``. Without NumPy the same
+numbers are computed in plain Python.
+
+Results are cached in ``.arcgispro/cache/geomstats.pickle`` per layer stable
+id (``watch.record_key``), with a fingerprint of the sampled geometries: an
+unchanged layers.json is answered without parsing it, and after a new
+Snapshot only layers whose sample geometries changed are measured again.
+"""
+
+import hashlib
+import marshal
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import CACHE_FORMAT, MISS, cache_enabled, file_stamp, get_cache_folder, read_entry, write_entry
+from .profiling import span
+from .spatial import is_position, optional_numpy
+
+# Bump when the persisted payload changes shape.
+GEOMSTATS_FORMAT = 1
+
+GEOMSTATS_FILENAME = "geomstats.pickle"
+
+# Default for --budget / ARCGISPRO_CLI_GEOM_BUDGET
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+# Esri shape buffer layout: a point is type + coordinates; multipart shapes
+# add a 40-byte header (type, extent, counts) and a 4-byte offset per part
+POINT_HEADER_BYTES = 4
+MULTIPART_HEADER_BYTES = 40
+PART_BYTES = 4
+COORDINATE_BYTES = 8
+
+_SIZE = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*([kmgt]?i?b?)?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a byte size such as "500000", "512KB", "64MB" or "1.5GiB" (binary units).
+
+    Raises:
+        ValueError: Not a size
+    """
+    match = _SIZE.match(str(text))
+    if not match:
+        raise ValueError(f"not a size: {text!r} (e.g. 64MB)")
+    unit = (match.group(2) or "").lower()[:1]
+    return int(float(match.group(1)) * _UNITS[unit])
+
+
+def format_size(n: float) -> str:
+    """Human-readable byte size (1024-based)."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+@dataclass
+class SampleStats:
+    """Per-feature geometry statistics over a layer's sample (cached)."""
+
+    sampled: int  # sampled features with a geometry
+    vertices_mean: float
+    vertices_max: int
+    parts_mean: float
+    parts_max: int
+    area_mean: float  # bbox area, in map units squared
+    bytes_mean: float
+    bytes_max: int
+
+
+@dataclass
+class GeometryReport:
+    """Geometry complexity of one layer."""
+
+    key: str
+    name: str
+    map_name: Optional[str]
+    geometry_type: Optional[str]
+    feature_count: Optional[int]
+    stats: Optional[SampleStats]
+    estimated_bytes: Optional[int] = None
+    over_budget: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "mapName": self.map_name,
+            "geometryType": self.geometry_type,
+            "featureCount": self.feature_count,
+            **(_camel(asdict(self.stats)) if self.stats else {"sampled": 0}),
+            "estimatedBytes": self.estimated_bytes,
+            "overBudget": self.over_budget,
+        }
+
+
+def _camel(d: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for k, v in d.items():
+        head, *rest = k.split("_")
+        out[head + "".join(w.title() for w in rest)] = v
+    return out
+
+
+# -- Flattening ------------------------------------------------------------
+
+
+def _paths(value: Any, out: List[list]) -> None:
+    # Collect the innermost position lists (rings, paths, point sets)
+    if not isinstance(value, (list, tuple)) or not value:
+        return
+    if is_position(value):
+        out.append([value])
+    elif is_position(value[0]):
+        out.append(value)
+    else:
+        for item in value:
+            _paths(item, out)
+
+
+def _geometry_paths(geometry: Any) -> Tuple[List[list], bool]:
+    """Position lists of a GeoJSON geometry and whether it is a single point."""
+    paths: List[list] = []
+    if not isinstance(geometry, dict):
+        return paths, False
+    _paths(geometry.get("coordinates"), paths)
+    for part in geometry.get("geometries") or ():
+        if isinstance(part, dict):
+            _paths(part.get("coordinates"), paths)
+    return paths, geometry.get("type") == "Point"
+
+
+class _Flattened:
+    """The sampled geometries of a layer as flat per-path and per-vertex columns."""
+
+    def __init__(self, geometries: Iterable[Any]):
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+        self.path_lengths: List[int] = []
+        self.feature_paths: List[int] = []  # paths per feature
+        self.feature_dims: List[int] = []  # 2, or 3 with z/m values
+        self.feature_point: List[bool] = []
+        for geometry in geometries:
+            paths, is_point = _geometry_paths(geometry)
+            count = 0
+            dims = 2
+            for path in paths:
+                try:
+                    columns = list(zip(*path))
+                    xs, ys = columns[0], columns[1]
+                    if not all(isinstance(v, (int, float)) for v in (min(xs), max(xs), min(ys), max(ys))):
+                        raise TypeError("non-numeric coordinates")
+                except (TypeError, ValueError, IndexError):
+                    # Ragged or non-numeric positions: keep the valid ones
+                    points = [p for p in path if is_position(p)]
+                    if not points:
+                        continue
+                    xs, ys = [p[0] for p in points], [p[1] for p in points]
+                    columns = [xs, ys]
+                self.xs.extend(xs)
+                self.ys.extend(ys)
+                self.path_lengths.append(len(xs))
+                dims = max(dims, min(len(columns), 4))
+                count += 1
+            if count:
+                self.feature_paths.append(count)
+                self.feature_dims.append(dims)
+                self.feature_point.append(is_point)
+
+
+def _shape_bytes(vertices: int, parts: int, dims: int, is_point: bool) -> int:
+    if is_point:
+        return POINT_HEADER_BYTES + COORDINATE_BYTES * dims
+    # z/m values add their own range (16 bytes) per dimension beyond x/y
+    return (MULTIPART_HEADER_BYTES + PART_BYTES * parts + COORDINATE_BYTES * dims * vertices
+            + 16 * (dims - 2))
+
+
+def _stats_numpy(np, flat: _Flattened) -> SampleStats:
+    feature_paths = np.asarray(flat.feature_paths, dtype=np.int64)
+    path_lengths = np.asarray(flat.path_lengths, dtype=np.int64)
+    # Paths and vertices are stored feature by feature, so each feature is a
+    # contiguous run: reduceat over the run starts gives per-feature values
+    path_starts = np.concatenate(([0], np.cumsum(feature_paths)[:-1]))
+    vertices = np.add.reduceat(path_lengths, path_starts)
+    vertex_starts = np.concatenate(([0], np.cumsum(vertices)[:-1]))
+
+    xs = np.asarray(flat.xs, dtype=np.float64)
+    ys = np.asarray(flat.ys, dtype=np.float64)
+    width = np.maximum.reduceat(xs, vertex_starts) - np.minimum.reduceat(xs, vertex_starts)
+    height = np.maximum.reduceat(ys, vertex_starts) - np.minimum.reduceat(ys, vertex_starts)
+
+    dims = np.asarray(flat.feature_dims, dtype=np.int64)
+    is_point = np.asarray(flat.feature_point, dtype=bool)
+    multipart = (MULTIPART_HEADER_BYTES + PART_BYTES * feature_paths
+                 + COORDINATE_BYTES * dims * vertices + 16 * (dims - 2))
+    nbytes = np.where(is_point, POINT_HEADER_BYTES + COORDINATE_BYTES * dims, multipart)
+
+    return SampleStats(
+        sampled=int(len(vertices)),
+        vertices_mean=float(vertices.mean()),
+        vertices_max=int(vertices.max()),
+        parts_mean=float(feature_paths.mean()),
+        parts_max=int(feature_paths.max()),
+        area_mean=float((width * height).mean()),
+        bytes_mean=float(nbytes.mean()),
+        bytes_max=int(nbytes.max()),
+    )
+
+
+def _stats_python(flat: _Flattened) -> SampleStats:
+    vertices, areas, nbytes = [], [], []
+    path = vertex = 0
+    for parts, dims, is_point in zip(flat.feature_paths, flat.feature_dims, flat.feature_point):
+        n = sum(flat.path_lengths[path:path + parts])
+        xs, ys = flat.xs[vertex:vertex + n], flat.ys[vertex:vertex + n]
+        vertices.append(n)
+        areas.append((max(xs) - min(xs)) * (max(ys) - min(ys)))
+        nbytes.append(_shape_bytes(n, parts, dims, is_point))
+        path += parts
+        vertex += n
+    count = len(vertices)
+    return SampleStats(
+        sampled=count,
+        vertices_mean=sum(vertices) / count,
+        vertices_max=max(vertices),
+        parts_mean=sum(flat.feature_paths) / count,
+        parts_max=max(flat.feature_paths),
+        area_mean=float(sum(areas) / count),
+        bytes_mean=sum(nbytes) / count,
+        bytes_max=max(nbytes),
+    )
+
+
+def sample_stats(geometries: Iterable[Any]) -> Optional[SampleStats]:
+    """Statistics of GeoJSON geometries (None when none has coordinates)."""
+    flat = _Flattened(geometries)
+    if not flat.feature_paths:
+        return None
+    np = optional_numpy()
+    return _stats_numpy(np, flat) if np is not None else _stats_python(flat)
+
+
+# -- Layers ----------------------------------------------------------------
+
+
+def _fingerprint(geometries: List[Any]) -> str:
+    try:
+        data = marshal.dumps(geometries)
+    except ValueError:
+        data = repr(geometries).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _keyed(records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(stable key, record) with duplicates numbered like ``watch.keyed_records``."""
+    from .watch import record_key
+
+    seen = set()
+    for rec in records:
+        key = record_key(rec)
+        if key in seen:
+            n = 1
+            while f"{key}#{n}" in seen:
+                n += 1
+            key = f"{key}#{n}"
+        seen.add(key)
+        yield key, rec
+
+
+def _feature_count(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None and int(value) >= 0 else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _measure(arcgispro_path: Path, previous: Dict[str, Tuple[str, Optional[SampleStats]]]):
+    from .paths import load_context_files
+    from .shards import load_record_details
+
+    context = load_context_files(arcgispro_path)
+    rows = []
+    measured: Dict[str, Tuple[str, Optional[SampleStats]]] = {}
+    for key, rec in _keyed(context.records("layers")):
+        rec = load_record_details(arcgispro_path, "layers", rec)
+        geometries = [r.get("geometry") for r in rec.get("sampleData") or () if isinstance(r, dict)]
+        fingerprint = _fingerprint(geometries)
+        cached = previous.get(key)
+        stats = cached[1] if cached is not None and cached[0] == fingerprint else sample_stats(geometries)
+        measured[key] = (fingerprint, stats)
+        rows.append((key, str(rec.get("name") or ""), rec.get("mapName"), rec.get("geometryType"),
+                     _feature_count(rec.get("featureCount"))))
+    return rows, measured
+
+
+def geometry_reports(arcgispro_path: Path, budget: int = DEFAULT_BUDGET,
+                     map_name: Optional[str] = None) -> List[GeometryReport]:
+    """
+    Measure the sample geometries of every layer and extrapolate to its features.
+
+    Args:
+        arcgispro_path: Path to .arcgispro folder
+        budget: Estimated payload (bytes) above which a layer is flagged
+        map_name: Only layers of this map (case-insensitive)
+
+    Returns:
+        One report per layer, in layers.json order. Layers without sample
+        geometries have no ``stats`` and no estimate.
+    """
+    from .paths import load_context_files
+
+    layers_path = load_context_files(arcgispro_path).path_for("layers")
+    stamp = (layers_path.name, file_stamp(layers_path))
+    entry = get_cache_folder(arcgispro_path) / GEOMSTATS_FILENAME
+    header = (CACHE_FORMAT, GEOMSTATS_FORMAT)
+    use_cache = cache_enabled()
+
+    payload = read_entry(entry, header) if use_cache else MISS
+    if payload is not MISS and payload["stamp"] == stamp:
+        rows, measured = payload["rows"], payload["layers"]
+    else:
+        previous = payload["layers"] if payload is not MISS else {}
+        with span("geometry stats"):
+            rows, measured = _measure(arcgispro_path, previous)
+        if use_cache:
+            write_entry(entry, header, {"stamp": stamp, "rows": rows, "layers": measured})
+
+    wanted = map_name.lower() if map_name else None
+    reports = []
+    for key, name, layer_map, geometry_type, feature_count in rows:
+        if wanted is not None and str(layer_map or "").lower() != wanted:
+            continue
+        stats = measured[key][1]
+        report = GeometryReport(key, name, layer_map, geometry_type, feature_count, stats)
+        if stats is not None:
+            features = feature_count if feature_count is not None else stats.sampled
+            report.estimated_bytes = int(round(stats.bytes_mean * features))
+            report.over_budget = report.estimated_bytes > budget
+        reports.append(report)
+    return reports
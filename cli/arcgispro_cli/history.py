@@ -0,0 +1,387 @@
+"""Content-addressed history of exports.
+
+Every Snapshot replaces the whole ``.arcgispro`` folder. ``History.save``
+keeps a copy next to it, in ``.arcgispro-history/``, that costs only what
+changed:
+
+    .arcgispro-history/
+      objects/ab/cdef...     one zlib-compressed JSON document per record
+                             (map, layer, table, ...) or per non-list file,
+                             named by the SHA-256 of its JSON text
+      snapshots/<id>.json    manifest: file key -> blob or list of record blobs
+      log.jsonl              one line per save (id, time, label)
+      stamps.json            file stamps at the last save (unchanged files are skipped)
+      checkouts/<id>/        materialized snapshots (see ``checkout``)
+
+Documents are hashed in one canonical encoding (sorted keys, no
+whitespace), whether they come from a plain or a compacted export. A
+record that did not change between two exports hashes to the same blob,
+which is stored once. A snapshot id is the start of the SHA-256 of its
+manifest, so saving an unchanged export again adds only a log line.
+
+``checkout`` writes a snapshot back out as an ordinary ``.arcgispro``
+folder (record blobs are concatenated without being parsed), once per
+snapshot; from then on it is read by the same code and caches as the
+current export, e.g. ``arcgis layers -p .arcgispro-history/checkouts/<id>``.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .paths import CONTEXT_FILES, iter_json_records, load_context_files
+from .profiling import span
+
+# Bump when the manifest layout changes.
+HISTORY_FORMAT = 1
+
+# zlib level for blobs: records are small, and level 6 is within a few
+# percent of 9 at a fraction of the time
+COMPRESS_LEVEL = 6
+
+ID_LENGTH = 12
+
+# Sibling of .arcgispro: the add-in deletes that folder on every Snapshot
+HISTORY_DIRNAME = ".arcgispro-history"
+
+
+def get_history_folder(arcgispro_path: Path) -> Path:
+    """Get the history folder of an export, e.g. <project>/.arcgispro-history/."""
+    return Path(arcgispro_path).parent / HISTORY_DIRNAME
+
+
+@dataclass
+class SnapshotEntry:
+    """One line of the history log."""
+
+    id: str
+    saved_at: str
+    label: Optional[str] = None
+    exported_at: Optional[str] = None
+    project: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "savedAt": self.saved_at, "label": self.label,
+                "exportedAt": self.exported_at, "project": self.project}
+
+
+@dataclass
+class SaveResult:
+    entry: SnapshotEntry
+    records: int  # records and documents in the snapshot
+    new_blobs: int  # blobs written by this save
+    new_bytes: int  # compressed bytes written
+    unchanged: bool  # same content as the latest snapshot (nothing saved)
+
+
+class HistoryError(Exception):
+    """A snapshot reference that can't be resolved, or a damaged store."""
+
+
+class History:
+    """Blob store, manifests and log under ``.arcgispro-history/``."""
+
+    def __init__(self, arcgispro_path: Path):
+        self.arcgispro_path = arcgispro_path
+        self.root = get_history_folder(arcgispro_path)
+
+    # -- Blobs -----------------------------------------------------------
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest[2:]
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Store a document; returns its digest and the bytes written (0 if already stored)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if path.exists():
+            return digest, 0
+        packed = zlib.compress(data, COMPRESS_LEVEL)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, packed)
+        return digest, len(packed)
+
+    def get(self, digest: str) -> bytes:
+        try:
+            return zlib.decompress(self._blob_path(digest).read_bytes())
+        except (OSError, zlib.error) as e:
+            raise HistoryError(f"blob {digest[:12]} is missing or damaged: {e}")
+
+    # -- Manifests and log -----------------------------------------------
+
+    def manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        try:
+            return json.loads((self.root / "snapshots" / f"{snapshot_id}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            raise HistoryError(f"snapshot {snapshot_id} is missing or damaged: {e}")
+
+    def entries(self) -> List[SnapshotEntry]:
+        """Saved snapshots, oldest first."""
+        entries = []
+        try:
+            lines = (self.root / "log.jsonl").read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return entries
+        for line in lines:
+            try:
+                d = json.loads(line)
+                entries.append(SnapshotEntry(d["id"], d["savedAt"], d.get("label"), d.get("exportedAt"),
+                                             d.get("project")))
+            except (ValueError, KeyError, TypeError):
+                continue  # a torn last line
+        return entries
+
+    def resolve(self, ref: str) -> SnapshotEntry:
+        """
+        Find a snapshot by id prefix, "latest", or "~N" (N saves before the latest).
+
+        Raises:
+            HistoryError: No or several matching snapshots
+        """
+        entries = self.entries()
+        if not entries:
+            raise HistoryError("no snapshots saved yet (arcgis history save)")
+        ref = ref.strip().lstrip("@")
+        if ref in ("latest", "~0", ""):
+            return entries[-1]
+        if ref.startswith("~") and ref[1:].isdigit():
+            n = int(ref[1:])
+            if n >= len(entries):
+                raise HistoryError(f"only {len(entries)} snapshot(s) saved")
+            return entries[-1 - n]
+        matches = {e.id for e in entries if e.id.startswith(ref.lower())}
+        if len(matches) > 1:
+            raise HistoryError(f"{ref} matches several snapshots: {', '.join(sorted(matches))}")
+        if not matches:
+            raise HistoryError(f"no snapshot {ref}")
+        (snapshot_id,) = matches
+        return [e for e in entries if e.id == snapshot_id][-1]
+
+    # -- Save ------------------------------------------------------------
+
+    def save(self, label: Optional[str] = None) -> SaveResult:
+        """
+        Store the current export.
+
+        Files whose stamp (mtime, size) matches the previous save are not
+        read again; the others are streamed record by record, and only
+        records not already in the store are compressed and written.
+
+        Raises:
+            HistoryError: There is no export to save, or a file is not valid JSON
+        """
+        from .cache import file_stamp
+
+        context = load_context_files(self.arcgispro_path)
+        previous = self._read_stamps()
+        stamps: Dict[str, Any] = {}
+        files: Dict[str, Any] = {}
+        records = new_blobs = new_bytes = 0
+        with span("history save"):
+            for key in CONTEXT_FILES:
+                path = context.path_for(key)
+                stamp = file_stamp(path)
+                if stamp is None:
+                    continue
+                stamp = [path.name, *stamp]
+                seen = previous.get(key)
+                if seen is not None and seen["stamp"] == stamp and self._has_blobs(seen["file"]):
+                    desc = seen["file"]
+                else:
+                    try:
+                        documents, is_list = _file_documents(self.arcgispro_path, key, path)
+                        digests = []
+                        for data in documents:
+                            digest, written = self.put(data)
+                            digests.append(digest)
+                            new_blobs += bool(written)
+                            new_bytes += written
+                    except ValueError as e:
+                        raise HistoryError(f"{path.name} is not valid JSON: {e}")
+                    desc = {"records": digests} if is_list else {"blob": digests[0]}
+                files[key] = desc
+                stamps[key] = {"stamp": stamp, "file": desc}
+                records += len(desc["records"]) if "records" in desc else 1
+        if not files:
+            raise HistoryError("no context files to save")
+        self._write_stamps(stamps)
+
+        manifest = {"format": HISTORY_FORMAT, "files": files}
+        text = json.dumps(manifest, sort_keys=True, separators=(",", ":"))
+        snapshot_id = hashlib.sha256(text.encode("utf-8")).hexdigest()[:ID_LENGTH]
+
+        meta, project = context.get("meta"), context.get("project")
+        entry = SnapshotEntry(snapshot_id, _now(), label,
+                              meta.get("exportedAt") if isinstance(meta, dict) else None,
+                              project.get("name") if isinstance(project, dict) else None)
+
+        entries = self.entries()
+        if entries and entries[-1].id == snapshot_id and not label:
+            return SaveResult(entries[-1], records, new_blobs, new_bytes, True)
+
+        manifest_path = self.root / "snapshots" / f"{snapshot_id}.json"
+        if not manifest_path.exists():
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(manifest_path, text.encode("utf-8"))
+        with open(self.root / "log.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry.to_dict(), separators=(",", ":")) + "\n")
+        return SaveResult(entry, records, new_blobs, new_bytes, False)
+
+    def _read_stamps(self) -> Dict[str, Any]:
+        try:
+            stamps = json.loads((self.root / "stamps.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return stamps if isinstance(stamps, dict) else {}
+
+    def _write_stamps(self, stamps: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.root / "stamps.json", json.dumps(stamps, separators=(",", ":")).encode("utf-8"))
+
+    def _has_blobs(self, desc: Dict[str, Any]) -> bool:
+        # Guards the stamp shortcut against a store that was partly deleted
+        digests = desc.get("records") if "records" in desc else [desc.get("blob")]
+        return all(isinstance(d, str) and self._blob_path(d).exists() for d in digests[:1] + digests[-1:])
+
+    # -- Read back -------------------------------------------------------
+
+    def iter_documents(self, snapshot_id: str) -> Iterator[Tuple[str, bytes]]:
+        """(context key, JSON text of the file) for each file of a snapshot."""
+        for key, desc in self.manifest(snapshot_id)["files"].items():
+            if key not in CONTEXT_FILES:
+                continue
+            if "records" in desc:
+                yield key, b"[" + b",\n".join(self.get(d) for d in desc["records"]) + b"]"
+            else:
+                yield key, self.get(desc["blob"])
+
+    def write_files(self, snapshot_id: str, arcgispro_path: Path) -> List[Path]:
+        """Write a snapshot's context files under ``arcgispro_path``; returns the files written."""
+        written = []
+        for key, data in self.iter_documents(snapshot_id):
+            path = arcgispro_path / CONTEXT_FILES[key]
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, data)
+            written.append(path)
+        return written
+
+    def restore(self, snapshot_id: str) -> List[Path]:
+        """
+        Replace the current context files with a snapshot's.
+
+        Context files the snapshot doesn't have are removed, and so are the
+        compacted ``<kind>.index.json`` files (the restored files are whole).
+        Returns the files written.
+        """
+        from .shards import SHARDED_KINDS, get_shard_folder, get_shard_index_path
+
+        keys = set(self.manifest(snapshot_id)["files"])
+        with span("history restore"):
+            written = self.write_files(snapshot_id, self.arcgispro_path)
+            for key, rel in CONTEXT_FILES.items():
+                if key not in keys:
+                    (self.arcgispro_path / rel).unlink(missing_ok=True)
+            for kind in SHARDED_KINDS:
+                get_shard_index_path(self.arcgispro_path, kind).unlink(missing_ok=True)
+                shutil.rmtree(get_shard_folder(self.arcgispro_path, kind), ignore_errors=True)
+        return written
+
+    def checkout(self, snapshot_id: str) -> Path:
+        """
+        Materialize a snapshot (once) and return its .arcgispro folder.
+
+        Snapshots never change, so an existing checkout is reused as is; its
+        own cache folder makes later loads as fast as loading the current
+        export.
+        """
+        folder = self.root / "checkouts" / snapshot_id
+        arcgispro_path = folder / ".arcgispro"
+        if (folder / "complete").exists():
+            return arcgispro_path
+        with span("history checkout"):
+            self.manifest(snapshot_id)  # fail before creating anything
+            tmp = Path(tempfile.mkdtemp(dir=str(self.root), prefix="checkout-"))
+            try:
+                self.write_files(snapshot_id, tmp / ".arcgispro")
+                (tmp / "complete").touch()
+                folder.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.replace(tmp, folder)
+                except OSError:
+                    # Another process checked it out first
+                    if not (folder / "complete").exists():
+                        raise
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+        return arcgispro_path
+
+    def summary(self, snapshot_id: str) -> Dict[str, int]:
+        """Record counts per list-valued file of a snapshot."""
+        files = self.manifest(snapshot_id)["files"]
+        return {key: len(desc["records"]) for key, desc in files.items() if "records" in desc}
+
+    def storage(self) -> Tuple[int, int]:
+        """(number of blobs, compressed bytes) in the store."""
+        count = size = 0
+        for path in (self.root / "objects").glob("*/*"):
+            count += 1
+            size += path.stat().st_size
+        return count, size
+
+
+def _file_documents(arcgispro_path: Path, key: str, path: Path) -> Tuple[Iterable[bytes], bool]:
+    """
+    The JSON texts to store for a context file, and whether it is a record list.
+
+    Arrays are stored per record and other files whole, all in the
+    canonical encoding of ``_dumps``, so a record hashes the same however
+    the exporter formatted it. Compacted layers/tables indexes are merged
+    with their shards first, so a snapshot never depends on shard files and
+    dedupes against the uncompacted export.
+    """
+    from .shards import load_record_details
+
+    if path.name.endswith(".index.json"):
+        records = load_context_files(arcgispro_path).get(key) or []
+        return (_dumps(load_record_details(arcgispro_path, key, r) if isinstance(r, dict) else r)
+                for r in records), True
+
+    with open(path, "rb") as f:
+        head = f.read(4096).lstrip(b"\xef\xbb\xbf \t\r\n")
+    if head[:1] == b"[":
+        return (_dumps(record) for record in iter_json_records(path)), True
+    try:
+        value = json.loads(path.read_bytes().decode("utf-8-sig"))
+    except UnicodeDecodeError as e:
+        raise ValueError(str(e))
+    return [_dumps(value)], False
+
+
+def _dumps(value: Any) -> bytes:
+    """Canonical JSON text: sorted keys, no whitespace, UTF-8."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,248 @@
+"""Name and ID index over maps, layers and tables.
+
+Commands like ``arcgis layer`` used to scan every layer record (lowercasing
+each name) on each lookup. ``ContextIndex`` is built once per context load and
+answers exact-name, stable-ID, map-membership and partial-name lookups
+without a full scan. Partial matches go through a trigram index over the
+distinct lowercase layer names.
+
+The index stores positions into the loaded record lists rather than copies
+of the records. It is made of one part per kind (maps, layers, tables),
+each built on the first lookup that needs it and persisted next to the
+context cache (``.arcgispro/cache/index.<kind>.pickle``) keyed by the stamp
+of its own file, so ``arcgis map X`` never reads layers.json. A persisted
+part reads its record list from the context only when a lookup returns
+records, so counts and membership checks don't parse layers.json at all.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from .cache import CACHE_FORMAT, MISS, cache_enabled, file_stamp, get_cache_folder, read_entry, write_entry
+
+# Bump when the persisted payload changes shape.
+INDEX_FORMAT = 2
+
+_INDEXED_KEYS = ("maps", "layers", "tables")
+
+
+def _lower(value: Any) -> str:
+    return str(value).lower() if value is not None else ""
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _group(records: List[Dict[str, Any]], key: str) -> Dict[str, List[int]]:
+    groups: Dict[str, List[int]] = {}
+    for pos, rec in enumerate(records):
+        groups.setdefault(_lower(rec.get(key)), []).append(pos)
+    return groups
+
+
+def _ids(records: List[Dict[str, Any]]) -> Dict[str, int]:
+    ids: Dict[str, int] = {}
+    for pos, rec in enumerate(records):
+        rid = rec.get("id")
+        if rid and rid not in ids:
+            ids[rid] = pos
+    return ids
+
+
+def build_part(kind: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the (picklable) lookup tables for the records of one kind."""
+    if kind == "maps":
+        active = next((pos for pos, m in enumerate(records) if m.get("isActiveMap")), 0 if records else None)
+        return {
+            "map_names": {n: p[0] for n, p in _group(records, "name").items()},
+            "map_ids": _ids(records),
+            "active_map": active,
+        }
+    if kind == "layers":
+        layer_names = _group(records, "name")
+        distinct = sorted(n for n in layer_names if n)
+        trigrams: Dict[str, List[int]] = {}
+        for i, name in enumerate(distinct):
+            for tri in _trigrams(name):
+                trigrams.setdefault(tri, []).append(i)
+        return {
+            "layer_names": layer_names,
+            "layer_ids": _ids(records),
+            "layers_by_map": _group(records, "mapName"),
+            "layer_name_list": distinct,
+            "layer_trigrams": trigrams,
+        }
+    return {
+        "table_names": _group(records, "name"),
+        "table_ids": _ids(records),
+        "tables_by_map": _group(records, "mapName"),
+    }
+
+
+class ContextIndex:
+    """Lookups over the maps, layers and tables of one context load."""
+
+    def __init__(self, maps: Optional[List[Dict[str, Any]]] = None,
+                 layers: Optional[List[Dict[str, Any]]] = None,
+                 tables: Optional[List[Dict[str, Any]]] = None,
+                 context: Optional[Mapping[str, Any]] = None,
+                 load_part: Optional[Callable[[str, "ContextIndex"], Dict[str, Any]]] = None):
+        # Lists not given are read from ``context`` on first use
+        self._lists = {"maps": maps, "layers": layers, "tables": tables}
+        self._context = context
+        # Parts are built (or read by ``load_part``) on first use
+        self._parts: Dict[str, Dict[str, Any]] = {}
+        self._load_part = load_part
+
+    def _list(self, key: str) -> List[Dict[str, Any]]:
+        records = self._lists[key]
+        if records is None:
+            records = self._lists[key] = _records(self._context or {}, key)
+        return records
+
+    def part(self, kind: str) -> Dict[str, Any]:
+        """The lookup tables of one kind (see ``build_part``)."""
+        part = self._parts.get(kind)
+        if part is None:
+            if self._load_part is not None:
+                part = self._load_part(kind, self)
+            else:
+                part = build_part(kind, self._list(kind))
+            self._parts[kind] = part
+        return part
+
+    @property
+    def maps(self) -> List[Dict[str, Any]]:
+        return self._list("maps")
+
+    @property
+    def layers(self) -> List[Dict[str, Any]]:
+        return self._list("layers")
+
+    @property
+    def tables(self) -> List[Dict[str, Any]]:
+        return self._list("tables")
+
+    @classmethod
+    def build(cls, maps: List[Dict[str, Any]], layers: List[Dict[str, Any]],
+              tables: List[Dict[str, Any]]) -> "ContextIndex":
+        return cls(maps, layers, tables)
+
+    @staticmethod
+    def _pick(records: List[Dict[str, Any]], positions: Iterable[int]) -> List[Dict[str, Any]]:
+        return [records[p] for p in positions]
+
+    # -- Maps ------------------------------------------------------------
+
+    def has_maps(self) -> bool:
+        """Whether the export has any map records (maps.json present and non-empty)."""
+        return self.part("maps")["active_map"] is not None
+
+    def map_named(self, name: str) -> Optional[Dict[str, Any]]:
+        """Case-insensitive exact map lookup."""
+        pos = self.part("maps")["map_names"].get(_lower(name))
+        return self.maps[pos] if pos is not None else None
+
+    def map_by_id(self, map_id: str) -> Optional[Dict[str, Any]]:
+        pos = self.part("maps")["map_ids"].get(map_id)
+        return self.maps[pos] if pos is not None else None
+
+    def active_map(self) -> Optional[Dict[str, Any]]:
+        """The active map, falling back to the first map."""
+        pos = self.part("maps")["active_map"]
+        return self.maps[pos] if pos is not None else None
+
+    # -- Layers ----------------------------------------------------------
+
+    def layers_named(self, name: str) -> List[Dict[str, Any]]:
+        """Case-insensitive exact layer name lookup (one record per map)."""
+        return self._pick(self.layers, self.part("layers")["layer_names"].get(_lower(name), ()))
+
+    def layer_by_id(self, layer_id: str) -> Optional[Dict[str, Any]]:
+        pos = self.part("layers")["layer_ids"].get(layer_id)
+        return self.layers[pos] if pos is not None else None
+
+    def layers_in_map(self, map_name: str) -> List[Dict[str, Any]]:
+        """Layers whose mapName matches case-insensitively, in export order."""
+        return self._pick(self.layers, self.part("layers")["layers_by_map"].get(_lower(map_name), ()))
+
+    def layer_count(self, map_name: str) -> int:
+        """Number of layers in a map, without materializing them."""
+        return len(self.part("layers")["layers_by_map"].get(_lower(map_name), ()))
+
+    def find_layers(self, text: str) -> List[Dict[str, Any]]:
+        """Case-insensitive substring match on layer names, in export order."""
+        needle = _lower(text)
+        names = self.part("layers")["layer_name_list"]
+        if len(needle) >= 3:
+            postings = sorted((self.part("layers")["layer_trigrams"].get(t, []) for t in _trigrams(needle)), key=len)
+            if not postings[0]:
+                return []
+            candidates = set(postings[0]).intersection(*postings[1:])
+            matched = [names[i] for i in candidates if needle in names[i]]
+        else:
+            matched = [n for n in names if needle in n]
+            if needle == "":
+                matched.append("")
+
+        positions: List[int] = []
+        for name in matched:
+            positions.extend(self.part("layers")["layer_names"].get(name, ()))
+        return self._pick(self.layers, sorted(positions))
+
+    # -- Tables ----------------------------------------------------------
+
+    def tables_named(self, name: str) -> List[Dict[str, Any]]:
+        return self._pick(self.tables, self.part("tables")["table_names"].get(_lower(name), ()))
+
+    def table_by_id(self, table_id: str) -> Optional[Dict[str, Any]]:
+        pos = self.part("tables")["table_ids"].get(table_id)
+        return self.tables[pos] if pos is not None else None
+
+    def tables_in_map(self, map_name: str) -> List[Dict[str, Any]]:
+        return self._pick(self.tables, self.part("tables")["tables_by_map"].get(_lower(map_name), ()))
+
+
+def _records(context: Mapping[str, Any], key: str) -> List[Dict[str, Any]]:
+    value = context.get(key)
+    return value if isinstance(value, list) else []
+
+
+def _persisted_part(arcgispro_path: Path, context: Mapping[str, Any]):
+    """``load_part`` for ``ContextIndex`` that reuses ``index.<kind>.pickle``."""
+
+    def load_part(kind: str, index: ContextIndex) -> Dict[str, Any]:
+        header = (CACHE_FORMAT, INDEX_FORMAT, kind, file_stamp(context.path_for(kind)))
+        entry = get_cache_folder(arcgispro_path) / f"index.{kind}.pickle"
+        part = read_entry(entry, header)
+        if part is MISS:
+            part = build_part(kind, index._list(kind))
+            write_entry(entry, header, part)
+        return part
+
+    return load_part
+
+
+def load_context_index(context: Mapping[str, Any]) -> ContextIndex:
+    """
+    Build (or load the persisted) index for a context mapping.
+
+    Nothing is read until a lookup needs it. A context with an
+    ``arcgispro_path`` (``paths.LazyContext``) reuses
+    ``.arcgispro/cache/index.<kind>.pickle`` for each kind whose file is
+    unchanged, unless it was loaded with ``use_cache=False``; plain dicts
+    always build in memory.
+    """
+    arcgispro_path = getattr(context, "arcgispro_path", None)
+    if arcgispro_path is None or not getattr(context, "use_cache", True) or not cache_enabled():
+        return ContextIndex(context=context)
+    return ContextIndex(context=context, load_part=_persisted_part(arcgispro_path, context))
+
+
+def get_context_index(context: Mapping[str, Any]) -> ContextIndex:
+    """Return the index for a context, reusing the one memoized on it if any."""
+    index = getattr(context, "index", None)
+    if index is not None:
+        return index
+    return load_context_index(context)
@@ -0,0 +1,253 @@
+"""Per-invocation query metrics, kept per export in the per-user cache.
+
+Every CLI command that resolves a .arcgispro folder appends one JSON line
+(command, latency, exit status, bytes read, cache hits/misses, context size)
+to ``invocations.jsonl`` in ``<user cache>/metrics/<export hash>/`` (see
+``get_metrics_folder``). Nothing is written into the export itself, which
+may be shared or read-only. The log is a two-segment ring: when the current
+segment reaches ``SEGMENT_BYTES`` it replaces ``invocations.1.jsonl``, so
+the folder never holds more than twice that and the newest records win.
+
+``arcgis metrics`` aggregates the ring into per-command percentiles and can
+render them as OpenMetrics text for a node_exporter textfile collector.
+
+Set ``ARCGISPRO_CLI_NO_METRICS=1`` to stop recording.
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+METRICS_DIRNAME = "metrics"
+METRICS_FILENAME = "invocations.jsonl"
+PREVIOUS_FILENAME = "invocations.1.jsonl"
+
+# Size at which the current segment rotates (the ring holds at most 2x this)
+SEGMENT_BYTES = 512 * 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Commands that are long-running, would only measure themselves, or
+# remove the export they would be recorded against
+UNRECORDED_COMMANDS = {"bench", "clean", "metrics", "serve", "tui"}
+
+# Counters for the running invocation, filled in by cache/paths as they read
+_counters: Dict[str, int] = {"bytesRead": 0, "cacheHits": 0, "cacheMisses": 0}
+_arcgispro_path: Optional[Path] = None
+
+
+def metrics_enabled() -> bool:
+    """Return False when ARCGISPRO_CLI_NO_METRICS is set."""
+    return os.environ.get("ARCGISPRO_CLI_NO_METRICS", "").strip().lower() not in ("1", "true", "yes")
+
+
+def get_metrics_folder(arcgispro_path: Path) -> Path:
+    """Get the metrics folder of an export, e.g. ~/.cache/arcgispro_cli/metrics/<hash>/."""
+    from .paths import get_user_cache_folder
+
+    key = os.path.normcase(str(Path(arcgispro_path).resolve()))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return get_user_cache_folder() / METRICS_DIRNAME / digest
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add to a counter of the running invocation."""
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def track_context(arcgispro_path: Optional[Path]) -> None:
+    """Remember the .arcgispro folder the running invocation resolved."""
+    global _arcgispro_path
+    if arcgispro_path is not None:
+        _arcgispro_path = arcgispro_path
+
+
+def reset() -> None:
+    """Clear the counters and tracked folder (start of an invocation)."""
+    global _arcgispro_path
+    _arcgispro_path = None
+    for key in _counters:
+        _counters[key] = 0
+
+
+def context_bytes(arcgispro_path: Path) -> int:
+    """Total size of the exported context files."""
+    from .paths import CONTEXT_FILES
+
+    total = 0
+    for rel in CONTEXT_FILES.values():
+        try:
+            total += (arcgispro_path / rel).stat().st_size
+        except OSError:
+            pass
+    return total
+
+
+def record_invocation(command: str, seconds: float, exit_code: int) -> Optional[Dict[str, Any]]:
+    """
+    Append a record for the invocation that just finished.
+
+    Nothing is written when metrics are disabled, the command is in
+    ``UNRECORDED_COMMANDS`` or no .arcgispro folder was resolved. Write
+    errors are ignored: metrics must never fail a command.
+
+    Returns:
+        The record written, or None
+    """
+    arcgispro_path = _arcgispro_path
+    if arcgispro_path is None or command in UNRECORDED_COMMANDS or not metrics_enabled():
+        return None
+
+    record = {
+        "ts": round(time.time(), 3),
+        "command": command,
+        "seconds": round(seconds, 6),
+        "exit": exit_code,
+        "bytesRead": _counters.get("bytesRead", 0),
+        "cacheHits": _counters.get("cacheHits", 0),
+        "cacheMisses": _counters.get("cacheMisses", 0),
+        "contextBytes": context_bytes(arcgispro_path),
+    }
+    try:
+        append_record(get_metrics_folder(arcgispro_path), record)
+    except OSError:
+        return None
+    return record
+
+
+def append_record(folder: Path, record: Dict[str, Any]) -> None:
+    """Append one record to the ring in ``folder``, rotating a full segment."""
+    folder.mkdir(parents=True, exist_ok=True)
+    current = folder / METRICS_FILENAME
+    try:
+        if current.stat().st_size >= SEGMENT_BYTES:
+            os.replace(current, folder / PREVIOUS_FILENAME)
+    except FileNotFoundError:
+        pass
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    # One write() per record so concurrent invocations don't interleave lines
+    with open(current, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def iter_records(arcgispro_path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the recorded invocations, oldest first (unreadable lines are skipped)."""
+    folder = get_metrics_folder(arcgispro_path)
+    for name in (PREVIOUS_FILENAME, METRICS_FILENAME):
+        try:
+            with open(folder / name, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and "command" in record:
+                        yield record
+        except OSError:
+            continue
+
+
+def clear_records(arcgispro_path: Path) -> None:
+    """Delete both ring segments."""
+    folder = get_metrics_folder(arcgispro_path)
+    for name in (PREVIOUS_FILENAME, METRICS_FILENAME):
+        try:
+            (folder / name).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(records: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate records per command.
+
+    Returns:
+        One dict per command (sorted by name) with runs, errors, latency
+        quantiles/sum, mean bytes read, cache hits/misses and the context
+        size of the most recent run.
+    """
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        grouped.setdefault(str(record["command"]), []).append(record)
+
+    summary = []
+    for command in sorted(grouped):
+        runs = grouped[command]
+        seconds = sorted(float(r.get("seconds") or 0.0) for r in runs)
+        latest = max(runs, key=lambda r: r.get("ts") or 0)
+        summary.append({
+            "command": command,
+            "runs": len(runs),
+            "errors": sum(1 for r in runs if r.get("exit")),
+            "quantiles": {str(q): percentile(seconds, q) for q in QUANTILES},
+            "secondsSum": round(sum(seconds), 6),
+            "bytesReadMean": round(sum(r.get("bytesRead") or 0 for r in runs) / len(runs)),
+            "cacheHits": sum(r.get("cacheHits") or 0 for r in runs),
+            "cacheMisses": sum(r.get("cacheMisses") or 0 for r in runs),
+            "contextBytes": latest.get("contextBytes"),
+            "lastSeen": latest.get("ts"),
+        })
+    return summary
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def to_openmetrics(summary: List[Dict[str, Any]], project: str) -> str:
+    """
+    Render a summary as OpenMetrics text.
+
+    Values describe the invocations currently in the ring (a sliding
+    window), so counts can go down after a rotation; series carry
+    ``project`` and ``command`` labels.
+    """
+    project_label = f'project="{_label(project)}"'
+    lines = [
+        "# TYPE arcgis_cli_command_duration_seconds summary",
+        "# UNIT arcgis_cli_command_duration_seconds seconds",
+        "# HELP arcgis_cli_command_duration_seconds Latency of arcgis CLI invocations.",
+    ]
+    for s in summary:
+        labels = f'{project_label},command="{_label(s["command"])}"'
+        for q, value in s["quantiles"].items():
+            lines.append(f'arcgis_cli_command_duration_seconds{{{labels},quantile="{q}"}} {value}')
+        lines.append(f"arcgis_cli_command_duration_seconds_sum{{{labels}}} {s['secondsSum']}")
+        lines.append(f"arcgis_cli_command_duration_seconds_count{{{labels}}} {s['runs']}")
+
+    gauges = [
+        ("arcgis_cli_command_errors", "Invocations that exited non-zero.", "errors", None),
+        ("arcgis_cli_command_read_bytes", "Mean bytes read from context and cache files per invocation.",
+         "bytesReadMean", "bytes"),
+        ("arcgis_cli_command_cache_hits", "Context files served from the parse cache.", "cacheHits", None),
+        ("arcgis_cli_command_cache_misses", "Context files parsed from JSON.", "cacheMisses", None),
+    ]
+    for name, help_text, key, unit in gauges:
+        lines.append(f"# TYPE {name} gauge")
+        if unit:
+            lines.append(f"# UNIT {name} {unit}")
+        lines.append(f"# HELP {name} {help_text}")
+        for s in summary:
+            lines.append(f'{name}{{{project_label},command="{_label(s["command"])}"}} {s[key]}')
+
+    latest = max(summary, key=lambda s: s["lastSeen"] or 0, default=None)
+    if latest is not None and latest["contextBytes"] is not None:
+        lines.append("# TYPE arcgis_cli_context_bytes gauge")
+        lines.append("# UNIT arcgis_cli_context_bytes bytes")
+        lines.append("# HELP arcgis_cli_context_bytes Size of the exported context files at the last invocation.")
+        lines.append(f"arcgis_cli_context_bytes{{{project_label}}} {latest['contextBytes']}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
@@ -1,14 +1,42 @@
 """Utility functions for finding and validating .arcgispro folders."""
 
 import json
+import os
+import re
+import sys
+import tempfile
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Set
 
+from .metrics import count, track_context
+from .profiling import profiled, span
 
+
+# Points at a .arcgispro folder (or the project folder holding one) and
+# short-circuits discovery for calls that don't pass an explicit start path
+ARCGISPRO_DIR_ENV = "ARCGISPRO_DIR"
+
+RESOLVE_CACHE_FILENAME = "resolve.json"
+RESOLVE_CACHE_FORMAT = 2
+RESOLVE_CACHE_ENTRIES = 64
+
+# Per-process memo: normalized start directory -> .arcgispro folder found
+_resolved: Dict[str, Path] = {}
+
+
+@profiled("discover")
 def find_arcgispro_folder(start_path: Optional[Path] = None) -> Optional[Path]:
     """
     Find the .arcgispro folder by searching current directory and ancestors.
     
+    Resolution order: an explicit ``start_path`` is searched from; without
+    one, ``ARCGISPRO_DIR`` wins over the current directory. Results are
+    memoized for the process and remembered per start directory in a small
+    per-user file (see ``get_user_cache_folder``), so a repeat lookup costs
+    one ``stat`` of the cached folder and of each directory between it and
+    the start directory instead of a walk.
+    
     Args:
         start_path: Starting directory to search from. Defaults to cwd.
         
@@ -16,8 +44,42 @@ def find_arcgispro_folder(start_path: Optional[Path] = None) -> Optional[Path]:
         Path to .arcgispro folder, or None if not found.
     """
     if start_path is None:
+        override = os.environ.get(ARCGISPRO_DIR_ENV)
+        if override:
+            found = _resolve_override(Path(override).expanduser())
+            track_context(found)
+            return found
         start_path = Path.cwd()
-    
+
+    key = os.path.normcase(os.path.abspath(start_path))
+    found = _resolved.get(key)
+    if found is None:
+        found = _lookup_resolve_cache(key)
+        if found is None:
+            found = _find_arcgispro_folder(Path(key))
+            if found is not None:
+                _store_resolve_cache(key, found)
+        if found is not None:
+            _resolved[key] = found
+    track_context(found)
+    return found
+
+
+def forget_resolved(start_path: Optional[Path] = None) -> None:
+    """Drop memoized resolutions (all, or the one for ``start_path``)."""
+    if start_path is None:
+        _resolved.clear()
+    else:
+        _resolved.pop(os.path.normcase(os.path.abspath(start_path)), None)
+
+
+def _resolve_override(path: Path) -> Optional[Path]:
+    if path.name != ".arcgispro" and (path / ".arcgispro").is_dir():
+        return (path / ".arcgispro").absolute()
+    return path.absolute() if path.is_dir() else None
+
+
+def _find_arcgispro_folder(start_path: Path) -> Optional[Path]:
     current = start_path.resolve()
     
     # Search current directory and ancestors
@@ -35,6 +97,100 @@ def find_arcgispro_folder(start_path: Optional[Path] = None) -> Optional[Path]:
     return None
 
 
+def get_user_cache_folder() -> Path:
+    """Per-user cache folder (%LOCALAPPDATA%, $XDG_CACHE_HOME or ~/.cache)."""
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"])
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "arcgispro_cli"
+
+
+def _read_resolve_cache() -> Dict[str, Any]:
+    try:
+        with open(get_user_cache_folder() / RESOLVE_CACHE_FILENAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != RESOLVE_CACHE_FORMAT:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _lookup_resolve_cache(key: str) -> Optional[Path]:
+    """
+    Return the cached resolution for a start directory if it still holds.
+
+    The found folder must still exist with the recorded mtime, and so must
+    every directory the walk passed through before reaching it: creating a
+    closer .arcgispro in any of them changes that directory's mtime.
+    """
+    from .cache import cache_enabled
+
+    if not cache_enabled():
+        return None
+    entry = _read_resolve_cache().get(key)
+    if not isinstance(entry, dict):
+        return None
+    try:
+        found = Path(entry["path"])
+        if os.stat(found).st_mtime_ns != entry["mtime"]:
+            return None
+        walked = entry.get("walked", {})
+        if not isinstance(walked, dict) or _walked_mtimes(key, found) != walked:
+            return None
+    except (OSError, KeyError, TypeError):
+        return None
+    return found
+
+
+def _walked_mtimes(key: str, found: Path) -> Dict[str, int]:
+    """mtimes of the directories searched before ``found`` (start up to, not including, its parent)."""
+    mtimes = {}
+    current = Path(key).resolve()
+    while current != found.parent:
+        if current == current.parent:
+            raise OSError(f"{found} is not above {key}")
+        mtimes[str(current)] = os.stat(current).st_mtime_ns
+        current = current.parent
+    return mtimes
+
+
+def _store_resolve_cache(key: str, found: Path) -> None:
+    from .cache import cache_enabled
+
+    if not cache_enabled():
+        return
+    try:
+        entry = {"path": str(found), "mtime": os.stat(found).st_mtime_ns,
+                 "walked": _walked_mtimes(key, found)}
+    except OSError:
+        return
+
+    entries = _read_resolve_cache()
+    entries.pop(key, None)
+    entries[key] = entry
+    # Keep the most recently stored start directories
+    entries = dict(list(entries.items())[-RESOLVE_CACHE_ENTRIES:])
+
+    folder = get_user_cache_folder()
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".resolve.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"format": RESOLVE_CACHE_FORMAT, "entries": entries}, f)
+            os.replace(tmp, folder / RESOLVE_CACHE_FILENAME)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+    except OSError:
+        pass
+
+
 def get_context_folder(arcgispro_path: Path) -> Path:
     """Get the context subfolder path."""
     return arcgispro_path / "context"
@@ -103,29 +259,387 @@ def load_json_file(path: Path) -> Optional[Dict[str, Any]]:
         return None
 
 
-def load_context_files(arcgispro_path: Path) -> Dict[str, Any]:
+# Context keys and their locations relative to the .arcgispro folder
+CONTEXT_FILES: Dict[str, str] = {
+    "meta": "meta.json",
+    "project": "context/project.json",
+    "maps": "context/maps.json",
+    "layers": "context/layers.json",
+    "tables": "context/tables.json",
+    "connections": "context/connections.json",
+    "layouts": "context/layouts.json",
+    "geoprocessing": "context/geoprocessing.json",
+}
+
+
+# Per-record keys that carry most of the bytes in layers.json / tables.json
+HEAVY_RECORD_KEYS = ("fields", "sampleData")
+
+# Uncached list files at least this large are streamed by ``records``
+# instead of being parsed whole. Below it, a whole parse costs a few MB and
+# warms the parse cache for the next command.
+STREAM_THRESHOLD = 1024 * 1024
+
+
+class LazyContext(Mapping):
+    """
+    Read-only mapping of context key -> parsed JSON, loaded on first access.
+    
+    Behaves like the dict historically returned by ``load_context_files``
+    (``context.get("layers")``, iteration over all keys, ...), but a file is
+    only opened and parsed the first time its key is read. Keys that have
+    been loaded are recorded in ``touched``, in access order. With
+    ``use_cache=False`` the pickles in .arcgispro/cache/ are neither read
+    nor written.
+    """
+
+    def __init__(self, arcgispro_path: Path, use_cache: bool = True):
+        self.arcgispro_path = arcgispro_path
+        self.use_cache = use_cache
+        self.touched: List[str] = []
+        self._values: Dict[str, Any] = {}
+        self._index = None
+
+    def path_for(self, key: str) -> Path:
+        """
+        Return the file backing a context key.
+        
+        For layers/tables this is the slim ``<kind>.index.json`` when the
+        export has been compacted into shards (see ``shards``).
+        """
+        if key in ("layers", "tables"):
+            from .shards import sharded_index_path
+
+            index_path = sharded_index_path(self.arcgispro_path, key)
+            if index_path is not None:
+                return index_path
+        return self.arcgispro_path / CONTEXT_FILES[key]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in CONTEXT_FILES:
+            raise KeyError(key)
+        if key not in self._values:
+            from .cache import load_cached_json
+
+            with span(f"load {key}"):
+                self._values[key] = load_cached_json(self.arcgispro_path, self.path_for(key), self.use_cache)
+            self.touched.append(key)
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CONTEXT_FILES)
+
+    def __len__(self) -> int:
+        return len(CONTEXT_FILES)
+
+    def __repr__(self) -> str:
+        return f"LazyContext({str(self.arcgispro_path)!r}, touched={self.touched!r})"
+
+    def records(self, key: str, exclude: Iterable[str] = ()) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate the records of a list-valued key, with ``exclude`` keys skipped.
+        
+        Files without a fresh parse cache entry are streamed with
+        ``iter_json_records``, so memory is bounded by one (projected)
+        record. Keys that are loaded, have a fresh cache entry or whose file
+        is smaller than ``STREAM_THRESHOLD`` are served from the parsed
+        value instead (loading it through the cache), which is much faster
+        than the streaming parser.
+        """
+        if key not in self._values:
+            from .cache import has_fresh_entry
+
+            path = self.path_for(key)
+            try:
+                small = path.stat().st_size < STREAM_THRESHOLD
+            except OSError:
+                small = True
+            if small or has_fresh_entry(self.arcgispro_path, path, self.use_cache):
+                if self[key] is None and path.is_file():
+                    # Same outcome as a failed stream
+                    raise ValueError(f"{path.name} is not valid JSON")
+        if key in self._values:
+            exclude = set(exclude)
+            for rec in self._values[key] or []:
+                yield {k: v for k, v in rec.items() if k not in exclude} if exclude else rec
+            return
+        yield from iter_json_records(self.path_for(key), exclude=exclude)
+
+    @property
+    def index(self):
+        """Name/ID index over maps, layers and tables (see ``index.ContextIndex``)."""
+        if self._index is None:
+            from .index import load_context_index
+
+            with span("index"):
+                self._index = load_context_index(self)
+        return self._index
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Forget a loaded key (or all keys) so the next access re-reads the file."""
+        if key is None or key in ("maps", "layers", "tables"):
+            self._index = None
+        if key is None:
+            self._values.clear()
+            self.touched.clear()
+        elif key in self._values:
+            del self._values[key]
+            self.touched.remove(key)
+
+
+def load_context_files(arcgispro_path: Path, use_cache: bool = True) -> LazyContext:
     """
     Load all context JSON files.
     
+    Files are loaded lazily: each one is parsed on first key access, and
+    parsed files are served from the binary cache in .arcgispro/cache/
+    when the source files are unchanged (see ``cache.load_cached_json``).
+    
     Args:
         arcgispro_path: Path to .arcgispro folder
+        use_cache: False to bypass .arcgispro/cache/ (for exports the
+            user doesn't own: unpickling someone else's cache runs their code)
         
     Returns:
-        Dict with keys: meta, project, maps, layers, tables, connections, layouts
-        Values are the parsed JSON or None if missing/invalid.
+        Mapping with keys: meta, project, maps, layers, tables, connections,
+        layouts, geoprocessing. Values are the parsed JSON or None if
+        missing/invalid.
+    """
+    return LazyContext(arcgispro_path, use_cache)
+
+
+
+_WS = re.compile(r"[ \t\r\n]*")
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_SCALAR = re.compile(r"[^,\]}\s]*")
+_DECODER = json.JSONDecoder()
+
+
+class _ArrayScanner:
     """
-    context_dir = get_context_folder(arcgispro_path)
+    Incremental scanner over a JSON document whose top level is an array.
     
-    return {
-        "meta": load_json_file(arcgispro_path / "meta.json"),
-        "project": load_json_file(context_dir / "project.json"),
-        "maps": load_json_file(context_dir / "maps.json"),
-        "layers": load_json_file(context_dir / "layers.json"),
-        "tables": load_json_file(context_dir / "tables.json"),
-        "connections": load_json_file(context_dir / "connections.json"),
-        "layouts": load_json_file(context_dir / "layouts.json"),
-        "geoprocessing": load_json_file(context_dir / "geoprocessing.json"),
-    }
+    Text is read in fixed-size chunks and consumed text is dropped, so the
+    memory held at any time is one chunk plus the (projected) record being
+    assembled. Values of excluded keys are scanned past without being kept.
+    """
+
+    def __init__(self, f, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._last_size = 0
+
+    def _more(self, size: Optional[int] = None) -> bool:
+        data = self._f.read(size or self._chunk_size)
+        if not data:
+            return False
+        count("bytesRead", len(data))
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of input)."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._more():
+                return ""
+
+    def _expect(self, ch: str) -> None:
+        found = self._peek()
+        if found != ch:
+            raise ValueError(f"Expected {ch!r}, found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def _string(self, out: Optional[List[str]]) -> None:
+        self._pos += 1
+        if out is not None:
+            out.append('"')
+        while True:
+            end = _STRING_BODY.match(self._buf, self._pos).end()
+            if out is not None:
+                out.append(self._buf[self._pos:end])
+            self._pos = end
+            if end < len(self._buf) and self._buf[end] == '"':
+                self._pos += 1
+                if out is not None:
+                    out.append('"')
+                return
+            # End of chunk (possibly mid escape sequence): read on
+            if not self._more():
+                raise ValueError("Unterminated string")
+
+    def _container(self, out: Optional[List[str]]) -> None:
+        depth = 0
+        while True:
+            m = _STRUCTURAL.search(self._buf, self._pos)
+            if m is None:
+                if out is not None:
+                    out.append(self._buf[self._pos:])
+                self._pos = len(self._buf)
+                if not self._more():
+                    raise ValueError("Unterminated array or object")
+                continue
+            i = m.start()
+            if out is not None:
+                out.append(self._buf[self._pos:i])
+            self._pos = i
+            ch = self._buf[i]
+            if ch == '"':
+                self._string(out)
+                continue
+            self._pos += 1
+            if out is not None:
+                out.append(ch)
+            depth += 1 if ch in "[{" else -1
+            if depth == 0:
+                return
+
+    def _scalar(self, out: Optional[List[str]]) -> None:
+        while True:
+            end = _SCALAR.match(self._buf, self._pos).end()
+            if out is not None:
+                out.append(self._buf[self._pos:end])
+            self._pos = end
+            if end < len(self._buf) or not self._more():
+                return
+
+    def _value(self, out: Optional[List[str]]) -> None:
+        ch = self._peek()
+        if ch == '"':
+            self._string(out)
+        elif ch in ("[", "{"):
+            self._container(out)
+        elif ch:
+            self._scalar(out)
+        else:
+            raise ValueError("Unexpected end of input")
+
+    def _decode(self) -> Any:
+        """Parse a whole array or object with the C decoder, reading until it is complete."""
+        # Records tend to be alike: buffer as much as the previous one took
+        # so most parse on the first attempt
+        while len(self._buf) - self._pos < self._last_size and self._more(self._last_size):
+            pass
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # Most likely cut off by the end of the buffer: at least
+                # double what is buffered so a large record isn't re-parsed
+                # once per chunk
+                if not self._more(max(self._chunk_size, len(self._buf) - self._pos)):
+                    raise ValueError(str(e)) from None
+                continue
+            self._last_size = end - self._pos
+            self._pos = end
+            return value
+
+    def _object(self, exclude: Set[str]) -> Any:
+        self._expect("{")
+        out = ["{"]
+        if self._peek() == "}":
+            self._pos += 1
+            return {}
+        first = True
+        while True:
+            if self._peek() != '"':
+                raise ValueError("Expected object key")
+            key_parts: List[str] = []
+            self._string(key_parts)
+            key_raw = "".join(key_parts)
+            self._expect(":")
+            if json.loads(key_raw) in exclude:
+                self._value(None)
+            else:
+                if not first:
+                    out.append(",")
+                out.append(key_raw)
+                out.append(":")
+                self._value(out)
+                first = False
+            ch = self._peek()
+            self._pos += 1
+            if ch == "}":
+                break
+            if ch != ",":
+                raise ValueError(f"Expected ',' or '}}', found {ch or 'end of input'!r}")
+        out.append("}")
+        return json.loads("".join(out))
+
+    def records(self, exclude: Set[str]) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            return
+        while True:
+            ch = self._peek()
+            if exclude and ch == "{":
+                yield self._object(exclude)
+            elif ch in ("{", "["):
+                yield self._decode()
+            else:
+                out: List[str] = []
+                self._value(out)
+                yield json.loads("".join(out))
+            ch = self._peek()
+            self._pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"Expected ',' or ']', found {ch or 'end of input'!r}")
+
+
+def iter_json_records(
+    path: Path,
+    exclude: Iterable[str] = (),
+    chunk_size: int = 1 << 16,
+) -> Iterator[Any]:
+    """
+    Stream the records of a JSON file whose top level is an array.
+    
+    Records are parsed one at a time; keys listed in ``exclude`` (for
+    example ``HEAVY_RECORD_KEYS``) are skipped at the text level and never
+    materialized, so memory is bounded by one projected record.
+    
+    Args:
+        path: Path to JSON file (e.g. context/layers.json)
+        exclude: Top-level record keys to drop
+        chunk_size: Characters read from the file at a time
+        
+    Yields:
+        Parsed records. Nothing is yielded if the file doesn't exist.
+        
+    Raises:
+        ValueError: If the file is not a valid JSON array.
+    """
+    if not path.exists():
+        return
+    
+    with open(path, "r", encoding="utf-8-sig") as f:
+        yield from _ArrayScanner(f, chunk_size).records(set(exclude))
+
+
+def find_active_map(context: Mapping) -> Optional[Dict[str, Any]]:
+    """Return the active map record (falling back to the first map), or None."""
+    maps = context.get("maps") or []
+    return next((m for m in maps if m.get("isActiveMap")), maps[0] if maps else None)
+
+
+def filter_records(records: Iterable[Dict[str, Any]], map_name: Optional[str] = None,
+                   broken: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield layer/table records matching the --map/--broken filters."""
+    wanted_map = str(map_name).lower() if map_name else None
+    for rec in records:
+        if wanted_map is not None and (rec.get("mapName") or "").lower() != wanted_map:
+            continue
+        if broken and not rec.get("isBroken"):
+            continue
+        yield rec
 
 
 def list_image_files(arcgispro_path: Path) -> List[Path]:
@@ -169,27 +683,17 @@ def find_aprx_files(directory: Path, max_depth: int = 2) -> List[Path]:
     """
     Find .aprx files in directory and subdirectories.
     
+    Hidden folders and other ``catalog.DEFAULT_IGNORE`` folders (such as
+    file geodatabases) are skipped. See ``catalog.scan_aprx`` for timeouts,
+    custom ignore patterns and the persistent catalog.
+    
     Args:
         directory: Starting directory
         max_depth: Maximum depth to search
         
     Returns:
-        List of paths to .aprx files.
+        List of paths to .aprx files, sorted by path.
     """
-    aprx_files = []
-    
-    def search(path: Path, depth: int):
-        if depth > max_depth:
-            return
-        
-        try:
-            for item in path.iterdir():
-                if item.is_file() and item.suffix.lower() == ".aprx":
-                    aprx_files.append(item)
-                elif item.is_dir() and not item.name.startswith("."):
-                    search(item, depth + 1)
-        except PermissionError:
-            pass
-    
-    search(directory, 0)
-    return aprx_files
+    from .catalog import scan_aprx
+
+    return scan_aprx(directory, max_depth=max_depth).paths
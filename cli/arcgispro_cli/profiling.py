@@ -0,0 +1,216 @@
+"""Per-phase timing (and optional peak memory) for one CLI invocation.
+
+Enabled with ``arcgis --profile`` / ``ARCGISPRO_CLI_PROFILE=1``. Code marks
+phases with ``span("name")`` (or the ``profiled`` decorator); while no
+profiler is active these are a single global lookup, so the instrumentation
+stays in place in normal runs.
+
+Phases recorded by the CLI:
+
+    import       importing the subcommand's module
+    discover     finding the .arcgispro folder (find_arcgispro_folder)
+    daemon       looking for (and connecting to) a running `arcgis serve`
+    daemon call  one request to the daemon
+    load <key>   reading a context file (cache lookup or JSON parse)
+    cache read   unpickling a cached context file
+    parse json   parsing a context file
+    index        building or loading the name/ID index
+    details      reading a layer/table shard (compacted exports)
+    sql index    building the SQLite database for `arcgis sql`
+    search index building a segment of the `arcgis search` index
+    spatial index building the STR-trees for `--bbox` / `--intersects`
+    geometry stats measuring sample geometries for `arcgis geom-stats`
+    diff <kind>  hashing and comparing one kind for `arcgis diff`
+    history save storing changed records for `arcgis history save`
+    history restore  writing a snapshot back to the context folder
+    history checkout materializing a snapshot for `show` / `diff @ref`
+    filter       selecting records (streamed reads are included here)
+    serialize    json.dumps for --json output
+    render       Rich printing
+"""
+
+import json
+import os
+import sys
+import time
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+PROFILE_FORMAT = 1
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+_active: Optional["Profiler"] = None
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start", "depth")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        self.depth = profiler.depth
+        profiler.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        profiler = self.profiler
+        profiler.depth -= 1
+        profiler.spans.append((self.name, self.start - profiler.started, end - self.start, self.depth))
+        return False
+
+
+class Profiler:
+    """Collects spans for the current process until ``stop``."""
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.spans: List[tuple] = []  # (name, offset, seconds, depth)
+        self.depth = 0
+        self.started = time.perf_counter()
+        self.wall: Optional[float] = None
+        self.peak_bytes: Optional[int] = None
+        if memory:
+            import tracemalloc
+
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self.wall is not None:
+            return
+        self.wall = time.perf_counter() - self.started
+        if self.memory:
+            import tracemalloc
+
+            _, self.peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    def phases(self) -> List[Dict[str, Any]]:
+        """Spans aggregated by name, in order of first occurrence."""
+        phases: Dict[str, Dict[str, Any]] = {}
+        first: Dict[str, float] = {}
+        for name, offset, seconds, depth in self.spans:
+            phase = phases.get(name)
+            if phase is None:
+                phase = phases[name] = {"name": name, "calls": 0, "seconds": 0.0, "depth": depth}
+                first[name] = offset
+            phase["calls"] += 1
+            phase["seconds"] += seconds
+            phase["depth"] = min(phase["depth"], depth)
+            first[name] = min(first[name], offset)
+        ordered = sorted(phases.values(), key=lambda p: first[p["name"]])
+        for phase in ordered:
+            phase["seconds"] = round(phase["seconds"], 6)
+        return ordered
+
+    def to_dict(self, command: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Machine-readable report (see ``write_report``)."""
+        return {
+            "format": PROFILE_FORMAT,
+            "command": command if command is not None else sys.argv[1:],
+            "pid": os.getpid(),
+            "timestamp": time.time(),
+            "wallSeconds": round(self.wall if self.wall is not None else time.perf_counter() - self.started, 6),
+            "peakBytes": self.peak_bytes,
+            "phases": self.phases(),
+            "spans": [
+                {"name": name, "offset": round(offset, 6), "seconds": round(seconds, 6), "depth": depth}
+                for name, offset, seconds, depth in sorted(self.spans, key=lambda s: s[1])
+            ],
+        }
+
+
+def span(name: str):
+    """Context manager timing a phase of the active profiler (no-op when off)."""
+    profiler = _active
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, name)
+
+
+def profiled(name: str):
+    """Decorator form of ``span`` for functions that are a phase as a whole."""
+
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _Span(_active, name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def start_profiling(memory: bool = False) -> Profiler:
+    """Start (or return the already running) process-wide profiler."""
+    global _active
+    if _active is None:
+        _active = Profiler(memory=memory)
+    return _active
+
+
+def stop_profiling() -> Optional[Profiler]:
+    """Stop the active profiler and return it (None if none was running)."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def write_report(profiler: Profiler, path: str) -> None:
+    """
+    Write a profile as JSON.
+
+    A path ending in ``.jsonl`` gets one line appended per invocation, so a
+    harness can point many runs at the same file; any other path is
+    overwritten with a single JSON document.
+    """
+    report = profiler.to_dict()
+    if path.endswith(".jsonl"):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, separators=(",", ":")) + "\n")
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def print_summary(profiler: Profiler) -> None:
+    """Print the phase table to stderr (stdout stays clean for --json)."""
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
+    wall = profiler.wall or 0.0
+    table = Table(box=box.SIMPLE, show_header=True, header_style="bold", title="Profile")
+    table.add_column("Phase", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("%", justify="right", style="dim")
+    for phase in profiler.phases():
+        share = phase["seconds"] / wall * 100 if wall else 0.0
+        table.add_row("  " * phase["depth"] + phase["name"], str(phase["calls"]),
+                      f"{phase['seconds'] * 1000:,.2f}", f"{share:.0f}")
+    table.add_row("[bold]total[/bold]", "", f"[bold]{wall * 1000:,.2f}[/bold]", "100")
+
+    console = Console(stderr=True)
+    console.print(table)
+    if profiler.peak_bytes is not None:
+        console.print(f"  Peak traced memory: {profiler.peak_bytes / 1e6:,.2f} MB")
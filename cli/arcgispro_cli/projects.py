@@ -0,0 +1,176 @@
+"""Queries across many project folders, each with its own .arcgispro export.
+
+``query_projects`` discovers the exports under a root folder and loads them
+on a thread pool while discovery is still running; results are yielded per
+project as they complete, with every record tagged with its project
+folder. ``iter_project_records`` flattens them into one record stream:
+
+    >>> from arcgispro_cli.projects import iter_project_records
+    >>> for layer in iter_project_records("//share/gis", "layers", broken=True):
+    ...     print(layer["project"], layer["name"])
+
+Each export is read from its JSON files only: the pickles in its
+``.arcgispro/cache/`` are neither loaded nor written, since anyone who can
+write to one project folder on a share could otherwise run code as every
+user querying it.
+"""
+
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .paths import HEAVY_RECORD_KEYS, filter_records, find_active_map, load_context_files
+
+# Context keys that can be queried across projects
+PROJECT_KINDS = ("layers", "tables", "connections")
+
+# Loading is dominated by file I/O latency (often a network share), so use
+# more threads than cores
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+@dataclass
+class ProjectResult:
+    """Records of one project, or the error that prevented loading them."""
+
+    project: Path
+    arcgispro_path: Path
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def find_exports(root: Union[str, Path], max_depth: Optional[int] = None) -> Iterator[Path]:
+    """
+    Yield the .arcgispro folders under ``root`` as they are found.
+
+    Hidden folders (names starting with ".") are not descended into.
+
+    Args:
+        root: Folder to search
+        max_depth: Folder levels below ``root`` to search (None: unlimited)
+
+    Yields:
+        Paths to .arcgispro folders
+    """
+    stack = [(str(root), 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name, reverse=True)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if not is_dir:
+                continue
+            if entry.name == ".arcgispro":
+                yield Path(entry.path)
+            elif not entry.name.startswith(".") and (max_depth is None or depth < max_depth):
+                subdirs.append((entry.path, depth + 1))
+        stack.extend(subdirs)
+
+
+def _load_project(arcgispro_path: Path, kind: str, details: bool, map_name: Optional[str],
+                  broken: bool, active: bool) -> ProjectResult:
+    project = arcgispro_path.parent
+    result = ProjectResult(project=project, arcgispro_path=arcgispro_path)
+    try:
+        # Other people's exports: their .arcgispro/cache/ pickles are not
+        # trusted (loading one runs code) and nothing is written there
+        context = load_context_files(arcgispro_path, use_cache=False)
+        if active:
+            current = find_active_map(context)
+            if current is None:
+                return result
+            map_name = current.get("name")
+
+        if details and kind in ("layers", "tables"):
+            from .shards import load_record_details
+
+            records = (load_record_details(arcgispro_path, kind, r) for r in context.records(kind))
+        else:
+            records = context.records(kind, exclude=() if details else HEAVY_RECORD_KEYS)
+        if kind != "connections":
+            records = filter_records(records, map_name, broken)
+
+        tag = str(project)
+        for record in records:
+            record["project"] = tag
+            result.records.append(record)
+    except (OSError, ValueError) as e:
+        result.records = []
+        result.error = str(e)
+    return result
+
+
+def query_projects(
+    root: Union[str, Path],
+    kind: str,
+    *,
+    details: bool = False,
+    map_name: Optional[str] = None,
+    broken: bool = False,
+    active: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    max_depth: Optional[int] = None,
+) -> Iterator[ProjectResult]:
+    """
+    Load one context list from every export under ``root`` concurrently.
+
+    Args:
+        root: Folder containing the project folders
+        kind: "layers", "tables" or "connections"
+        details: Keep fields/sampleData (read from shards when compacted);
+            otherwise they are skipped while streaming the files
+        map_name: Only records of this map (case-insensitive)
+        broken: Only records with a broken data source
+        active: Only records of each project's active map
+        workers: Loader threads
+        max_depth: Folder levels below ``root`` to search
+
+    Yields:
+        One ProjectResult per export, in completion order
+    """
+    if kind not in PROJECT_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(PROJECT_KINDS)}")
+
+    done: "queue.Queue" = queue.Queue()
+    pending = 0
+    pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="arcgis-projects")
+    try:
+        for arcgispro_path in find_exports(root, max_depth):
+            future = pool.submit(_load_project, arcgispro_path, kind, details, map_name, broken, active)
+            future.add_done_callback(done.put)
+            pending += 1
+            # Hand out whatever finished while discovery continues
+            while True:
+                try:
+                    finished = done.get_nowait()
+                except queue.Empty:
+                    break
+                pending -= 1
+                yield finished.result()
+        while pending:
+            pending -= 1
+            yield done.get().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_project_records(root: Union[str, Path], kind: str, **options: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of every export under ``root``, tagged with ``project``.
+
+    Takes the same options as ``query_projects``; projects that fail to
+    load are skipped.
+    """
+    for result in query_projects(root, kind, **options):
+        yield from result.records
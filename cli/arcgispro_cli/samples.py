@@ -0,0 +1,375 @@
+"""Columnar extraction of the sample rows in layers.json / tables.json.
+
+ProExporter stores up to ``SampleRowCount`` rows per layer or standalone
+table in ``sampleData`` (``attributes`` plus a GeoJSON ``geometry``).
+``iter_sample_batches`` streams the records one at a time and turns each
+record's rows into a column batch typed by its ``fields`` schema:
+
+    >>> from arcgispro_cli.samples import iter_sample_batches
+    >>> for batch in iter_sample_batches(arcgispro_path, columns=["PARCEL_ID"]):
+    ...     print(batch.name, batch.columns["PARCEL_ID"])
+
+Only the projected columns are copied out of a record, and geometries are
+dropped unless asked for. Unless the file has a fresh parse cache entry
+(which is loaded whole) or is under ``paths.STREAM_THRESHOLD``, records are
+streamed, so memory is bounded by one record. Writers produce CSV, NDJSON
+and, when pyarrow is installed, Parquet or Arrow IPC.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .paths import filter_records, load_context_files
+
+# Esri field type -> column type; types not listed are strings
+COLUMN_TYPES = {
+    "OID": "int",
+    "SmallInteger": "int",
+    "Integer": "int",
+    "BigInteger": "int",
+    "Single": "float",
+    "Double": "float",
+    "Date": "timestamp",
+    "TimestampOffset": "timestamp",
+    "DateOnly": "date",
+}
+
+# Field types whose values are not exported as attributes
+SKIPPED_FIELD_TYPES = {"Geometry", "Blob", "Raster"}
+
+# Columns added to every row
+MAP_COLUMN = "_map"
+NAME_COLUMN = "_name"
+GEOMETRY_COLUMN = "_geometry"
+
+# Output formats; the binary ones need pyarrow
+FORMATS = ("csv", "ndjson", "parquet", "arrow")
+ARROW_FORMATS = ("parquet", "arrow")
+
+_SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+_FRACTION = re.compile(r"(\.\d{6})\d+")
+
+
+@dataclass
+class Column:
+    name: str
+    type: str  # int, float, string, timestamp, date or geometry
+
+
+@dataclass
+class SampleBatch:
+    """The sample rows of one layer or table, by column."""
+
+    name: str
+    map_name: Optional[str]
+    columns: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @property
+    def num_rows(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def format_for(output: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Pick the output format.
+
+    An explicit format wins; otherwise the file suffix decides, and a file
+    without a known suffix gets Parquet when pyarrow is installed (CSV
+    otherwise). Standard output defaults to CSV.
+    """
+    if requested:
+        return requested
+    if not output:
+        return "csv"
+    by_suffix = _SUFFIX_FORMATS.get(Path(output).suffix.lower())
+    if by_suffix:
+        return by_suffix
+    return "parquet" if pyarrow_available() else "csv"
+
+
+def schema_for(fields: Any) -> List[Column]:
+    """Columns of a record's ``fields`` list (geometry/blob/raster skipped)."""
+    columns = []
+    for f in fields if isinstance(fields, list) else ():
+        if not isinstance(f, dict) or not f.get("name") or f.get("fieldType") in SKIPPED_FIELD_TYPES:
+            continue
+        columns.append(Column(str(f["name"]), COLUMN_TYPES.get(f.get("fieldType"), "string")))
+    return columns
+
+
+def merge_schemas(schemas: Iterable[List[Column]]) -> List[Column]:
+    """Union of schemas in first-seen order; a name typed differently becomes a string."""
+    merged: Dict[str, Column] = {}
+    for schema in schemas:
+        for col in schema:
+            seen = merged.get(col.name)
+            if seen is None:
+                merged[col.name] = Column(col.name, col.type)
+            elif seen.type != col.type:
+                seen.type = "string"
+    return list(merged.values())
+
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    # .NET "o" format: 7 fractional digits and a trailing Z
+    text = _FRACTION.sub(r"\1", value.strip())
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def coerce(value: Any, type_: str) -> Any:
+    """
+    Convert an exported attribute value to its column type (None if it can't be).
+
+    Timestamps and dates stay ISO strings here (they are what CSV and NDJSON
+    write); ``write_arrow`` parses them.
+    """
+    if value is None:
+        return None
+    try:
+        if type_ == "int":
+            return int(value) if not isinstance(value, float) or value.is_integer() else None
+        if type_ == "float":
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    if type_ == "geometry":
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value if isinstance(value, str) else str(value)
+
+
+class SampleSourceError(ValueError):
+    """layers.json / tables.json is not a valid JSON array."""
+
+
+def _records(context, kind: str, name: Optional[str], map_name: Optional[str],
+             exclude: Sequence[str]) -> Iterator[Dict[str, Any]]:
+    from .shards import load_record_details
+
+    wanted = name.lower() if name else None
+    records = filter_records(context.records(kind, exclude=exclude), map_name)
+    try:
+        for rec in records:
+            if wanted is not None and str(rec.get("name") or "").lower() != wanted:
+                continue
+            yield load_record_details(context.arcgispro_path, kind, rec)
+    except ValueError as e:
+        raise SampleSourceError(f"{kind}.json is not valid JSON: {e}") from e
+
+
+def _rows(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [r for r in record.get("sampleData") or () if isinstance(r, dict)]
+
+
+def record_schema(record: Dict[str, Any], rows: Optional[List[Dict[str, Any]]] = None) -> List[Column]:
+    """
+    Columns of one record: its ``fields`` schema, then any attributes its
+    sample rows carry without a matching field entry (as strings).
+    """
+    schema = schema_for(record.get("fields"))
+    known = {c.name for c in schema}
+    extra = {k: None for r in (_rows(record) if rows is None else rows)
+             for k in (r.get("attributes") or {}) if k not in known}
+    return schema + [Column(k, "string") for k in extra]
+
+
+def collect_schema(arcgispro_path: Path, kind: str = "layers", name: Optional[str] = None,
+                   map_name: Optional[str] = None) -> List[Column]:
+    """Union of the schemas (``record_schema``) of the selected records."""
+    context = load_context_files(arcgispro_path)
+    return merge_schemas(record_schema(rec) for rec in _records(context, kind, name, map_name, ()))
+
+
+def project(schema: List[Column], columns: Optional[Sequence[str]]) -> List[Column]:
+    """
+    Select columns by name (case-insensitive), in the requested order.
+
+    Columns keep the requested spelling; names missing from ``schema``
+    become string columns of nulls.
+    """
+    if columns is None:
+        return list(schema)
+    types = {c.name.lower(): c.type for c in schema}
+    return [Column(c, types.get(c.lower(), "string")) for c in columns]
+
+
+def iter_sample_batches(
+    arcgispro_path: Path,
+    kind: str = "layers",
+    name: Optional[str] = None,
+    map_name: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    geometry: bool = False,
+) -> Iterator[SampleBatch]:
+    """
+    Yield one column batch per layer (or table) that has sample rows.
+
+    Args:
+        arcgispro_path: Path to .arcgispro folder
+        kind: "layers" or "tables"
+        name: Only records with this name (case-insensitive)
+        map_name: Only records of this map
+        columns: Attribute columns to keep (default: the record's own fields)
+        geometry: Add the GeoJSON geometry as ``_geometry``
+
+    Yields:
+        SampleBatch with ``_map``, ``_name``, the attribute columns and
+        optionally ``_geometry``
+    """
+    context = load_context_files(arcgispro_path)
+    for rec in _records(context, kind, name, map_name, ()):
+        rows = _rows(rec)
+        if not rows:
+            continue
+        if columns is None:
+            schema = record_schema(rec, rows)
+        else:
+            schema = project(schema_for(rec.get("fields")), columns)
+
+        batch = SampleBatch(str(rec.get("name") or ""), rec.get("mapName"))
+        batch.columns[MAP_COLUMN] = [batch.map_name] * len(rows)
+        batch.columns[NAME_COLUMN] = [batch.name] * len(rows)
+        attributes = [r.get("attributes") or {} for r in rows]
+        if columns is not None:
+            # Attribute keys are matched case-insensitively when projecting
+            attributes = [{k.lower(): v for k, v in a.items()} for a in attributes]
+        for col in schema:
+            key = col.name.lower() if columns is not None else col.name
+            batch.columns[col.name] = [coerce(a.get(key), col.type) for a in attributes]
+        if geometry:
+            batch.columns[GEOMETRY_COLUMN] = [r.get("geometry") for r in rows]
+        yield batch
+
+
+def output_columns(schema: List[Column], geometry: bool) -> List[Column]:
+    """Full output schema: map and name columns, attributes, optional geometry."""
+    cols = [Column(MAP_COLUMN, "string"), Column(NAME_COLUMN, "string")] + list(schema)
+    if geometry:
+        cols.append(Column(GEOMETRY_COLUMN, "geometry"))
+    return cols
+
+
+def write_csv(batches: Iterable[SampleBatch], columns: List[Column], out: IO[str]) -> int:
+    """Write batches as CSV with a header; returns the number of rows."""
+    import csv
+
+    writer = csv.writer(out, lineterminator="\n")
+    names = [c.name for c in columns]
+    writer.writerow(names)
+    total = 0
+    for batch in batches:
+        cols = [batch.columns.get(n) for n in names]
+        for i in range(batch.num_rows):
+            row = []
+            for col, values in zip(columns, cols):
+                value = values[i] if values is not None else None
+                if col.type == "geometry" and value is not None:
+                    value = json.dumps(value, separators=(",", ":"))
+                row.append(value)
+            writer.writerow(row)
+        total += batch.num_rows
+    return total
+
+
+def write_ndjson(batches: Iterable[SampleBatch], out: IO[str]) -> int:
+    """Write one JSON object per row; returns the number of rows."""
+    total = 0
+    for batch in batches:
+        names = list(batch.columns)
+        for values in zip(*(batch.columns[n] for n in names)):
+            out.write(json.dumps(dict(zip(names, values)), separators=(",", ":")) + "\n")
+        total += batch.num_rows
+    return total
+
+
+def _arrow_value(value: Any, type_: str) -> Any:
+    # Batches are typed by their own record; the merged schema may differ
+    value = coerce(value, type_)
+    if value is None:
+        return None
+    if type_ == "timestamp":
+        return _parse_timestamp(str(value))
+    if type_ == "date":
+        parsed = _parse_timestamp(str(value))
+        return parsed.date() if parsed is not None else None
+    if type_ == "geometry":
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def write_arrow(batches: Iterable[SampleBatch], columns: List[Column], path: Path, fmt: str = "parquet") -> int:
+    """
+    Write batches to a Parquet file or an Arrow IPC file.
+
+    Each batch becomes one record batch (one Parquet row group write), so
+    only one layer's rows are held at a time.
+
+    Raises:
+        ImportError: pyarrow is not installed
+    """
+    import pyarrow as pa
+
+    arrow_types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "date": pa.date32(),
+        "geometry": pa.string(),
+    }
+    schema = pa.schema([pa.field(c.name, arrow_types[c.type]) for c in columns])
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(str(path), schema)
+    else:
+        writer = pa.ipc.new_file(str(path), schema)
+
+    total = 0
+    try:
+        for batch in batches:
+            n = batch.num_rows
+            arrays = []
+            for col, arrow_field in zip(columns, schema):
+                values = batch.columns.get(col.name)
+                if values is None:
+                    arrays.append(pa.nulls(n, arrow_field.type))
+                else:
+                    arrays.append(pa.array([_arrow_value(v, col.type) for v in values], type=arrow_field.type))
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            total += n
+    finally:
+        writer.close()
+    return total
@@ -0,0 +1,284 @@
+"""Ranked full-text search over the exported context.
+
+Documents are layers, standalone tables, their fields and notebooks. The
+searchable text is:
+
+    layer     name (boosted), definition query, data source path
+    table     name (boosted), definition query, data source path
+    field     name (boosted), alias, domain name
+    notebook  name (boosted), description
+
+Text is split into words and identifiers are split further on CamelCase,
+snake_case and digit boundaries (``PARCEL_ID`` -> ``parcel``, ``id``, plus
+the joined ``parcelid``), so ``parcel id`` and ``parcelid`` find
+``PARCEL_ID`` and ``ParcelId`` alike; a trailing plural "s" is dropped.
+Results are ranked with BM25.
+
+The inverted index is split into one segment per source file (layers,
+tables, notebooks), each persisted in ``.arcgispro/cache/search.<name>.pickle``
+keyed by the stamp of its file. A re-export rebuilds only the segments whose
+file changed; collection statistics (document count, document frequencies,
+average length) are summed over segments at query time, so scores don't
+depend on how the index is split.
+"""
+
+import math
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .cache import CACHE_FORMAT, MISS, cache_enabled, file_stamp, get_cache_folder, read_entry, write_entry
+from .paths import get_context_folder, load_context_files
+from .profiling import span
+
+# Bump when the persisted segment payload changes shape.
+SEARCH_FORMAT = 1
+
+SEARCH_KINDS = ("layer", "table", "field", "notebook")
+
+# One segment per source file (notebooks.json is not in CONTEXT_FILES)
+SEGMENTS = ("layers", "tables", "notebooks")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Name tokens are counted this many times, so a name match outranks the
+# same word in a path or description
+NAME_BOOST = 2
+
+_WORDS = re.compile(r"\w+")
+_PARTS = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def _singular(term: str) -> str:
+    # Just enough stemming for "parcels" to find "parcel" (not "status", "gis", "address")
+    if len(term) > 3 and term[-1] == "s" and term[-2] not in "isu":
+        return term[:-1]
+    return term
+
+
+def tokenize(text: Any) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Identifiers are split on CamelCase, snake_case and digit boundaries;
+    a split word also yields its joined form. A plural "s" is dropped.
+    """
+    if not text:
+        return []
+    terms: List[str] = []
+    for word in _WORDS.findall(str(text)):
+        parts = []
+        for piece in word.split("_"):
+            split = _PARTS.findall(piece)
+            # Leave words with non-ASCII letters whole
+            parts.extend(split if "".join(split) == piece else [piece])
+        parts = [p.lower() for p in parts if p]
+        terms.extend(_singular(p) for p in parts)
+        if len(parts) > 1:
+            terms.append(_singular("".join(parts)))
+    return terms
+
+
+@dataclass
+class SearchHit:
+    """One ranked document."""
+
+    kind: str
+    name: str
+    map_name: Optional[str]
+    owner: Optional[str]  # layer/table of a field
+    detail: Optional[str]  # alias, data source or description shown with the hit
+    score: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "mapName": self.map_name,
+            "owner": self.owner,
+            "detail": self.detail,
+            "score": round(self.score, 4),
+        }
+
+
+class _SegmentBuilder:
+    def __init__(self):
+        self.docs: List[Tuple[str, str, Optional[str], Optional[str], Optional[str]]] = []
+        self.lengths = array("I")
+        self.postings: Dict[str, Dict[int, int]] = {}
+
+    def add(self, kind: str, name: Any, map_name: Any, owner: Any, detail: Any, texts: Iterable[Any]) -> None:
+        doc = len(self.docs)
+        self.docs.append((kind, str(name or ""), map_name or None, owner or None, detail or None))
+        terms = tokenize(name) * NAME_BOOST
+        for text in texts:
+            terms.extend(tokenize(text))
+        self.lengths.append(len(terms))
+        for term in terms:
+            tf = self.postings.setdefault(term, {})
+            tf[doc] = tf.get(doc, 0) + 1
+
+    def fields(self, fields: Any, map_name: Any, owner: Any) -> None:
+        for f in fields if isinstance(fields, list) else ():
+            if isinstance(f, dict):
+                self.add("field", f.get("name"), map_name, owner, f.get("alias"),
+                         (f.get("alias"), f.get("domainName")))
+
+    def payload(self) -> Dict[str, Any]:
+        terms = sorted(self.postings)
+        postings = {}
+        for term in terms:
+            tf = self.postings[term]
+            postings[term] = (array("I", tf.keys()), array("I", tf.values()))
+        return {"docs": self.docs, "lengths": self.lengths, "terms": terms, "postings": postings}
+
+
+def _records(value: Any) -> Iterator[Dict[str, Any]]:
+    for rec in value if isinstance(value, list) else ():
+        if isinstance(rec, dict):
+            yield rec
+
+
+def build_segment(name: str, context: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Build the index payload of one segment ("layers", "tables" or "notebooks").
+
+    Args:
+        name: Segment name
+        context: ``paths.LazyContext`` (compacted exports read their shards)
+            or a plain dict; notebooks are read from ``context["notebooks"]``
+            when present, else from context/notebooks.json
+    """
+    builder = _SegmentBuilder()
+    arcgispro_path = getattr(context, "arcgispro_path", None)
+
+    if name in ("layers", "tables"):
+        kind = name[:-1]
+        for rec in _records(context.get(name)):
+            if arcgispro_path is not None and "fields" not in rec and rec.get("shard"):
+                from .shards import load_record_details
+
+                rec = load_record_details(arcgispro_path, name, rec)
+            map_name = rec.get("mapName")
+            builder.add(kind, rec.get("name"), map_name, None, rec.get("dataSourcePath"),
+                        (rec.get("definitionQuery"), rec.get("dataSourcePath")))
+            builder.fields(rec.get("fields"), map_name, rec.get("name"))
+    elif name == "notebooks":
+        notebooks = context.get("notebooks") if "notebooks" in context else None
+        if notebooks is None and arcgispro_path is not None:
+            from .cache import load_cached_json
+
+            notebooks = load_cached_json(arcgispro_path, _notebooks_path(arcgispro_path))
+        for nb in _records(notebooks):
+            builder.add("notebook", nb.get("name"), None, None, nb.get("description"), (nb.get("description"),))
+    else:
+        raise ValueError(f"unknown search segment: {name}")
+    return builder.payload()
+
+
+def _notebooks_path(arcgispro_path: Path) -> Path:
+    return get_context_folder(arcgispro_path) / "notebooks.json"
+
+
+def _segment_source(context, name: str) -> Path:
+    if name == "notebooks":
+        return _notebooks_path(context.arcgispro_path)
+    return context.path_for(name)
+
+
+class SearchIndex:
+    """BM25 search over a set of segment payloads."""
+
+    def __init__(self, segments: Sequence[Dict[str, Any]]):
+        self.segments = list(segments)
+        self.doc_count = sum(len(s["docs"]) for s in self.segments)
+        total = sum(sum(s["lengths"]) for s in self.segments)
+        self.avg_length = total / self.doc_count if self.doc_count else 0.0
+
+    def _expand(self, term: str) -> List[str]:
+        """The term itself if indexed anywhere, else the indexed terms it prefixes."""
+        if any(term in s["postings"] for s in self.segments):
+            return [term]
+        expanded = set()
+        for s in self.segments:
+            terms = s["terms"]
+            i = bisect_left(terms, term)
+            while i < len(terms) and terms[i].startswith(term):
+                expanded.add(terms[i])
+                i += 1
+        return sorted(expanded)
+
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None, limit: Optional[int] = 20) -> List[SearchHit]:
+        """
+        Rank documents against a query.
+
+        A query term that matches no indexed term exactly is treated as a
+        prefix (``parc`` finds ``parcel`` and ``parcels``).
+
+        Args:
+            query: Free text
+            kinds: Only these document kinds (see ``SEARCH_KINDS``)
+            limit: Maximum hits (None for all)
+
+        Returns:
+            Hits by descending score
+        """
+        terms = []
+        for term in dict.fromkeys(tokenize(query)):
+            terms.extend(self._expand(term))
+        if not terms or not self.doc_count:
+            return []
+        wanted = set(kinds) if kinds else None
+        n = self.doc_count
+        avg = self.avg_length or 1.0
+
+        scores: List[Dict[int, float]] = [{} for _ in self.segments]
+        for term in dict.fromkeys(terms):
+            df = sum(len(s["postings"][term][0]) for s in self.segments if term in s["postings"])
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            for s, seg_scores in zip(self.segments, scores):
+                entry = s["postings"].get(term)
+                if entry is None:
+                    continue
+                lengths = s["lengths"]
+                for doc, tf in zip(*entry):
+                    norm = K1 * (1.0 - B + B * lengths[doc] / avg)
+                    seg_scores[doc] = seg_scores.get(doc, 0.0) + idf * tf * (K1 + 1.0) / (tf + norm)
+
+        hits: List[SearchHit] = []
+        for s, seg_scores in zip(self.segments, scores):
+            docs = s["docs"]
+            for doc, score in seg_scores.items():
+                kind, name, map_name, owner, detail = docs[doc]
+                if wanted is None or kind in wanted:
+                    hits.append(SearchHit(kind, name, map_name, owner, detail, score))
+
+        hits.sort(key=lambda h: (-h.score, h.kind, h.name.lower()))
+        return hits[:limit] if limit is not None else hits
+
+
+def load_search_index(arcgispro_path: Path) -> SearchIndex:
+    """
+    Load the persisted segments, rebuilding those whose source file changed.
+
+    With ``ARCGISPRO_CLI_NO_CACHE`` set, every segment is built in memory.
+    """
+    context = load_context_files(arcgispro_path)
+    use_cache = cache_enabled()
+    segments = []
+    for name in SEGMENTS:
+        header = (CACHE_FORMAT, SEARCH_FORMAT, name, file_stamp(_segment_source(context, name)))
+        entry = get_cache_folder(arcgispro_path) / f"search.{name}.pickle"
+        payload = read_entry(entry, header) if use_cache else MISS
+        if payload is MISS:
+            with span("search index"):
+                payload = build_segment(name, context)
+            if use_cache:
+                write_entry(entry, header, payload)
+        segments.append(payload)
+    return SearchIndex(segments)
@@ -8,6 +8,17 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from .paths import find_arcgispro_folder
+
+
+def _session_file() -> Optional[Path]:
+    """Return .arcgispro/session.json of the resolved export folder, if present."""
+    arcgispro_path = find_arcgispro_folder()
+    if arcgispro_path is None:
+        return None
+    session_file = arcgispro_path / "session.json"
+    return session_file if session_file.exists() else None
+
 
 def get_session_info() -> Optional[dict]:
     """Read current ArcGIS Pro session info from .arcgispro/session.json.
@@ -16,17 +27,9 @@ def get_session_info() -> Optional[dict]:
         Dict with processId, timestamp, tempPath, proTempPath, or None if not found.
     """
     try:
-        # Look for session.json starting from current directory
-        session_file = Path.cwd() / ".arcgispro" / "session.json"
-        
-        if not session_file.exists():
-            # Try parent directories
-            for parent in Path.cwd().parents:
-                session_file = parent / ".arcgispro" / "session.json"
-                if session_file.exists():
-                    break
-            else:
-                return None
+        session_file = _session_file()
+        if session_file is None:
+            return None
         
         with open(session_file) as f:
             return json.load(f)
@@ -83,16 +86,9 @@ def is_pro_running() -> bool:
         True if session.json exists and appears recent (< 24 hours old).
     """
     try:
-        session_file = Path.cwd() / ".arcgispro" / "session.json"
-        
-        if not session_file.exists():
-            # Try parent directories
-            for parent in Path.cwd().parents:
-                session_file = parent / ".arcgispro" / "session.json"
-                if session_file.exists():
-                    break
-            else:
-                return False
+        session_file = _session_file()
+        if session_file is None:
+            return False
         
         # Check if file is less than 24 hours old
         import time
@@ -0,0 +1,177 @@
+"""Sharded layout for heavy layer/table payloads.
+
+``layers.json`` and ``tables.json`` embed ``fields`` and ``sampleData`` in
+every record, so any consumer pays for all of them. ``arcgis compact``
+rewrites an export into:
+
+    context/layers.index.json        # slim records (no fields/sampleData)
+    context/layers/<shard>.json      # fields + sampleData for one layer
+    context/tables.index.json
+    context/tables/<shard>.json
+
+Each slim record carries a ``shard`` key naming its shard file (the stable
+``id`` when present). The index is preferred over the monolithic file as
+long as it is at least as new; a later Snapshot that rewrites layers.json
+makes the index stale and the CLI falls back to layers.json.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .paths import HEAVY_RECORD_KEYS, get_context_folder, iter_json_records, load_json_file
+from .profiling import profiled
+
+SHARDED_KINDS = ("layers", "tables")
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def get_shard_index_path(arcgispro_path: Path, kind: str) -> Path:
+    """Get the slim index file for a kind, e.g. context/layers.index.json."""
+    return get_context_folder(arcgispro_path) / f"{kind}.index.json"
+
+
+def get_shard_folder(arcgispro_path: Path, kind: str) -> Path:
+    """Get the shard folder for a kind, e.g. context/layers/."""
+    return get_context_folder(arcgispro_path) / kind
+
+
+def shard_key(record: Dict[str, Any]) -> str:
+    """Return the shard file stem for a record (stable id, else a name hash)."""
+    rid = record.get("id")
+    if rid:
+        return _UNSAFE.sub("_", str(rid))
+    key = f"{record.get('mapName') or ''}|{record.get('name') or ''}|{record.get('dataSourcePath') or ''}"
+    return "n-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def sharded_index_path(arcgispro_path: Path, kind: str) -> Optional[Path]:
+    """
+    Return the index file if the sharded layout should be used for ``kind``.
+
+    The index wins when the monolithic file is missing (compacted with
+    --prune) or not newer than the index.
+    """
+    index_path = get_shard_index_path(arcgispro_path, kind)
+    try:
+        index_mtime = index_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    source = get_context_folder(arcgispro_path) / f"{kind}.json"
+    try:
+        if source.stat().st_mtime_ns > index_mtime:
+            return None
+    except OSError:
+        pass
+    return index_path
+
+
+@profiled("details")
+def load_record_details(arcgispro_path: Path, kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return ``record`` with its fields/sampleData, reading its shard if needed.
+
+    Records from the monolithic files already carry their payload and are
+    returned unchanged.
+    """
+    shard = record.get("shard")
+    if not shard or "fields" in record:
+        return record
+    payload = load_json_file(get_shard_folder(arcgispro_path, kind) / f"{shard}.json") or {}
+    merged = {k: v for k, v in record.items() if k != "shard"}
+    for key in HEAVY_RECORD_KEYS:
+        merged[key] = payload.get(key) or []
+    return merged
+
+
+def _write_json_atomic(path: Path, obj: Any) -> None:
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def compact_kind(arcgispro_path: Path, kind: str, prune: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Write the sharded layout for one kind from its monolithic JSON file.
+
+    Records are streamed, so memory stays bounded by one record. The new
+    shards and index are written to temporary names and moved into place
+    with ``os.replace`` once complete.
+
+    Returns:
+        Dict with records, sourceBytes and indexBytes, or None if the
+        source file doesn't exist.
+    """
+    source = get_context_folder(arcgispro_path) / f"{kind}.json"
+    if not source.exists():
+        return None
+
+    # Build the new layout next to the old one and swap it in at the end, so
+    # a failure part way leaves the previous index and shards untouched
+    shard_dir = get_shard_folder(arcgispro_path, kind)
+    index_path = get_shard_index_path(arcgispro_path, kind)
+    new_dir = Path(tempfile.mkdtemp(dir=str(shard_dir.parent), prefix=f".{kind}.new-"))
+    new_index = new_dir.with_name(new_dir.name + ".index.json")
+    old_dir = None
+    try:
+        slim_records = []
+        seen: Dict[str, int] = {}
+        for record in iter_json_records(source):
+            key = shard_key(record)
+            # Same stable id twice (shouldn't happen, but ids are best effort)
+            if key in seen:
+                seen[key] += 1
+                key = f"{key}-{seen[key]}"
+            else:
+                seen[key] = 0
+
+            payload = {"id": record.get("id"), "name": record.get("name")}
+            for heavy in HEAVY_RECORD_KEYS:
+                payload[heavy] = record.get(heavy) or []
+            _write_json_atomic(new_dir / f"{key}.json", payload)
+
+            slim = {k: v for k, v in record.items() if k not in HEAVY_RECORD_KEYS}
+            slim["shard"] = key
+            slim_records.append(slim)
+        _write_json_atomic(new_index, slim_records)
+
+        if shard_dir.exists():
+            old_dir = Path(tempfile.mkdtemp(dir=str(shard_dir.parent), prefix=f".{kind}.old-"))
+            os.replace(shard_dir, old_dir / kind)
+        try:
+            os.replace(new_dir, shard_dir)
+        except OSError:
+            if old_dir is not None:
+                os.replace(old_dir / kind, shard_dir)
+            raise
+        os.replace(new_index, index_path)
+    finally:
+        shutil.rmtree(new_dir, ignore_errors=True)
+        new_index.unlink(missing_ok=True)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    source_bytes = source.stat().st_size
+
+    if prune:
+        source.unlink()
+
+    return {
+        "records": len(slim_records),
+        "sourceBytes": source_bytes,
+        "indexBytes": index_path.stat().st_size,
+    }
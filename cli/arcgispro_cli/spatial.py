@@ -0,0 +1,382 @@
+"""Bounding-box index over map extents and layer sample geometries.
+
+``maps.json`` gives each map an ``extent``; each layer's ``sampleData``
+carries GeoJSON geometries, whose combined bounding box stands in for
+where the layer has data. Boxes are bulk-loaded into packed STR-trees
+(Sort-Tile-Recursive: sort by x into vertical slices, sort each slice by y,
+pack runs of ``NODE_CAPACITY`` into nodes, repeat one level up), one tree
+per spatial reference. NumPy does the sorting and the per-node reductions
+when it is installed; otherwise the same tree is built with plain Python.
+
+The trees are persisted in ``.arcgispro/cache/spatial.pickle`` keyed by the
+stamps of maps.json and layers.json, so a query reads one small file and
+visits only the nodes that intersect the query box.
+
+Spatial references: map extents carry their wkid. Sample geometries don't,
+so a layer's box is assumed to be in its map's spatial reference. A query
+box in another spatial reference is converted between WGS84 (4326) and Web
+Mercator (3857/102100); boxes in other, unrelated references are skipped.
+"""
+
+import math
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cache import CACHE_FORMAT, MISS, cache_enabled, file_stamp, get_cache_folder, read_entry, write_entry
+from .profiling import span
+
+# Bump when the persisted payload changes shape.
+SPATIAL_FORMAT = 1
+
+SPATIAL_FILENAME = "spatial.pickle"
+
+NODE_CAPACITY = 16
+
+WGS84 = 4326
+WEB_MERCATOR = {3857, 102100, 102113, 900913}
+
+_EARTH_RADIUS = 6378137.0
+_MAX_LAT = 85.0511287798
+
+Box = Tuple[float, float, float, float]
+
+
+def optional_numpy():
+    """The numpy module, or None when it isn't installed (the ``numpy`` extra)."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class STRTree:
+    """
+    Packed, read-only R-tree over axis-aligned boxes.
+
+    ``levels[0]`` holds the item boxes in tree order (with ``order`` mapping
+    them back to input positions); ``levels[k]`` holds the boxes of nodes that
+    each cover ``capacity`` consecutive entries of ``levels[k - 1]``. Boxes
+    are stored as four flat ``array('d')`` columns, so the tree pickles
+    without NumPy.
+    """
+
+    def __init__(self, boxes: Sequence[Box], capacity: int = NODE_CAPACITY):
+        self.capacity = max(int(capacity), 2)
+        self.size = len(boxes)
+        np = optional_numpy()
+        if np is not None and boxes:
+            self.order, self.levels = self._build_numpy(np, boxes)
+        else:
+            self.order, self.levels = self._build_python(list(boxes))
+
+    # -- Building --------------------------------------------------------
+
+    def _build_numpy(self, np, boxes: Sequence[Box]):
+        m = self.capacity
+        b = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        order = self._str_order_numpy(np, b)
+        level = b[order]
+        levels = [level]
+        while len(level) > 1:
+            # Consecutive runs of m entries become one node (the last may be short)
+            starts = np.arange(0, len(level), m)
+            level = np.column_stack([
+                np.minimum.reduceat(level[:, 0], starts),
+                np.minimum.reduceat(level[:, 1], starts),
+                np.maximum.reduceat(level[:, 2], starts),
+                np.maximum.reduceat(level[:, 3], starts),
+            ])
+            levels.append(level)
+        return (array("l", order.tolist()),
+                [tuple(array("d", level[:, i].tolist()) for i in range(4)) for level in levels])
+
+    def _str_order_numpy(self, np, b):
+        m = self.capacity
+        n = len(b)
+        cx = (b[:, 0] + b[:, 2]) / 2.0
+        cy = (b[:, 1] + b[:, 3]) / 2.0
+        slices = max(math.ceil(math.sqrt(math.ceil(n / m))), 1)
+        per_slice = slices * m
+        by_x = np.argsort(cx, kind="stable")
+        parts = []
+        for start in range(0, n, per_slice):
+            chunk = by_x[start:start + per_slice]
+            parts.append(chunk[np.argsort(cy[chunk], kind="stable")])
+        return np.concatenate(parts)
+
+    def _build_python(self, boxes: List[Box]):
+        m = self.capacity
+        n = len(boxes)
+        slices = max(math.ceil(math.sqrt(math.ceil(n / m))), 1) if n else 1
+        per_slice = slices * m
+        by_x = sorted(range(n), key=lambda i: (boxes[i][0] + boxes[i][2]) / 2.0)
+        order: List[int] = []
+        for start in range(0, n, per_slice):
+            chunk = by_x[start:start + per_slice]
+            order.extend(sorted(chunk, key=lambda i: (boxes[i][1] + boxes[i][3]) / 2.0))
+
+        level = [boxes[i] for i in order]
+        levels = [level]
+        while len(level) > 1:
+            level = [
+                (min(b[0] for b in run), min(b[1] for b in run), max(b[2] for b in run), max(b[3] for b in run))
+                for run in (level[i:i + m] for i in range(0, len(level), m))
+            ]
+            levels.append(level)
+        return (array("l", order),
+                [tuple(array("d", (b[i] for b in level)) for i in range(4)) for level in levels])
+
+    # -- Querying --------------------------------------------------------
+
+    def query(self, box: Box) -> List[int]:
+        """Input positions of the boxes intersecting ``box`` (edges touching count), ascending."""
+        if not self.size:
+            return []
+        qx0, qy0, qx1, qy1 = box
+        m = self.capacity
+        top = len(self.levels) - 1
+        candidates: Iterable[int] = range(len(self.levels[top][0]))
+        for depth in range(top, -1, -1):
+            x0, y0, x1, y1 = self.levels[depth]
+            hits = [i for i in candidates if x0[i] <= qx1 and x1[i] >= qx0 and y0[i] <= qy1 and y1[i] >= qy0]
+            if depth == 0:
+                return sorted(self.order[i] for i in hits)
+            below = len(self.levels[depth - 1][0])
+            candidates = [c for i in hits for c in range(i * m, min((i + 1) * m, below))]
+        return []
+
+
+# -- Geometry helpers ----------------------------------------------------
+
+
+def parse_bbox(text: str) -> Box:
+    """
+    Parse "xmin,ymin,xmax,ymax".
+
+    Raises:
+        ValueError: Not four numbers, or min greater than max
+    """
+    parts = [p.strip() for p in str(text).split(",")]
+    if len(parts) != 4:
+        raise ValueError("expected xmin,ymin,xmax,ymax")
+    x0, y0, x1, y1 = (float(p) for p in parts)
+    if x0 > x1 or y0 > y1:
+        raise ValueError("xmin/ymin must not be greater than xmax/ymax")
+    return x0, y0, x1, y1
+
+
+def is_position(value: Any) -> bool:
+    """Whether a GeoJSON coordinate value is one position ([x, y, ...])."""
+    return (isinstance(value, (list, tuple)) and len(value) >= 2
+            and isinstance(value[0], (int, float)) and isinstance(value[1], (int, float)))
+
+
+def _extend_bounds(value: Any, bounds: List[float]) -> None:
+    # GeoJSON coordinates nest positions ([x, y, ...]) in lists; a list of
+    # positions (a ring or a line) is reduced column-wise in one go
+    if not isinstance(value, (list, tuple)) or not value:
+        return
+    if is_position(value):
+        value = [value]
+    elif not is_position(value[0]):
+        for item in value:
+            _extend_bounds(item, bounds)
+        return
+    try:
+        xs, ys = list(zip(*value))[:2]
+        x0, y0, x1, y1 = min(xs), min(ys), max(xs), max(ys)
+    except (TypeError, ValueError):
+        # Ragged or non-numeric positions: keep the valid ones
+        points = [p for p in value if is_position(p)]
+        if not points:
+            return
+        x0, y0 = min(p[0] for p in points), min(p[1] for p in points)
+        x1, y1 = max(p[0] for p in points), max(p[1] for p in points)
+    if bounds:
+        bounds[0], bounds[1] = min(bounds[0], x0), min(bounds[1], y0)
+        bounds[2], bounds[3] = max(bounds[2], x1), max(bounds[3], y1)
+    else:
+        bounds.extend((x0, y0, x1, y1))
+
+
+def geometry_bbox(geometries: Iterable[Any]) -> Optional[Box]:
+    """Bounding box of GeoJSON geometries (None when there are no coordinates)."""
+    bounds: List[float] = []
+    for geometry in geometries:
+        if isinstance(geometry, dict):
+            _extend_bounds(geometry.get("coordinates"), bounds)
+            for part in geometry.get("geometries") or ():
+                if isinstance(part, dict):
+                    _extend_bounds(part.get("coordinates"), bounds)
+    if not bounds:
+        return None
+    return tuple(float(v) for v in bounds)
+
+
+def extent_bbox(extent: Any) -> Optional[Box]:
+    """Box of a map ``extent`` dict (xMin/yMin/xMax/yMax), or None."""
+    if not isinstance(extent, dict):
+        return None
+    try:
+        box = tuple(float(extent[k]) for k in ("xMin", "yMin", "xMax", "yMax"))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if any(math.isnan(v) for v in box) or box[0] > box[2] or box[1] > box[3]:
+        return None
+    return box
+
+
+def _to_mercator(lon: float, lat: float) -> Tuple[float, float]:
+    lat = max(min(lat, _MAX_LAT), -_MAX_LAT)
+    x = math.radians(lon) * _EARTH_RADIUS
+    y = math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)) * _EARTH_RADIUS
+    return x, y
+
+
+def _to_wgs84(x: float, y: float) -> Tuple[float, float]:
+    lon = math.degrees(x / _EARTH_RADIUS)
+    lat = math.degrees(2 * math.atan(math.exp(y / _EARTH_RADIUS)) - math.pi / 2)
+    return lon, lat
+
+
+def transform_bbox(box: Box, from_wkid: Optional[int], to_wkid: Optional[int]) -> Optional[Box]:
+    """
+    Express a box in another spatial reference.
+
+    Unknown wkids and identical references return the box unchanged; only
+    WGS84 <-> Web Mercator is converted. Returns None when the two
+    references can't be related.
+    """
+    if from_wkid is None or to_wkid is None or from_wkid == to_wkid:
+        return box
+    if from_wkid in WEB_MERCATOR and to_wkid in WEB_MERCATOR:
+        return box
+    if from_wkid == WGS84 and to_wkid in WEB_MERCATOR:
+        x0, y0 = _to_mercator(box[0], box[1])
+        x1, y1 = _to_mercator(box[2], box[3])
+        return x0, y0, x1, y1
+    if from_wkid in WEB_MERCATOR and to_wkid == WGS84:
+        x0, y0 = _to_wgs84(box[0], box[1])
+        x1, y1 = _to_wgs84(box[2], box[3])
+        return x0, y0, x1, y1
+    return None
+
+
+# -- Index ---------------------------------------------------------------
+
+
+def _wkid(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _group_trees(entries: List[Tuple[Optional[int], int, Box]]) -> Dict[Optional[int], Tuple[STRTree, List[int]]]:
+    """wkid -> (tree, positions) for (wkid, position, box) entries."""
+    grouped: Dict[Optional[int], List[Tuple[int, Box]]] = {}
+    for wkid, position, box in entries:
+        grouped.setdefault(wkid, []).append((position, box))
+    return {
+        wkid: (STRTree([box for _, box in items]), [pos for pos, _ in items])
+        for wkid, items in grouped.items()
+    }
+
+
+def build_payload(maps: List[Dict[str, Any]], layers: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the per-spatial-reference trees.
+
+    Args:
+        maps: Map records (their extents are indexed by position)
+        layers: Layer records with ``sampleData`` (indexed by position)
+    """
+    map_wkids: Dict[str, Optional[int]] = {}
+    map_entries = []
+    for pos, m in enumerate(maps):
+        extent = m.get("extent")
+        wkid = _wkid((extent or {}).get("spatialReferenceWkid") if isinstance(extent, dict) else None)
+        if wkid is None:
+            wkid = _wkid(m.get("spatialReferenceWkid"))
+        map_wkids.setdefault(str(m.get("name") or "").lower(), wkid)
+        box = extent_bbox(extent)
+        if box is not None:
+            map_entries.append((wkid, pos, box))
+
+    layer_entries = []
+    layer_count = 0
+    for pos, layer in enumerate(layers):
+        layer_count += 1
+        rows = layer.get("sampleData") or ()
+        box = geometry_bbox(r.get("geometry") for r in rows if isinstance(r, dict))
+        if box is not None:
+            layer_entries.append((map_wkids.get(str(layer.get("mapName") or "").lower()), pos, box))
+
+    return {
+        "maps": _group_trees(map_entries),
+        "layers": _group_trees(layer_entries),
+        "counts": {"maps": len(maps), "layers": layer_count,
+                   "mapsIndexed": len(map_entries), "layersIndexed": len(layer_entries)},
+    }
+
+
+class SpatialIndex:
+    """Map extent and layer sample boxes, queried by bounding box."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self._p = payload
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return self._p["counts"]
+
+    @staticmethod
+    def _query(trees, box: Box, wkid: Optional[int]) -> List[int]:
+        positions: List[int] = []
+        for tree_wkid, (tree, tree_positions) in trees.items():
+            local = transform_bbox(box, wkid, tree_wkid)
+            if local is None:
+                continue
+            positions.extend(tree_positions[i] for i in tree.query(local))
+        return sorted(positions)
+
+    def maps_intersecting(self, box: Box, wkid: Optional[int] = None) -> List[int]:
+        """Positions (in maps.json) of maps whose extent intersects ``box``."""
+        return self._query(self._p["maps"], box, wkid)
+
+    def layers_intersecting(self, box: Box, wkid: Optional[int] = None) -> List[int]:
+        """Positions (in layers.json) of layers whose sample geometries' box intersects ``box``."""
+        return self._query(self._p["layers"], box, wkid)
+
+
+def load_spatial_index(arcgispro_path: Path) -> SpatialIndex:
+    """
+    Load the persisted index, rebuilding it if maps.json or layers.json
+    (or the compacted layers index) changed.
+
+    Args:
+        arcgispro_path: Path to .arcgispro folder
+    """
+    from .paths import load_context_files
+    from .shards import load_record_details
+
+    context = load_context_files(arcgispro_path)
+    maps_path, layers_path = context.path_for("maps"), context.path_for("layers")
+    header = (CACHE_FORMAT, SPATIAL_FORMAT, str(layers_path.name), file_stamp(maps_path), file_stamp(layers_path))
+    entry = get_cache_folder(arcgispro_path) / SPATIAL_FILENAME
+    if cache_enabled():
+        payload = read_entry(entry, header)
+        if payload is not MISS:
+            return SpatialIndex(payload)
+
+    with span("spatial index"):
+        maps = context.get("maps")
+        # Compacted exports keep sampleData in the shards
+        layers = (load_record_details(arcgispro_path, "layers", rec)
+                  for rec in context.records("layers"))
+        payload = build_payload(maps if isinstance(maps, list) else [], layers)
+    if cache_enabled():
+        write_entry(entry, header, payload)
+    return SpatialIndex(payload)
@@ -0,0 +1,459 @@
+"""SQLite database materialized from the exported context.
+
+``arcgis index`` writes the context JSON into a normalized database at
+``.arcgispro/cache/context.sqlite`` so questions that span maps, layers and
+fields are one query instead of a walk over ``layers.json``:
+
+    SELECT map_name, layer_name, feature_count
+    FROM layer_fields
+    WHERE field_name = 'PARCEL_ID' AND feature_count > 1000000
+
+Tables: ``project``, ``maps``, ``layers``, ``tables``, ``fields`` (owned by a
+layer or a standalone table), ``connections``, ``layouts``, ``map_frames``
+and ``geoprocessing``; views ``layer_fields`` and ``table_fields`` join
+fields to their owner. Name columns compare case-insensitively.
+
+The stamps (mtime, size) of the source files are stored in ``sources``; the
+database is rebuilt only when one of them changes. It is written to a
+temporary file and renamed into place, so readers never see a partial
+build.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .cache import file_stamp, get_cache_folder
+from .paths import CONTEXT_FILES, load_context_files
+from .profiling import profiled
+
+# Bump when the schema changes (stored as PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+DB_FILENAME = "context.sqlite"
+
+SCHEMA = """
+CREATE TABLE sources (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE project (
+    name TEXT COLLATE NOCASE,
+    path TEXT,
+    default_geodatabase TEXT,
+    default_toolbox TEXT,
+    last_modified TEXT,
+    exported_at TEXT,
+    machine_name TEXT,
+    user_name TEXT
+);
+CREATE TABLE maps (
+    id INTEGER PRIMARY KEY,
+    stable_id TEXT,
+    name TEXT COLLATE NOCASE,
+    map_type TEXT,
+    spatial_reference_name TEXT,
+    spatial_reference_wkid INTEGER,
+    layer_count INTEGER,
+    standalone_table_count INTEGER,
+    scale REAL,
+    is_active INTEGER,
+    x_min REAL,
+    y_min REAL,
+    x_max REAL,
+    y_max REAL
+);
+CREATE TABLE layers (
+    id INTEGER PRIMARY KEY,
+    stable_id TEXT,
+    name TEXT COLLATE NOCASE,
+    map_id INTEGER REFERENCES maps(id),
+    map_name TEXT COLLATE NOCASE,
+    layer_type TEXT,
+    geometry_type TEXT,
+    data_source_path TEXT COLLATE NOCASE,
+    data_source_type TEXT,
+    data_source_kind TEXT,
+    is_visible INTEGER,
+    is_editable INTEGER,
+    is_broken INTEGER,
+    definition_query TEXT,
+    renderer_type TEXT,
+    renderer_field TEXT,
+    feature_count INTEGER,
+    selection_count INTEGER,
+    parent_group_layer TEXT COLLATE NOCASE
+);
+CREATE TABLE tables (
+    id INTEGER PRIMARY KEY,
+    stable_id TEXT,
+    name TEXT COLLATE NOCASE,
+    map_id INTEGER REFERENCES maps(id),
+    map_name TEXT COLLATE NOCASE,
+    data_source_path TEXT COLLATE NOCASE,
+    data_source_type TEXT,
+    data_source_kind TEXT,
+    is_broken INTEGER,
+    definition_query TEXT,
+    row_count INTEGER
+);
+CREATE TABLE fields (
+    id INTEGER PRIMARY KEY,
+    layer_id INTEGER REFERENCES layers(id),
+    table_id INTEGER REFERENCES tables(id),
+    position INTEGER,
+    name TEXT COLLATE NOCASE,
+    alias TEXT COLLATE NOCASE,
+    field_type TEXT,
+    length INTEGER,
+    is_nullable INTEGER,
+    is_editable INTEGER,
+    domain_name TEXT
+);
+CREATE TABLE connections (
+    id INTEGER PRIMARY KEY,
+    name TEXT COLLATE NOCASE,
+    connection_type TEXT,
+    path TEXT COLLATE NOCASE
+);
+CREATE TABLE layouts (
+    id INTEGER PRIMARY KEY,
+    name TEXT COLLATE NOCASE,
+    page_width REAL,
+    page_height REAL,
+    page_units TEXT
+);
+CREATE TABLE map_frames (
+    id INTEGER PRIMARY KEY,
+    layout_id INTEGER REFERENCES layouts(id),
+    name TEXT COLLATE NOCASE,
+    map_name TEXT COLLATE NOCASE,
+    map_id INTEGER REFERENCES maps(id)
+);
+CREATE TABLE geoprocessing (
+    id INTEGER PRIMARY KEY,
+    tool_name TEXT COLLATE NOCASE,
+    display_name TEXT,
+    started_at TEXT,
+    ended_at TEXT,
+    succeeded INTEGER,
+    message_count INTEGER
+);
+
+CREATE INDEX maps_name ON maps(name);
+CREATE INDEX layers_name ON layers(name);
+CREATE INDEX layers_map ON layers(map_id);
+CREATE INDEX layers_map_name ON layers(map_name);
+CREATE INDEX layers_data_source ON layers(data_source_path);
+CREATE INDEX tables_name ON tables(name);
+CREATE INDEX tables_map ON tables(map_id);
+CREATE INDEX tables_map_name ON tables(map_name);
+CREATE INDEX tables_data_source ON tables(data_source_path);
+CREATE INDEX fields_name ON fields(name);
+CREATE INDEX fields_layer ON fields(layer_id);
+CREATE INDEX fields_table ON fields(table_id);
+CREATE INDEX map_frames_layout ON map_frames(layout_id);
+CREATE INDEX map_frames_map ON map_frames(map_id);
+
+CREATE VIEW layer_fields AS
+    SELECT l.id AS layer_id, l.map_name, l.name AS layer_name, l.layer_type, l.geometry_type,
+           l.data_source_path, l.feature_count, f.position, f.name AS field_name, f.alias,
+           f.field_type, f.length, f.is_nullable, f.domain_name
+    FROM fields f JOIN layers l ON l.id = f.layer_id;
+CREATE VIEW table_fields AS
+    SELECT t.id AS table_id, t.map_name, t.name AS table_name, t.data_source_path, t.row_count,
+           f.position, f.name AS field_name, f.alias, f.field_type, f.length, f.is_nullable,
+           f.domain_name
+    FROM fields f JOIN tables t ON t.id = f.table_id;
+"""
+
+class IndexBuildError(Exception):
+    """The context can't be loaded into the database."""
+
+
+# Tables reported by ``arcgis index``
+DATA_TABLES = ("maps", "layers", "tables", "fields", "connections", "layouts", "map_frames", "geoprocessing")
+
+
+def get_database_path(arcgispro_path: Path) -> Path:
+    """Get the SQLite database path (.arcgispro/cache/context.sqlite)."""
+    return get_cache_folder(arcgispro_path) / DB_FILENAME
+
+
+def _row(*values: Any) -> Tuple[Any, ...]:
+    """
+    INSERT parameters from JSON values.
+
+    Integers outside SQLite's 64-bit range and objects or arrays where a
+    scalar was expected are valid JSON but can't be bound. Such integers
+    are stored as REAL (so they still compare as numbers), or as TEXT when
+    even a double can't hold them; objects and arrays as their JSON text.
+    """
+    return tuple(_sql_value(v) for v in values)
+
+
+def _sql_value(value: Any) -> Any:
+    if isinstance(value, int) and not -2**63 <= value < 2**63:
+        try:
+            return float(value)
+        except OverflowError:
+            return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _flag(value: Any) -> Optional[int]:
+    return None if value is None else int(bool(value))
+
+
+def _dict(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _list(value: Any) -> List[Dict[str, Any]]:
+    return [v for v in value if isinstance(v, dict)] if isinstance(value, list) else []
+
+
+def source_stamps(context) -> List[Tuple[str, str, Optional[int], Optional[int]]]:
+    """(key, path relative to .arcgispro, mtime_ns, size) of every context file."""
+    stamps = []
+    for key in CONTEXT_FILES:
+        path = context.path_for(key)
+        stamp = file_stamp(path)
+        try:
+            rel = path.relative_to(context.arcgispro_path).as_posix()
+        except ValueError:
+            rel = str(path)
+        stamps.append((key, rel, *(stamp or (None, None))))
+    return stamps
+
+
+def _insert_fields(conn: sqlite3.Connection, owner: str, owner_id: int, fields: Iterable[Dict[str, Any]]) -> None:
+    conn.executemany(
+        f"INSERT INTO fields ({owner}, position, name, alias, field_type, length, is_nullable, is_editable, "
+        "domain_name) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            _row(owner_id, pos, f.get("name"), f.get("alias"), f.get("fieldType"), f.get("length"),
+             _flag(f.get("isNullable")), _flag(f.get("isEditable")), f.get("domainName"))
+            for pos, f in enumerate(fields)
+        ],
+    )
+
+
+def populate(conn: sqlite3.Connection, context: Mapping[str, Any]) -> None:
+    """
+    Create the schema in an empty database and fill it from a context.
+
+    Args:
+        conn: Connection to an empty database
+        context: ``paths.LazyContext`` (compacted exports read their shards)
+            or a plain dict of context key -> parsed JSON
+    """
+    arcgispro_path = getattr(context, "arcgispro_path", None)
+    conn.executescript(SCHEMA)
+
+    meta = _dict(context.get("meta"))
+    project = _dict(context.get("project"))
+    if project or meta:
+        conn.execute(
+            "INSERT INTO project VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            _row(project.get("name"), project.get("path"), project.get("defaultGeodatabase"),
+             project.get("defaultToolbox"), project.get("lastModified"), meta.get("exportedAt"),
+             meta.get("machineName"), meta.get("userName")),
+        )
+
+    map_ids: Dict[str, int] = {}
+    for m in _list(context.get("maps")):
+        extent = _dict(m.get("extent"))
+        cur = conn.execute(
+            "INSERT INTO maps (stable_id, name, map_type, spatial_reference_name, spatial_reference_wkid, "
+            "layer_count, standalone_table_count, scale, is_active, x_min, y_min, x_max, y_max) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _row(m.get("id"), m.get("name"), m.get("mapType"), m.get("spatialReferenceName"),
+             m.get("spatialReferenceWkid"), m.get("layerCount"), m.get("standaloneTableCount"),
+             m.get("scale"), _flag(m.get("isActiveMap")), extent.get("xMin"), extent.get("yMin"),
+             extent.get("xMax"), extent.get("yMax")),
+        )
+        map_ids.setdefault(str(m.get("name") or "").lower(), cur.lastrowid)
+
+    def map_id(name: Any) -> Optional[int]:
+        return map_ids.get(str(name or "").lower())
+
+    def records(kind: str):
+        # Fields are needed, so parse the whole file (through the parse cache)
+        # rather than streaming it; compacted exports read them from the shards
+        for rec in _list(context.get(kind)):
+            if arcgispro_path is not None and "fields" not in rec and rec.get("shard"):
+                from .shards import load_record_details
+
+                rec = load_record_details(arcgispro_path, kind, rec)
+            yield rec
+
+    for layer in records("layers"):
+        cur = conn.execute(
+            "INSERT INTO layers (stable_id, name, map_id, map_name, layer_type, geometry_type, data_source_path, "
+            "data_source_type, data_source_kind, is_visible, is_editable, is_broken, definition_query, "
+            "renderer_type, renderer_field, feature_count, selection_count, parent_group_layer) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _row(layer.get("id"), layer.get("name"), map_id(layer.get("mapName")), layer.get("mapName"),
+             layer.get("layerType"), layer.get("geometryType"), layer.get("dataSourcePath"),
+             layer.get("dataSourceType"), layer.get("dataSourceKind"), _flag(layer.get("isVisible")),
+             _flag(layer.get("isEditable")), _flag(layer.get("isBroken")), layer.get("definitionQuery"),
+             layer.get("rendererType"), layer.get("rendererField"), layer.get("featureCount"),
+             layer.get("selectionCount"), layer.get("parentGroupLayer")),
+        )
+        _insert_fields(conn, "layer_id", cur.lastrowid, _list(layer.get("fields")))
+
+    for table in records("tables"):
+        cur = conn.execute(
+            "INSERT INTO tables (stable_id, name, map_id, map_name, data_source_path, data_source_type, "
+            "data_source_kind, is_broken, definition_query, row_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _row(table.get("id"), table.get("name"), map_id(table.get("mapName")), table.get("mapName"),
+             table.get("dataSourcePath"), table.get("dataSourceType"), table.get("dataSourceKind"),
+             _flag(table.get("isBroken")), table.get("definitionQuery"), table.get("rowCount")),
+        )
+        _insert_fields(conn, "table_id", cur.lastrowid, _list(table.get("fields")))
+
+    conn.executemany(
+        "INSERT INTO connections (name, connection_type, path) VALUES (?, ?, ?)",
+        [_row(c.get("name"), c.get("connectionType"), c.get("path")) for c in _list(context.get("connections"))],
+    )
+
+    for layout in _list(context.get("layouts")):
+        cur = conn.execute(
+            "INSERT INTO layouts (name, page_width, page_height, page_units) VALUES (?, ?, ?, ?)",
+            _row(layout.get("name"), layout.get("pageWidth"), layout.get("pageHeight"), layout.get("pageUnits")),
+        )
+        names = layout.get("mapFrameNames")
+        frames = _list(layout.get("mapFrames")) or [
+            {"name": name} for name in (names if isinstance(names, list) else []) if isinstance(name, str)
+        ]
+        conn.executemany(
+            "INSERT INTO map_frames (layout_id, name, map_name, map_id) VALUES (?, ?, ?, ?)",
+            [_row(cur.lastrowid, f.get("name"), f.get("mapName"), map_id(f.get("mapName"))) for f in frames],
+        )
+
+    geoprocessing = context.get("geoprocessing") or {}
+    history = geoprocessing.get("history") if isinstance(geoprocessing, dict) else geoprocessing
+    conn.executemany(
+        "INSERT INTO geoprocessing (tool_name, display_name, started_at, ended_at, succeeded, message_count) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            _row(g.get("toolName"), g.get("displayName"), g.get("startedAt"), g.get("endedAt"),
+             _flag(g.get("succeeded")), g.get("messageCount"))
+            for g in _list(history)
+        ],
+    )
+
+
+def _populate(conn: sqlite3.Connection, context: Mapping[str, Any]) -> None:
+    try:
+        populate(conn, context)
+    except (sqlite3.Error, OverflowError, TypeError, ValueError) as e:
+        raise IndexBuildError(str(e)) from e
+
+
+def _stored_stamps(db_path: Path) -> Optional[List[tuple]]:
+    """Stamps recorded in an existing database, or None if it is missing or from another schema."""
+    if not db_path.exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                return None
+            return [tuple(r) for r in conn.execute("SELECT key, path, mtime_ns, size FROM sources ORDER BY rowid")]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+@profiled("sql index")
+def build_index(arcgispro_path: Path, force: bool = False) -> Tuple[Path, bool]:
+    """
+    Build the database unless it is already current.
+
+    Args:
+        arcgispro_path: Path to .arcgispro folder
+        force: Rebuild even when the source files are unchanged
+
+    Returns:
+        (database path, whether it was rebuilt)
+
+    Raises:
+        OSError: The cache folder can't be written
+        IndexBuildError: The context can't be loaded into the database
+    """
+    context = load_context_files(arcgispro_path)
+    db_path = get_database_path(arcgispro_path)
+    stamps = source_stamps(context)
+    if not force and _stored_stamps(db_path) == stamps:
+        return db_path, False
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(db_path.parent), prefix=".context.", suffix=".sqlite.tmp")
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            with conn:
+                _populate(conn, context)
+                conn.executemany("INSERT INTO sources VALUES (?, ?, ?, ?)", stamps)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        finally:
+            conn.close()
+        os.replace(tmp, db_path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return db_path, True
+
+
+def _deny_attach(action, arg1, arg2, db_name, trigger):
+    # mode=ro/query_only cover the database itself; ATTACH (which VACUUM
+    # INTO also goes through) would create or write files elsewhere
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+def connect(arcgispro_path: Path) -> sqlite3.Connection:
+    """
+    Open a read-only connection to an up-to-date database.
+
+    The database is rebuilt first if the context changed. When the cache
+    folder can't be written (a read-only share) the database is built in
+    memory for this connection instead. ATTACH and DETACH are refused, so
+    queries can't reach other files.
+
+    Raises:
+        IndexBuildError: The context can't be loaded into the database
+    """
+    try:
+        db_path, _ = build_index(arcgispro_path)
+    except (OSError, sqlite3.OperationalError):
+        conn = sqlite3.connect(":memory:")
+        with conn:
+            _populate(conn, load_context_files(arcgispro_path))
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    conn.set_authorizer(_deny_attach)
+    return conn
+
+
+def table_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Row count of each data table."""
+    return {name: conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] for name in DATA_TABLES}
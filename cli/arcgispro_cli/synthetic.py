@@ -0,0 +1,257 @@
+"""Synthetic ``.arcgispro`` exports for benchmarks and tests.
+
+``generate_export`` writes an export with the same layout and JSON shape as
+the ProExporter add-in (``ProExporter/Models.cs`` serialized with camelCase
+names, two-space indentation and nulls omitted), sized by ``ExportSpec``.
+Ids are derived the way ``StableIds.cs`` derives them (UUIDv5 over the
+same namespace and keys), so they are deterministic for a given spec.
+"""
+
+import json
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# StableIds.Namespace in the add-in
+STABLE_ID_NAMESPACE = uuid.UUID("2b62dd2f-2b6e-4f1a-9a0d-c1f7c54fd0db")
+
+PROJECT_URI = "C:/GIS/Synthetic/Synthetic.aprx"
+
+_GEOMETRY_TYPES = ("Point", "Polyline", "Polygon")
+_GEOJSON_TYPES = {"Point": "Point", "Polyline": "LineString", "Polygon": "Polygon"}
+_FIELD_TYPES = ("String", "Integer", "Double", "Date", "SmallInteger", "GUID")
+_RENDERERS = ("SimpleRenderer", "UniqueValueRenderer", "ClassBreaksRenderer")
+
+
+@dataclass
+class ExportSpec:
+    """
+    Size of a synthetic export.
+
+    ``layers`` and ``tables`` are totals, spread evenly over the maps.
+    ``fields`` is per layer/table (plus OBJECTID and Shape), ``sample_rows``
+    per layer/table and ``vertices`` per sample line or polygon.
+    """
+
+    maps: int = 5
+    layers: int = 100
+    tables: int = 10
+    fields: int = 12
+    sample_rows: int = 3
+    vertices: int = 10
+    connections: int = 5
+    seed: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+# Named sizes for `arcgis bench --size`
+EXPORT_SIZES = {
+    "small": ExportSpec(),
+    "medium": ExportSpec(maps=20, layers=2000, tables=200, fields=40, sample_rows=5, vertices=50),
+    "large": ExportSpec(maps=50, layers=10000, tables=1000, fields=60, sample_rows=10, vertices=100),
+}
+
+
+def _stable_id(key: str) -> str:
+    return str(uuid.uuid5(STABLE_ID_NAMESPACE, key))
+
+
+def _fields(rng: random.Random, count: int, with_shape: bool) -> List[Dict[str, Any]]:
+    fields = [{"name": "OBJECTID", "alias": "OBJECTID", "fieldType": "OID", "isNullable": False, "isEditable": False}]
+    if with_shape:
+        fields.append({"name": "Shape", "alias": "Shape", "fieldType": "Geometry", "isNullable": True, "isEditable": True})
+    for i in range(count):
+        ftype = _FIELD_TYPES[i % len(_FIELD_TYPES)]
+        field: Dict[str, Any] = {
+            "name": f"FIELD_{i:03d}",
+            "alias": f"Field {i}",
+            "fieldType": ftype,
+            "isNullable": rng.random() < 0.8,
+            "isEditable": True,
+        }
+        if ftype == "String":
+            field["length"] = rng.choice((16, 50, 255))
+        if i % 7 == 3:
+            field["domainName"] = f"Domain{i % 5}"
+        fields.append(field)
+    return fields
+
+
+def _value(rng: random.Random, ftype: str, row: int) -> Any:
+    if ftype == "OID":
+        return row + 1
+    if ftype in ("Integer", "SmallInteger"):
+        return rng.randint(0, 10000)
+    if ftype == "Double":
+        return round(rng.uniform(-1000, 1000), 4)
+    if ftype == "Date":
+        return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00"
+    if ftype == "GUID":
+        return "{" + str(uuid.UUID(int=rng.getrandbits(128))).upper() + "}"
+    return f"value {rng.randint(0, 99999)}"
+
+
+def _geometry(rng: random.Random, geometry_type: str, extent: Dict[str, float], vertices: int) -> Dict[str, Any]:
+    cx = rng.uniform(extent["xMin"], extent["xMax"])
+    cy = rng.uniform(extent["yMin"], extent["yMax"])
+    if geometry_type == "Point":
+        return {"type": "Point", "coordinates": [round(cx, 3), round(cy, 3)]}
+
+    coords = []
+    step = 50.0
+    x, y = cx, cy
+    for _ in range(max(vertices, 2)):
+        coords.append([round(x, 3), round(y, 3)])
+        x += rng.uniform(-step, step)
+        y += rng.uniform(-step, step)
+    if geometry_type == "Polyline":
+        return {"type": "LineString", "coordinates": coords}
+    coords.append(coords[0])
+    return {"type": "Polygon", "coordinates": [coords]}
+
+
+def _sample_rows(rng: random.Random, fields: List[Dict[str, Any]], spec: ExportSpec,
+                 geometry_type: Optional[str], extent: Dict[str, float]) -> List[Dict[str, Any]]:
+    rows = []
+    for row in range(spec.sample_rows):
+        attributes = {
+            f["name"]: _value(rng, f["fieldType"], row) for f in fields if f["fieldType"] != "Geometry"
+        }
+        sample: Dict[str, Any] = {"attributes": attributes}
+        if geometry_type:
+            sample["geometry"] = _geometry(rng, geometry_type, extent, spec.vertices)
+        rows.append(sample)
+    return rows
+
+
+def build_context(spec: ExportSpec) -> Dict[str, Any]:
+    """Build the context file payloads (key -> JSON value) for a spec."""
+    rng = random.Random(spec.seed)
+    map_names = [f"Map {i + 1:02d}" for i in range(max(spec.maps, 1))]
+
+    maps = []
+    extents = {}
+    for i, name in enumerate(map_names):
+        x0 = -13_200_000 + i * 50_000.0
+        y0 = 4_000_000 + i * 25_000.0
+        extent = {"xMin": x0, "yMin": y0, "xMax": x0 + 40_000.0, "yMax": y0 + 30_000.0, "spatialReferenceWkid": 3857}
+        extents[name] = extent
+        maps.append({
+            "id": _stable_id(f"map|project={PROJECT_URI}|name={name}|type=Map"),
+            "name": name,
+            "mapType": "Map",
+            "spatialReferenceName": "WGS_1984_Web_Mercator_Auxiliary_Sphere",
+            "spatialReferenceWkid": 3857,
+            "layerCount": 0,
+            "standaloneTableCount": 0,
+            "extent": extent,
+            "scale": float(rng.choice((2400, 10000, 24000, 100000))),
+            "isActiveMap": i == 0,
+        })
+
+    layers = []
+    for i in range(spec.layers):
+        m = maps[i % len(maps)]
+        m["layerCount"] += 1
+        geometry_type = _GEOMETRY_TYPES[i % len(_GEOMETRY_TYPES)]
+        name = f"Layer {i:05d} {geometry_type}"
+        source = f"C:/GIS/Synthetic/Data{i % 10}.gdb/FC_{i:05d}"
+        fields = _fields(rng, spec.fields, with_shape=True)
+        layer: Dict[str, Any] = {
+            "id": _stable_id(f"layer|project={PROJECT_URI}|map={m['name']}|path={name}|ds={source}|type=FeatureLayer"),
+            "name": name,
+            "mapName": m["name"],
+            "layerType": "FeatureLayer",
+            "geometryType": geometry_type,
+            "dataSourcePath": source,
+            "dataSourceType": "FileGDB",
+            "dataSourceKind": "file_gdb",
+            "isVisible": rng.random() < 0.7,
+            "isEditable": True,
+            "isBroken": rng.random() < 0.02,
+            "rendererType": _RENDERERS[i % len(_RENDERERS)],
+            "featureCount": rng.randint(0, 500_000),
+            "selectionCount": 0,
+            "fields": fields,
+            "joinedTables": [],
+            "relatedTables": [],
+            "sampleData": _sample_rows(rng, fields, spec, geometry_type, extents[m["name"]]),
+        }
+        if i % 5 == 0:
+            layer["definitionQuery"] = f"FIELD_001 > {rng.randint(0, 100)}"
+        layers.append(layer)
+
+    tables = []
+    for i in range(spec.tables):
+        m = maps[i % len(maps)]
+        m["standaloneTableCount"] += 1
+        name = f"Table {i:05d}"
+        source = f"C:/GIS/Synthetic/Tables.gdb/TBL_{i:05d}"
+        fields = _fields(rng, spec.fields, with_shape=False)
+        tables.append({
+            "id": _stable_id(f"table|project={PROJECT_URI}|map={m['name']}|name={name}|ds={source}|type=FileGDB"),
+            "name": name,
+            "mapName": m["name"],
+            "dataSourcePath": source,
+            "dataSourceType": "FileGDB",
+            "dataSourceKind": "file_gdb",
+            "isBroken": False,
+            "rowCount": rng.randint(0, 100_000),
+            "fields": fields,
+            "sampleData": _sample_rows(rng, fields, spec, None, extents[m["name"]]),
+        })
+
+    connections = [
+        {"name": f"Data{i}.gdb", "connectionType": "FileGDB", "path": f"C:/GIS/Synthetic/Data{i}.gdb"}
+        for i in range(spec.connections)
+    ]
+
+    return {
+        "meta": {
+            "version": "1.0",
+            "exportedAt": "2026-01-01T00:00:00Z",
+            "machineName": "SYNTHETIC",
+            "userName": "bench",
+        },
+        "project": {
+            "name": "Synthetic",
+            "path": PROJECT_URI,
+            "defaultGeodatabase": "C:/GIS/Synthetic/Synthetic.gdb",
+            "defaultToolbox": "C:/GIS/Synthetic/Synthetic.atbx",
+            "mapNames": map_names,
+            "layoutNames": [],
+        },
+        "maps": maps,
+        "layers": layers,
+        "tables": tables,
+        "connections": connections,
+        "layouts": [],
+        "geoprocessing": {"count": 0, "history": []},
+    }
+
+
+def generate_export(root: Path, spec: Optional[ExportSpec] = None) -> Path:
+    """
+    Write a synthetic export to ``root/.arcgispro``.
+
+    Args:
+        root: Project folder to write into (created if needed)
+        spec: Export size (defaults to ``ExportSpec()``)
+
+    Returns:
+        Path to the generated .arcgispro folder
+    """
+    from .paths import CONTEXT_FILES
+
+    spec = spec or ExportSpec()
+    arcgispro_path = Path(root) / ".arcgispro"
+    for key, value in build_context(spec).items():
+        path = arcgispro_path / CONTEXT_FILES[key]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(value, f, indent=2)
+    return arcgispro_path
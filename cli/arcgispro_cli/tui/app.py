@@ -11,6 +11,9 @@ from arcgispro_cli.tui.panels.log_panel import LogPanel
 from arcgispro_cli.tui.panels.map_preview_panel import MapPreviewPanel
 from arcgispro_cli.tui.state import TUIState
 
+# Seconds between checks of the context files for a new Snapshot
+WATCH_INTERVAL = 1.0
+
 
 class ArcGISProCLIApp(App):
     """Textual UI for browsing .arcgispro session exports."""
@@ -22,21 +25,39 @@ class ArcGISProCLIApp(App):
         ("q", "quit", "Quit"),
     ]
 
-    def __init__(self, repo_path: str = ".", **kwargs):
+    def __init__(self, repo_path: str = ".", show_banner: bool = True, watch: bool = True, **kwargs):
         super().__init__(**kwargs)
         self.state = TUIState(repo_path=repo_path)
+        self.show_banner = show_banner
+        self.watch_context = watch
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=False)
-        yield Banner()
+        if self.show_banner:
+            yield Banner()
         with Horizontal(id="main"):
             yield ProjectTree(id="tree-panel", state=self.state)
             with Vertical(id="right"):
                 yield DetailPanel(id="detail", state=self.state)
-                yield MapPreviewPanel(id="map-preview", classes="hidden")
+                yield MapPreviewPanel(id="map-preview", classes="hidden", state=self.state)
                 yield LogPanel(id="logs")
         yield Footer()
 
+    def on_mount(self) -> None:
+        if self.watch_context:
+            self.set_interval(WATCH_INTERVAL, self.check_for_changes)
+
+    def check_for_changes(self) -> None:
+        """Patch the tree for context files rewritten since the last check."""
+        changed = self.state.poll_changes()
+        if not changed:
+            return
+        tree = self.query_one("#tree-panel", ProjectTree)
+        count = tree.apply_changes(changed)
+        log = self.query_one("#logs", LogPanel)
+        names = ", ".join(changed)
+        log.write(f"[green]Detected changes in {names}[/] ({count} item(s) updated)")
+
     def action_reload(self) -> None:
         """Reload context files from disk."""
         self.state.reload()
@@ -48,32 +69,15 @@ class ArcGISProCLIApp(App):
     def on_project_tree_item_selected(self, msg: ProjectTree.ItemSelected) -> None:
         """Forward tree selection to detail panel and update map preview."""
         detail = self.query_one("#detail", DetailPanel)
-        detail.show_item(msg.kind, msg.data)
-        
-        # Show map preview for maps and layers
+        detail.show_item(msg.kind, msg.ref)
+
+        # Handles only: the panels resolve them in their workers, since a
+        # re-export makes the first resolve re-parse layers.json
         map_preview = self.query_one("#map-preview", MapPreviewPanel)
-        
-        if msg.kind in ("map", "layer"):
-            # Get image path for the map
-            from arcgispro_cli.paths import get_images_folder, sanitize_map_name
-            
-            ap = self.state.arcgispro_path
-            if ap:
-                img_folder = get_images_folder(ap)
-                
-                # For layers, get the map name; for maps, use the map name directly
-                if msg.kind == "layer":
-                    map_name = msg.data.get('mapName', '')
-                else:
-                    map_name = msg.data.get('name', '')
-                
-                sanitized = sanitize_map_name(map_name)
-                img_path = img_folder / f"map_{sanitized}.png"
-                
-                map_preview.show_map_preview(msg.data, img_path)
-                map_preview.remove_class("hidden")
-            else:
-                map_preview.add_class("hidden")
+        if msg.ref.kind in ("map", "layer"):
+            tree = self.query_one("#tree-panel", ProjectTree)
+            neighbours = [node.data for node in tree.neighbour_nodes() if node.data is not None]
+            map_preview.show_ref(msg.ref, neighbours)
         else:
             # Hide map preview for non-map/layer items
             map_preview.add_class("hidden")
@@ -81,6 +85,6 @@ class ArcGISProCLIApp(App):
     def action_help(self) -> None:
         self.notify(
             "Navigate the tree to browse maps, layers, and fields. "
-            "Press r to reload, q to quit.",
+            "Changes are picked up automatically; press r for a full reload, q to quit.",
             title="Help",
         )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict
 
@@ -7,8 +8,10 @@ from rich.panel import Panel
 from rich.table import Table
 from textual.app import ComposeResult
 from textual.widgets import Static
+from textual.worker import get_current_worker
 
 from arcgispro_cli.tui.panels.project_tree import ProjectTree
+from arcgispro_cli.tui.state import NodeRef
 
 # Keys to skip when rendering a generic property table
 _SKIP_KEYS = {"_kind", "_layer", "fields"}
@@ -24,28 +27,51 @@ class DetailPanel(Static):
     def on_mount(self) -> None:
         self.update(Panel("Select an item in the tree.", title="Details", border_style="cyan"))
 
-    def show_item(self, kind: str, data: Dict[str, Any]) -> None:
-        """Display details for the selected item."""
-        if kind == "project":
-            self._show_project(data)
-        elif kind == "map":
-            self._show_map(data)
-        elif kind == "layer":
-            self._show_layer(data)
-        elif kind == "field":
-            self._show_field(data)
-        elif kind == "table":
-            self._show_table(data)
-        elif kind == "connection":
-            self._show_connection(data)
+    def show_item(self, kind: str, ref: NodeRef) -> None:
+        """
+        Display details for the selected item.
+
+        The tree node's handle is resolved against the loaded context and
+        the panel is built in a worker thread (layer details may read a
+        shard file); a newer selection cancels a render still in flight.
+        """
+        self.run_worker(
+            partial(self._render_in_thread, kind, ref),
+            thread=True,
+            exclusive=True,
+            group="detail",
+        )
+
+    def _render_in_thread(self, kind: str, ref: NodeRef) -> None:
+        data = self.state.resolve(ref)
+        if data is None:
+            renderable = Panel("[dim]No longer in the export.[/dim]", title=kind.title(), border_style="cyan")
         else:
-            self._show_generic(kind, data)
+            renderable = self.render_item(kind, data)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.update, renderable)
+
+    def render_item(self, kind: str, data: Dict[str, Any]) -> Panel:
+        """Build the details panel for an item."""
+        if kind == "project":
+            return self._render_project(data)
+        if kind == "map":
+            return self._render_map(data)
+        if kind == "layer":
+            return self._render_layer(self.state.get_layer_details(data))
+        if kind == "field":
+            return self._render_field(data)
+        if kind == "table":
+            return self._render_table(data)
+        if kind == "connection":
+            return self._render_connection(data)
+        return self._render_generic(kind, data)
 
     # ------------------------------------------------------------------
     # Renderers
     # ------------------------------------------------------------------
 
-    def _show_project(self, d: Dict[str, Any]) -> None:
+    def _render_project(self, d: Dict[str, Any]) -> Panel:
         lines = [
             f"[bold]{d.get('name', 'Unknown')}[/]",
             f"Path: {d.get('path', '-')}",
@@ -53,9 +79,9 @@ class DetailPanel(Static):
             f"Maps: {len(d.get('mapNames', []))}",
             f"Layouts: {len(d.get('layoutNames', []))}",
         ]
-        self.update(Panel("\n".join(lines), title="Project", border_style="cyan"))
+        return Panel("\n".join(lines), title="Project", border_style="cyan")
 
-    def _show_map(self, d: Dict[str, Any]) -> None:
+    def _render_map(self, d: Dict[str, Any]) -> Panel:
         active = " ★ Active" if d.get("isActiveMap") else ""
         lines = [
             f"[bold]{d.get('name', 'Unknown')}[/]{active}",
@@ -68,14 +94,9 @@ class DetailPanel(Static):
             lines.append(f"Scale: 1:{d['scale']:,.0f}")
         
         # Check for map image
-        ap = self.state.arcgispro_path
-        if ap:
-            from arcgispro_cli.paths import get_images_folder, sanitize_map_name
-            img_folder = get_images_folder(ap)
-            sanitized = sanitize_map_name(d.get('name', ''))
-            img_path = img_folder / f"map_{sanitized}.png"
-            if img_path.exists():
-                lines.append(f"\n[dim]Image: {img_path.name}[/dim]")
+        img_path = self.state.map_image_path(d.get('name', ''))
+        if img_path and img_path.exists():
+            lines.append(f"\n[dim]Image: {img_path.name}[/dim]")
         
         # Show layer list
         layers = self.state.get_layers(map_name=d.get('name'))
@@ -88,9 +109,9 @@ class DetailPanel(Static):
             if len(layers) > 20:
                 lines.append(f"  [dim]... and {len(layers) - 20} more[/dim]")
         
-        self.update(Panel("\n".join(lines), title="Map", border_style="cyan"))
+        return Panel("\n".join(lines), title="Map", border_style="cyan")
 
-    def _show_layer(self, d: Dict[str, Any]) -> None:
+    def _render_layer(self, d: Dict[str, Any]) -> Panel:
         from rich.console import Group
         from rich.text import Text
         
@@ -143,9 +164,9 @@ class DetailPanel(Static):
             else:
                 renderables.append(tbl)
         
-        self.update(Panel(Group(*renderables), title="Layer", border_style="cyan"))
+        return Panel(Group(*renderables), title="Layer", border_style="cyan")
 
-    def _show_field(self, d: Dict[str, Any]) -> None:
+    def _render_field(self, d: Dict[str, Any]) -> Panel:
         lines = [
             f"[bold]{d.get('name', 'Unknown')}[/]",
             f"Layer: {d.get('_layer', '-')}",
@@ -159,9 +180,9 @@ class DetailPanel(Static):
             lines.append(f"Domain: {d['domainName']}")
         if d.get("defaultValue") is not None:
             lines.append(f"Default: {d['defaultValue']}")
-        self.update(Panel("\n".join(lines), title="Field", border_style="cyan"))
+        return Panel("\n".join(lines), title="Field", border_style="cyan")
 
-    def _show_table(self, d: Dict[str, Any]) -> None:
+    def _render_table(self, d: Dict[str, Any]) -> Panel:
         lines = [
             f"[bold]{d.get('name', 'Unknown')}[/]",
             f"Map: {d.get('mapName', '-')}",
@@ -169,16 +190,16 @@ class DetailPanel(Static):
         ]
         if d.get("rowCount") is not None:
             lines.append(f"Rows: {d['rowCount']:,}")
-        self.update(Panel("\n".join(lines), title="Table", border_style="cyan"))
+        return Panel("\n".join(lines), title="Table", border_style="cyan")
 
-    def _show_connection(self, d: Dict[str, Any]) -> None:
+    def _render_connection(self, d: Dict[str, Any]) -> Panel:
         lines = [
             f"[bold]{d.get('name', 'Unknown')}[/]",
             f"Type: {d.get('connectionType', '-')}",
             f"Path: {d.get('path', '-')}",
         ]
-        self.update(Panel("\n".join(lines), title="Connection", border_style="cyan"))
+        return Panel("\n".join(lines), title="Connection", border_style="cyan")
 
-    def _show_generic(self, kind: str, d: Dict[str, Any]) -> None:
+    def _render_generic(self, kind: str, d: Dict[str, Any]) -> Panel:
         lines = [f"{k}: {v}" for k, v in d.items() if k not in _SKIP_KEYS]
-        self.update(Panel("\n".join(lines) or "(empty)", title=kind.title(), border_style="cyan"))
+        return Panel("\n".join(lines) or "(empty)", title=kind.title(), border_style="cyan")
@@ -1,13 +1,17 @@
 """Map preview panel with ASCII art rendering."""
 
 import webbrowser
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
 
 from rich.text import Text
 from textual.containers import ScrollableContainer
 from textual.widget import Widget
 from textual.widgets import Static
+from textual.worker import get_current_worker
+
+from arcgispro_cli.tui.state import NodeRef
 
 
 class MapPreviewPanel(ScrollableContainer):
@@ -28,8 +32,9 @@ class MapPreviewPanel(ScrollableContainer):
         ("enter", "open_image", "Open full image"),
     ]
     
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, state=None, **kwargs) -> None:
         super().__init__(**kwargs)
+        self.state = state
         self.current_image_path: Optional[Path] = None
         self._preview_widget = Static("", id="preview-content")
     
@@ -41,19 +46,93 @@ class MapPreviewPanel(ScrollableContainer):
         """
         Display preview for a map or layer.
         
+        The preview is rendered in a worker thread; showing another item
+        cancels a render still in flight.
+        
         Args:
             item_data: Map or layer data dictionary
             image_path: Path to the PNG file, or None if not found
         """
         self.current_image_path = image_path
+        self.run_worker(
+            partial(self._render_in_thread, item_data, image_path),
+            thread=True,
+            exclusive=True,
+            group="preview",
+        )
+    
+    def show_ref(self, ref: NodeRef, neighbours: Iterable[NodeRef] = ()) -> None:
+        """
+        Display the preview for a map or layer tree node.
+        
+        The handle is resolved against the state in a worker thread, then
+        the maps of ``neighbours`` (the nodes around the cursor) are
+        rendered into the cache so moving onto them is a cache hit; a newer
+        selection cancels both.
         
+        Args:
+            ref: Handle of the selected node
+            neighbours: Handles of the nodes next to it
+        """
+        self.run_worker(
+            partial(self._show_ref_in_thread, ref, list(neighbours)),
+            thread=True,
+            exclusive=True,
+            group="preview",
+        )
+    
+    def _render_in_thread(self, item_data: Dict[str, Any], image_path: Optional[Path]) -> None:
+        renderable = self.render_preview(item_data, image_path)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._preview_widget.update, renderable)
+    
+    def _show_ref_in_thread(self, ref: NodeRef, neighbours: List[NodeRef]) -> None:
+        worker = get_current_worker()
+        image_path = self.state.preview_image_path(ref)
+        item_data = self.state.resolve(ref) if image_path is not None else None
+        if item_data is None:
+            if not worker.is_cancelled:
+                self.app.call_from_thread(self.add_class, "hidden")
+            return
+        renderable = self.render_preview(item_data, image_path)
+        if worker.is_cancelled:
+            return
+        self.app.call_from_thread(self._show_rendered, image_path, renderable)
+        
+        paths = []
+        for neighbour in neighbours:
+            if worker.is_cancelled:
+                return
+            path = self.state.preview_image_path(neighbour)
+            if path is not None and path != image_path and path not in paths:
+                paths.append(path)
+        self._prefetch_in_thread(paths)
+    
+    def _show_rendered(self, image_path: Path, renderable: Text) -> None:
+        self.current_image_path = image_path
+        self._preview_widget.update(renderable)
+        self.remove_class("hidden")
+    
+    def _prefetch_in_thread(self, image_paths: List[Path]) -> None:
+        from arcgispro_cli.tui.preview import PREVIEW_WIDTH, render_image
+
+        worker = get_current_worker()
+        for image_path in image_paths:
+            if worker.is_cancelled:
+                return
+            try:
+                render_image(image_path, PREVIEW_WIDTH)
+            except (ImportError, OSError):
+                # Missing image or no Pillow; show_map_preview falls back to metadata
+                continue
+    
+    def render_preview(self, item_data: Dict[str, Any], image_path: Optional[Path]) -> Text:
+        """Build the ASCII preview, or the metadata fallback."""
         if image_path and image_path.exists():
             # Try ASCII art preview
             try:
                 from PIL import Image
-                preview_text = self._render_ascii_preview(image_path, item_data)
-                self._preview_widget.update(preview_text)
-                return
+                return self._render_ascii_preview(image_path, item_data)
             except ImportError:
                 # Pillow not available, fall back to metadata
                 pass
@@ -62,8 +141,7 @@ class MapPreviewPanel(ScrollableContainer):
                 self.log(f"Failed to render ASCII preview: {e}")
         
         # Fallback: show metadata
-        metadata_text = self._render_metadata(item_data, image_path)
-        self._preview_widget.update(metadata_text)
+        return self._render_metadata(item_data, image_path)
     
     def _render_ascii_preview(self, image_path: Path, item_data: Dict[str, Any]) -> Text:
         """
@@ -76,40 +154,18 @@ class MapPreviewPanel(ScrollableContainer):
         Returns:
             Rich Text object with colored ASCII art
         """
-        from PIL import Image
-        
-        # Load and resize image to fit terminal width (~80 chars wide, maintain aspect)
-        img = Image.open(image_path)
-        
-        # Target width in characters (accounting for padding)
-        target_width = 70
-        aspect_ratio = img.height / img.width
-        target_height = int(target_width * aspect_ratio * 0.5)  # 0.5 because chars are ~2x tall
-        
-        # Resize image
-        img_resized = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-        img_rgb = img_resized.convert('RGB')
+        from arcgispro_cli.tui.preview import PREVIEW_WIDTH, render_image
+
+        target_width = PREVIEW_WIDTH
+        # Cached per (image, mtime, width): re-highlighting a layer of the
+        # same map doesn't reopen and resize the PNG
+        body = render_image(image_path, target_width)
         
-        # Convert to ASCII using Unicode block characters
         text = Text()
         text.append(f"Map: {item_data.get('name', 'Unknown')}\n", style="bold cyan")
         text.append(f"Image: {image_path.name}\n", style="dim")
         text.append("─" * target_width + "\n", style="dim")
-        
-        # Use Unicode half blocks for 2 pixels per character
-        for y in range(0, target_height - 1, 2):
-            for x in range(target_width):
-                # Get top and bottom pixel colors
-                r_top, g_top, b_top = img_rgb.getpixel((x, y))
-                r_bot, g_bot, b_bot = img_rgb.getpixel((x, min(y + 1, target_height - 1)))
-                
-                # Use upper half block (▀) with top color as foreground, bottom as background
-                # Simplify colors to reduce ANSI overhead
-                fg_color = f"rgb({r_top},{g_top},{b_top})"
-                bg_color = f"rgb({r_bot},{g_bot},{b_bot})"
-                
-                text.append("▀", style=f"{fg_color} on {bg_color}")
-            text.append("\n")
+        text.append_text(body)
         
         text.append("─" * target_width + "\n", style="dim")
         text.append("\n[dim]Press Enter to open full image in viewer[/dim]")
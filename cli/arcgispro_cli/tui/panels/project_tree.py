@@ -1,14 +1,37 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from textual.message import Message
+from textual.timer import Timer
 from textual.widgets import Tree
 from textual.widgets._tree import TreeNode
+from textual.widgets.tree import NodeID, UnknownNodeID
+
+from arcgispro_cli.tui.state import NodeRef
+from arcgispro_cli.watch import diff_records, keyed_records
+
+# Record kinds the tree shows, patched individually on reload
+PATCHED_KINDS = ("map", "layer", "table", "connection")
+
+GROUP_TITLES = {"table": "Tables", "connection": "Connections"}
+
+# Seconds the cursor must rest on a node before its details are shown;
+# holding an arrow key only renders the node it stops on
+HIGHLIGHT_DEBOUNCE = 0.08
+
+
+def _lower(value: Any) -> str:
+    return str(value).lower() if value is not None else ""
 
 
 class ProjectTree(Tree):
-    """Tree view of Project -> Maps -> Layers -> Fields."""
+    """
+    Tree view of Project -> Maps -> Layers -> Fields.
+
+    Only maps, tables and connections are created up front; a map's layers
+    and a layer's fields are added the first time the node is expanded.
+    """
     
     BINDINGS = [
         ("left", "collapse_node", "Collapse"),
@@ -18,15 +41,17 @@ class ProjectTree(Tree):
     class ItemSelected(Message):
         """Fired when a tree node with data is selected."""
 
-        def __init__(self, kind: str, data: Dict[str, Any]) -> None:
+        def __init__(self, kind: str, ref: NodeRef) -> None:
             self.kind = kind
-            self.data = data
+            self.ref = ref
             super().__init__()
 
     def __init__(self, state, **kwargs) -> None:
         super().__init__("Project", **kwargs)
         self.state = state
         self.guide_depth = 3
+        self._pending_highlight: Optional[TreeNode] = None
+        self._highlight_timer: Optional[Timer] = None
     
     def action_collapse_node(self) -> None:
         """Collapse current node or move to parent."""
@@ -54,70 +79,300 @@ class ProjectTree(Tree):
     def rebuild(self) -> None:
         """(Re)populate the tree from the current state."""
         self.clear()
+        # (kind, record key) -> node, and the record each node was built from
+        self._item_nodes: Dict[Tuple[str, str], TreeNode] = {}
+        self._shown: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind in PATCHED_KINDS}
+        # Map/layer nodes whose children have been built
+        self._populated: Set[NodeID] = set()
 
         project = self.state.get_project()
         if project:
             self.root.set_label(project.get("name", "Project"))
-            self.root.data = {"_kind": "project", **project}
+            self.root.data = NodeRef("project")
         else:
             self.root.set_label("[red]No .arcgispro data found[/]")
             self.root.data = None
             return
 
-        # -- Maps (directly under root) ----------------------------------
-        for m in self.state.get_maps():
-            active = " ★" if m.get("isActiveMap") else ""
-            label = f"{m.get('name', '?')}{active}"
-            map_node = self.root.add(label)
-            map_node.data = {"_kind": "map", **m}
-
-            for lyr in self.state.get_layers(map_name=m.get("name")):
-                vis = "✓" if lyr.get("isVisible") else "✗"
-                broken = " ⚠" if lyr.get("isBroken") else ""
-                lyr_label = f"[{vis}] {lyr.get('name', '?')}{broken}"
-                lyr_node = map_node.add(lyr_label)
-                lyr_node.data = {"_kind": "layer", **lyr}
-
-                for fld in lyr.get("fields") or []:
-                    ftype = fld.get("fieldType", "")
-                    fld_label = f"{fld.get('name', '?')}  ({ftype})"
-                    fld_node = lyr_node.add_leaf(fld_label)
-                    fld_node.data = {"_kind": "field", "_layer": lyr.get("name"), **fld}
-
-        # -- Tables ------------------------------------------------------
-        tables = self.state.get_tables()
-        if tables:
-            tables_node = self.root.add("Tables")
-            tables_node.data = None
-            for t in tables:
-                tbl_node = tables_node.add_leaf(t.get("name", "?"))
-                tbl_node.data = {"_kind": "table", **t}
-
-        # -- Connections -------------------------------------------------
-        connections = self.state.get_connections()
-        if connections:
-            conn_node = self.root.add("Connections")
-            conn_node.data = None
-            for c in connections:
-                cn = conn_node.add_leaf(c.get("name", "?"))
-                cn.data = {"_kind": "connection", **c}
+        # -- Maps (directly under root); layers are added on expand --------
+        self._patch_maps()
+
+        # -- Tables / Connections ------------------------------------------
+        self._patch_group("table")
+        self._patch_group("connection")
 
         self.root.expand()
         for child in self.root.children:
             child.collapse()
 
+    def apply_changes(self, changed: Iterable[str]) -> int:
+        """
+        Patch the tree for re-exported context keys.
+
+        Records are diffed by stable id (``watch.diff_records``) and only
+        added, removed or changed nodes are touched, so expansion state and
+        the cursor survive a Snapshot.
+
+        Returns:
+            Number of nodes added, removed or updated.
+        """
+        changed = set(changed)
+        if self.root.data is None or "project" in changed and not self.state.get_project():
+            # Nothing shown yet, or the export went away
+            self.rebuild()
+            return len(self.root.children)
+
+        cursor = self.cursor_node
+        count = 0
+        if "project" in changed:
+            project = self.state.get_project()
+            self.root.set_label(project.get("name", "Project"))
+            count += 1
+        if "maps" in changed:
+            count += self._patch_maps()
+        if "maps" in changed or "layers" in changed:
+            count += self._patch_layers()
+        if "tables" in changed:
+            count += self._patch_group("table")
+        if "connections" in changed:
+            count += self._patch_group("connection")
+
+        if count and cursor is not None:
+            self.call_after_refresh(self._restore_cursor, cursor)
+        return count
+
+    # -- Patching ----------------------------------------------------------
+
+    def _map_label(self, m: Dict[str, Any]) -> str:
+        active = " ★" if m.get("isActiveMap") else ""
+        return f"{m.get('name', '?')}{active}"
+
+    def _layer_label(self, lyr: Dict[str, Any]) -> str:
+        vis = "✓" if lyr.get("isVisible") else "✗"
+        broken = " ⚠" if lyr.get("isBroken") else ""
+        return f"[{vis}] {lyr.get('name', '?')}{broken}"
+
+    def _drop(self, kind: str, key: str) -> None:
+        """Remove a node (and, for maps, the layer nodes under it)."""
+        node = self._item_nodes.pop((kind, key), None)
+        self._shown[kind].pop(key, None)
+        if node is None:
+            return
+        self._populated.discard(node.id)
+        for (child_kind, child_key), child in list(self._item_nodes.items()):
+            if child.parent is node:
+                self._drop(child_kind, child_key)
+        node.remove()
+
+    def _insert_before(self, kind: str, keys: List[str], position: int) -> Optional[TreeNode]:
+        """Return the first existing node after ``position`` in the new order."""
+        for key in keys[position + 1:]:
+            node = self._item_nodes.get((kind, key))
+            if node is not None:
+                return node
+        return None
+
+    def _patch_maps(self) -> int:
+        new = self.state.keyed("map")
+        diff = diff_records(self._shown["map"], new)
+        for key in diff.removed:
+            self._drop("map", key)
+
+        keys = list(new)
+        for position, key in enumerate(keys):
+            m = new[key]
+            node = self._item_nodes.get(("map", key))
+            if node is None:
+                # New maps go before the Tables/Connections groups
+                before = self._insert_before("map", keys, position)
+                if before is None:
+                    before = next((n for k, n in self._item_nodes.items() if k[0] == "group"), None)
+                node = self.root.add(self._map_label(m), before=before)
+                self._item_nodes[("map", key)] = node
+                node.data = NodeRef("map", key)
+            elif key in diff.changed:
+                node.set_label(self._map_label(m))
+            if node.id not in self._populated:
+                node.allow_expand = self.state.count_layers(m.get("name")) > 0
+            self._shown["map"][key] = m
+        return len(diff.added) + len(diff.removed) + len(diff.changed)
+
+    def _populate_map(self, map_node: TreeNode) -> None:
+        """Add a map's layers (grouped once by ``ContextIndex``)."""
+        self._populated.add(map_node.id)
+        map_record = self._shown["map"][map_node.data.key]
+        layers = self.state.get_layers(map_name=map_record.get("name"))
+        for key, lyr in keyed_records(layers).items():
+            if ("layer", key) in self._item_nodes:
+                # Same map name twice; the first map shows the layer
+                continue
+            self._add_layer(map_node, key, lyr)
+        map_node.allow_expand = bool(map_node.children)
+
+    def _add_layer(self, parent: TreeNode, key: str, lyr: Dict[str, Any],
+                   before: Optional[TreeNode] = None) -> None:
+        # Compacted records have no fields key; assume the shard has some
+        has_fields = bool(lyr["fields"]) if "fields" in lyr else True
+        node = parent.add(self._layer_label(lyr), before=before, allow_expand=has_fields)
+        node.data = NodeRef("layer", key)
+        self._item_nodes[("layer", key)] = node
+        self._shown["layer"][key] = lyr
+
+    def _patch_layers(self) -> int:
+        # Map names match case-insensitively, like ContextIndex.layers_in_map.
+        # Only maps that have been expanded show layer nodes.
+        map_nodes: Dict[str, TreeNode] = {}
+        for key, record in self._shown["map"].items():
+            node = self._item_nodes[("map", key)]
+            if node.id in self._populated:
+                map_nodes.setdefault(_lower(record.get("name")), node)
+            else:
+                node.allow_expand = self.state.count_layers(record.get("name")) > 0
+        # Layers of maps that aren't shown (no matching mapName) are skipped
+        new = {
+            key: lyr for key, lyr in self.state.keyed("layer").items()
+            if _lower(lyr.get("mapName")) in map_nodes
+        }
+        diff = diff_records(self._shown["layer"], new)
+        count = len(diff.removed)
+        for key in diff.removed:
+            self._drop("layer", key)
+
+        keys = list(new)
+        for position, key in enumerate(keys):
+            lyr = new[key]
+            parent = map_nodes[_lower(lyr.get("mapName"))]
+            node = self._item_nodes.get(("layer", key))
+            if node is not None and node.parent is not parent:
+                # Moved to another map
+                self._drop("layer", key)
+                node = None
+            if node is None:
+                before = self._insert_before("layer", keys, position)
+                if before is not None and before.parent is not parent:
+                    before = None
+                self._add_layer(parent, key, lyr, before=before)
+                parent.allow_expand = True
+                count += 1
+            elif key in diff.changed:
+                node.set_label(self._layer_label(lyr))
+                node.remove_children()
+                self._populated.discard(node.id)
+                if node.is_expanded:
+                    self._load_fields(node)
+                self._shown["layer"][key] = lyr
+                count += 1
+        for parent in map_nodes.values():
+            if not parent.children:
+                parent.allow_expand = False
+        return count
+
+    def _patch_group(self, kind: str) -> int:
+        """Patch the Tables or Connections group under the root."""
+        title = GROUP_TITLES[kind]
+        new = self.state.keyed(kind)
+        diff = diff_records(self._shown[kind], new)
+        for key in diff.removed:
+            self._drop(kind, key)
+
+        group = self._item_nodes.get(("group", kind))
+        if not new:
+            if group is not None:
+                self._item_nodes.pop(("group", kind))
+                group.remove()
+            return len(diff.removed)
+        if group is None:
+            # Tables sit before Connections
+            before = self._item_nodes.get(("group", "connection")) if kind == "table" else None
+            group = self.root.add(title, before=before)
+            group.data = None
+            self._item_nodes[("group", kind)] = group
+
+        keys = list(new)
+        for position, key in enumerate(keys):
+            record = new[key]
+            node = self._item_nodes.get((kind, key))
+            if node is None:
+                node = group.add_leaf(record.get("name", "?"), before=self._insert_before(kind, keys, position))
+                node.data = NodeRef(kind, key)
+                self._item_nodes[(kind, key)] = node
+            elif key in diff.changed:
+                node.set_label(record.get("name", "?"))
+            self._shown[kind][key] = record
+        return len(diff.added) + len(diff.removed) + len(diff.changed)
+
+    def _restore_cursor(self, node: TreeNode) -> None:
+        """Put the cursor back on ``node`` (or its nearest surviving ancestor)."""
+        while node is not None:
+            try:
+                self.get_node_by_id(node.id)
+            except UnknownNodeID:
+                node = node.parent
+                continue
+            if node is not self.cursor_node:
+                self.move_cursor(node)
+            elif node.data:
+                # Same node, possibly new data: refresh the detail panel
+                self._post_item(node)
+            return
+
+    def _load_fields(self, node: TreeNode) -> None:
+        """Add a layer's fields, reading its shard if the export is compacted."""
+        self._populated.add(node.id)
+        key = node.data.key
+        details = self.state.get_layer_details(self._shown["layer"][key])
+        for index, fld in enumerate(details.get("fields") or []):
+            ftype = fld.get("fieldType", "")
+            fld_label = f"{fld.get('name', '?')}  ({ftype})"
+            fld_node = node.add_leaf(fld_label)
+            fld_node.data = NodeRef("field", key, index)
+
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded) -> None:
+        node: TreeNode = event.node
+        if node.data is None or node.id in self._populated:
+            return
+        if node.data.kind == "map":
+            self._populate_map(node)
+        elif node.data.kind == "layer":
+            self._load_fields(node)
+
+    def neighbour_nodes(self, radius: int = 3) -> List[TreeNode]:
+        """Visible nodes within ``radius`` lines of the cursor, nearest first."""
+        nodes = []
+        for offset in range(1, radius + 1):
+            for line in (self.cursor_line + offset, self.cursor_line - offset):
+                node = self.get_node_at_line(line) if line >= 0 else None
+                if node is not None:
+                    nodes.append(node)
+        return nodes
+
+    def _post_item(self, node: TreeNode) -> None:
+        self.state.selected_kind = node.data.kind
+        self.state.selected_item = node.data
+        self.post_message(self.ItemSelected(node.data.kind, node.data))
+
+    def _cancel_highlight(self) -> None:
+        self._pending_highlight = None
+        if self._highlight_timer is not None:
+            self._highlight_timer.stop()
+            self._highlight_timer = None
+
+    def _flush_highlight(self) -> None:
+        node = self._pending_highlight
+        self._cancel_highlight()
+        if node is not None and node.data:
+            self._post_item(node)
+
     def on_tree_node_selected(self, event: Tree.NodeSelected) -> None:
         node: TreeNode = event.node
+        self._cancel_highlight()
         if node.data:
-            kind = node.data.get("_kind", "unknown")
-            self.state.selected_kind = kind
-            self.state.selected_item = node.data
-            self.post_message(self.ItemSelected(kind, node.data))
+            self._post_item(node)
 
     def on_tree_node_highlighted(self, event: Tree.NodeHighlighted) -> None:
         node: TreeNode = event.node
+        # Coalesce cursor moves: only the node the cursor rests on is shown
+        self._cancel_highlight()
         if node.data:
-            kind = node.data.get("_kind", "unknown")
-            self.state.selected_kind = kind
-            self.state.selected_item = node.data
-            self.post_message(self.ItemSelected(kind, node.data))
+            self._pending_highlight = node
+            self._highlight_timer = self.set_timer(HIGHLIGHT_DEBOUNCE, self._flush_highlight)
@@ -0,0 +1,91 @@
+"""ASCII (half-block) rendering of exported map images.
+
+Each character cell shows two pixels: the upper half block ``▀`` with the top
+pixel as foreground and the bottom pixel as background. Rendering is done
+once per (image, mtime, width) and kept in an LRU cache, so moving the cursor
+between layers of the same map doesn't reopen and resize the PNG.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple
+
+from rich.style import Style
+from rich.text import Text
+
+# Target width in characters (accounting for panel padding)
+PREVIEW_WIDTH = 70
+
+# Rendered previews kept in memory (one per map image and width)
+PREVIEW_CACHE_SIZE = 32
+
+HALF_BLOCK = "▀"
+
+
+def render_image(image_path: Path, width: int = PREVIEW_WIDTH) -> Text:
+    """
+    Return the half-block rendering of an image ``width`` characters wide.
+
+    The result is shared by the cache; callers must not modify it (use
+    ``Text.append_text`` to compose it into another Text).
+
+    Raises:
+        ImportError: If Pillow is not installed.
+        OSError: If the image can't be read.
+    """
+    mtime_ns = image_path.stat().st_mtime_ns
+    return _render_cached(str(image_path), mtime_ns, width)
+
+
+@lru_cache(maxsize=PREVIEW_CACHE_SIZE)
+def _render_cached(path: str, mtime_ns: int, width: int) -> Text:
+    # mtime_ns is only part of the cache key: a re-exported image is a miss
+    from PIL import Image
+
+    with Image.open(path) as img:
+        aspect_ratio = img.height / img.width
+        height = int(width * aspect_ratio * 0.5)  # 0.5 because chars are ~2x tall
+        # reducing_gap first shrinks by an integer factor, which is much
+        # faster than LANCZOS over the full 1920x1080 export
+        resized = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    pixels = resized.convert("RGB").tobytes()
+
+    text = Text()
+    styles: Dict[Tuple[bytes, bytes], Style] = {}
+    stride = width * 3
+    for y in range(0, height - 1, 2):
+        top_row = pixels[y * stride:(y + 1) * stride]
+        bottom_y = min(y + 1, height - 1)
+        bottom_row = pixels[bottom_y * stride:(bottom_y + 1) * stride]
+
+        # Run-length merge identical adjacent cells into one span
+        run_key = None
+        run_length = 0
+        for x in range(0, stride, 3):
+            key = (top_row[x:x + 3], bottom_row[x:x + 3])
+            if key == run_key:
+                run_length += 1
+                continue
+            if run_key is not None:
+                text.append(HALF_BLOCK * run_length, style=_style(styles, run_key))
+            run_key, run_length = key, 1
+        if run_key is not None:
+            text.append(HALF_BLOCK * run_length, style=_style(styles, run_key))
+        text.append("\n")
+    return text
+
+
+def _style(styles: Dict[Tuple[bytes, bytes], Style], key: Tuple[bytes, bytes]) -> Style:
+    style = styles.get(key)
+    if style is None:
+        top, bottom = key
+        style = styles[key] = Style(
+            color=f"rgb({top[0]},{top[1]},{top[2]})",
+            bgcolor=f"rgb({bottom[0]},{bottom[1]},{bottom[2]})",
+        )
+    return style
+
+
+def clear_preview_cache() -> None:
+    """Drop all cached renderings."""
+    _render_cached.cache_clear()
@@ -1,55 +1,214 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from functools import wraps
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
 
-from arcgispro_cli.paths import find_arcgispro_folder, load_context_files
+from arcgispro_cli.index import get_context_index
+from arcgispro_cli.paths import (
+    CONTEXT_FILES,
+    find_arcgispro_folder,
+    get_images_folder,
+    load_context_files,
+    sanitize_map_name,
+)
+from arcgispro_cli.shards import load_record_details
+from arcgispro_cli.watch import ContextWatcher, keyed_records
+
+# Context key holding the records of each tree node kind
+RECORD_KEYS = {"map": "maps", "layer": "layers", "table": "tables", "connection": "connections"}
+
+# Layers whose shard (fields/sampleData) is kept in memory
+DETAILS_CACHE_SIZE = 16
+
+
+class NodeRef(NamedTuple):
+    """
+    Handle a tree node carries instead of a copy of its record.
+
+    ``key`` is the record's ``watch.record_key`` (for fields, the layer's)
+    and ``index`` is a field's position in its layer. ``TUIState.resolve``
+    turns a handle back into the record.
+    """
+
+    kind: str
+    key: str = ""
+    index: int = -1
+
+
+def _locked(method):
+    """Run a ``TUIState`` method under the state's lock."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 @dataclass
 class TUIState:
-    """Shared state for the TUI — wraps the existing path/query helpers."""
+    """
+    Shared state for the TUI — wraps the existing path/query helpers.
+
+    The detail panel resolves records in worker threads while the app
+    polls for changes and expands tree nodes on the main thread, so every
+    method that reads or fills the caches (context, index, ``_keyed``,
+    ``_details``) holds ``_lock``. It is reentrant: methods call each other.
+    """
 
     repo_path: str
     selected_kind: Optional[str] = None
-    selected_item: Optional[Dict[str, Any]] = None
-    _context: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+    selected_item: Optional[NodeRef] = None
+    _context: Optional[Mapping[str, Any]] = field(default=None, init=False, repr=False)
+    _watcher: Optional[ContextWatcher] = field(default=None, init=False, repr=False)
+    _keyed: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict, init=False, repr=False)
+    _details: "OrderedDict[str, Dict[str, Any]]" = field(default_factory=OrderedDict, init=False, repr=False)
+    _arcgispro_path: Optional[Path] = field(default=None, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
 
     @property
+    @_locked
     def arcgispro_path(self) -> Optional[Path]:
-        return find_arcgispro_folder(Path(self.repo_path))
+        # Pinned once found; until then every access looks again so a first
+        # Snapshot is picked up. The default "." also honours ARCGISPRO_DIR.
+        if self._arcgispro_path is None:
+            start = None if self.repo_path in ("", ".") else Path(self.repo_path)
+            self._arcgispro_path = find_arcgispro_folder(start)
+        return self._arcgispro_path
 
     @property
-    def context(self) -> Dict[str, Any]:
+    @_locked
+    def context(self) -> Mapping[str, Any]:
         if self._context is None:
             ap = self.arcgispro_path
             if ap:
                 self._context = load_context_files(ap)
+                self._watcher = ContextWatcher(self._context)
             else:
                 self._context = {}
         return self._context
 
+    @_locked
     def reload(self) -> None:
         self._context = None
+        self._watcher = None
+        self._keyed.clear()
+        self._details.clear()
+
+    @_locked
+    def poll_changes(self) -> List[str]:
+        """
+        Return the context keys whose files changed since the last poll.
+
+        Changed keys are dropped from the context so the next read picks up
+        the new file. When no export existed yet and one has appeared, the
+        context is reset and every key is reported.
+        """
+        if self._watcher is not None:
+            changed = self._watcher.poll_and_invalidate()
+            for kind, key in RECORD_KEYS.items():
+                if key in changed:
+                    self._keyed.pop(kind, None)
+            if "layers" in changed:
+                self._details.clear()
+            return changed
+        if self._context is not None and self.arcgispro_path:
+            self.reload()
+            return list(CONTEXT_FILES)
+        return []
 
+    @_locked
     def get_project(self) -> Optional[Dict[str, Any]]:
         return self.context.get("project")
 
+    @_locked
     def get_maps(self) -> List[Dict[str, Any]]:
         return self.context.get("maps") or []
 
+    @_locked
     def get_layers(self, map_name: Optional[str] = None) -> List[Dict[str, Any]]:
-        layers = self.context.get("layers") or []
         if map_name:
-            layers = [l for l in layers if l.get("mapName") == map_name]
-        return layers
+            return get_context_index(self.context).layers_in_map(map_name)
+        return self.context.get("layers") or []
+
+    @_locked
+    def count_layers(self, map_name: str) -> int:
+        return get_context_index(self.context).layer_count(map_name)
+
+    @_locked
+    def get_layer_details(self, layer: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the layer with its fields, reading its shard if compacted."""
+        shard = layer.get("shard")
+        if not shard or "fields" in layer:
+            return layer
+        details = self._details.get(shard)
+        if details is None:
+            ap = self.arcgispro_path
+            if not ap:
+                return layer
+            details = self._details[shard] = load_record_details(ap, "layers", layer)
+            if len(self._details) > DETAILS_CACHE_SIZE:
+                self._details.popitem(last=False)
+        else:
+            self._details.move_to_end(shard)
+        return details
+
+    @_locked
+    def keyed(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        """Records of a node kind by ``watch.record_key``, built once per load."""
+        records = self._keyed.get(kind)
+        if records is None:
+            records = self._keyed[kind] = keyed_records(self.context.get(RECORD_KEYS[kind]))
+        return records
+
+    @_locked
+    def resolve(self, ref: NodeRef) -> Optional[Dict[str, Any]]:
+        """Return the record a tree node handle points at, or None if it's gone."""
+        if ref.kind == "project":
+            return self.get_project()
+        if ref.kind == "field":
+            layer = self.keyed("layer").get(ref.key)
+            if layer is None:
+                return None
+            fields = self.get_layer_details(layer).get("fields") or []
+            if not 0 <= ref.index < len(fields):
+                return None
+            return {"_layer": layer.get("name"), **fields[ref.index]}
+        if ref.kind in RECORD_KEYS:
+            return self.keyed(ref.kind).get(ref.key)
+        return None
 
+    @_locked
     def get_tables(self) -> List[Dict[str, Any]]:
         return self.context.get("tables") or []
 
+    @_locked
     def get_connections(self) -> List[Dict[str, Any]]:
         return self.context.get("connections") or []
 
+    @_locked
+    def map_image_path(self, map_name: str) -> Optional[Path]:
+        """Path of the exported PNG for a map (may not exist), or None without an export."""
+        ap = self.arcgispro_path
+        if not ap:
+            return None
+        return get_images_folder(ap) / f"map_{sanitize_map_name(map_name)}.png"
+
+    @_locked
+    def preview_image_path(self, ref: NodeRef) -> Optional[Path]:
+        """Map image for a map or layer node (a layer shows its map), or None for other nodes."""
+        if ref.kind not in ("map", "layer"):
+            return None
+        data = self.resolve(ref)
+        if data is None:
+            return None
+        return self.map_image_path(data.get("mapName" if ref.kind == "layer" else "name", ""))
+
+    @_locked
     def get_meta(self) -> Optional[Dict[str, Any]]:
         return self.context.get("meta")
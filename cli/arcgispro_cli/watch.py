@@ -0,0 +1,101 @@
+"""Change detection for context files.
+
+``ContextWatcher`` polls the stamps (mtime, size) of the files backing a
+``LazyContext`` and reports which context keys changed since the last poll.
+Polling works everywhere (network shares, containers without inotify) and a
+poll is a handful of ``stat`` calls.
+
+``keyed_records`` and ``diff_records`` compare two versions of a record list
+by stable identity, so consumers can patch what they display instead of
+rebuilding it.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import file_stamp
+from .paths import CONTEXT_FILES, LazyContext
+
+Stamp = Tuple[Path, Optional[Tuple[int, int]]]
+
+
+class ContextWatcher:
+    """Report context keys whose backing file changed between polls."""
+
+    def __init__(self, context: LazyContext):
+        self.context = context
+        self._stamps: Dict[str, Stamp] = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Stamp]:
+        stamps = {}
+        for key in CONTEXT_FILES:
+            # path_for can switch between layers.json and layers.index.json
+            path = self.context.path_for(key)
+            stamps[key] = (path, file_stamp(path))
+        return stamps
+
+    def poll(self) -> List[str]:
+        """Return the keys that changed since the previous poll."""
+        current = self._snapshot()
+        changed = [key for key in CONTEXT_FILES if current[key] != self._stamps.get(key)]
+        self._stamps = current
+        return changed
+
+    def poll_and_invalidate(self) -> List[str]:
+        """Poll, and drop changed keys from the context so they are re-read."""
+        changed = self.poll()
+        for key in changed:
+            self.context.invalidate(key)
+        return changed
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """Return a record's stable identity: its ``id``, else map + name."""
+    rid = record.get("id")
+    if rid:
+        return f"id:{rid}"
+    return f"name:{record.get('mapName') or ''}/{record.get('name') or ''}"
+
+
+def keyed_records(records: Optional[Iterable[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Map ``record_key`` -> record, keeping the original order.
+
+    Records sharing a key (no id and a duplicated name) are told apart by
+    their occurrence number.
+    """
+    keyed: Dict[str, Dict[str, Any]] = {}
+    for record in records or []:
+        key = record_key(record)
+        if key in keyed:
+            n = 1
+            while f"{key}#{n}" in keyed:
+                n += 1
+            key = f"{key}#{n}"
+        keyed[key] = record
+    return keyed
+
+
+@dataclass
+class RecordDiff:
+    """Keys added, removed and changed between two keyed record sets."""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_records(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> RecordDiff:
+    """Compare two ``keyed_records`` results (added/changed keep ``new`` order)."""
+    diff = RecordDiff()
+    for key, record in new.items():
+        if key not in old:
+            diff.added.append(key)
+        elif old[key] != record:
+            diff.changed.append(key)
+    diff.removed = [key for key in old if key not in new]
+    return diff
@@ -0,0 +1,48 @@
+"""Shared fixtures."""
+
+import json
+
+import pytest
+
+from arcgispro_cli import paths
+
+
+@pytest.fixture(autouse=True)
+def _isolated_user_cache(tmp_path_factory, monkeypatch):
+    """Keep .arcgispro resolutions out of the real per-user cache and memo."""
+    cache_home = tmp_path_factory.mktemp("user-cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    monkeypatch.setenv("LOCALAPPDATA", str(cache_home))
+    monkeypatch.delenv(paths.ARCGISPRO_DIR_ENV, raising=False)
+    paths.forget_resolved()
+    yield
+    paths.forget_resolved()
+
+
+def _write_json(path, obj, indent=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj, indent=indent), encoding="utf-8")
+
+
+@pytest.fixture
+def write_json():
+    """``write_json(path, obj, indent=None)``: write JSON, creating parent folders."""
+    return _write_json
+
+
+@pytest.fixture
+def make_export():
+    """
+    Build an export: ``make_export(folder, maps=[...], layers=[...])``.
+
+    Keywords are context keys (``paths.CONTEXT_FILES``); other names are
+    written to ``context/<name>.json``. Returns the .arcgispro folder.
+    """
+
+    def make(folder, **files):
+        arcgispro = folder / ".arcgispro"
+        for key, value in files.items():
+            _write_json(arcgispro / paths.CONTEXT_FILES.get(key, f"context/{key}.json"), value)
+        return arcgispro
+
+    return make
@@ -0,0 +1,52 @@
+"""Tests for the synthetic export generator and benchmark comparison."""
+
+import pytest
+
+from arcgispro_cli.bench import BenchError, BenchResult, compare_to_baseline, results_to_baseline, run_benchmarks
+from arcgispro_cli.paths import load_context_files
+from arcgispro_cli.synthetic import ExportSpec, generate_export
+
+
+def test_generate_export_shape(tmp_path):
+    spec = ExportSpec(maps=2, layers=6, tables=2, fields=3, sample_rows=2, vertices=4)
+    context = load_context_files(generate_export(tmp_path, spec))
+
+    assert [m["layerCount"] for m in context["maps"]] == [3, 3]
+    assert len(context["layers"]) == 6
+    layer = context["layers"][2]
+    assert len(layer["fields"]) == 3 + 2  # OBJECTID and Shape
+    assert layer["sampleData"][0]["geometry"]["type"] == "Polygon"
+    assert len({l["id"] for l in context["layers"]}) == 6
+
+    # Same spec, same ids
+    again = load_context_files(generate_export(tmp_path / "again", spec))
+    assert [l["id"] for l in again["layers"]] == [l["id"] for l in context["layers"]]
+
+
+def test_run_benchmarks(tmp_path):
+    arcgispro_path = generate_export(tmp_path, ExportSpec(maps=1, layers=3, tables=1, fields=2))
+    results = run_benchmarks(arcgispro_path, repeat=1, only=["load_context_files", "arcgis layers"])
+
+    assert [r.name for r in results] == [
+        "load_context_files", "load_context_files (no cache)", "arcgis layers", "arcgis layers --json",
+    ]
+    assert all(r.seconds > 0 and r.peak_bytes > 0 for r in results)
+
+
+def test_compare_to_baseline():
+    spec = ExportSpec().to_dict()
+    baseline = results_to_baseline(
+        [BenchResult("slow", 1.0, 10_000_000), BenchResult("tiny", 0.001, 1000)], spec
+    )
+    current = [
+        BenchResult("slow", 1.5, 10_100_000),  # 50% slower
+        BenchResult("tiny", 0.002, 2000),  # 2x, but within the absolute slack
+        BenchResult("new", 9.0, 1),  # not in the baseline
+    ]
+
+    regressions = compare_to_baseline(current, baseline, spec, tolerance=0.25)
+    assert [(r.name, r.metric) for r in regressions] == [("slow", "seconds")]
+    assert regressions[0].ratio == pytest.approx(1.5)
+
+    with pytest.raises(BenchError):
+        compare_to_baseline(current, baseline, ExportSpec(layers=1).to_dict())
@@ -0,0 +1,43 @@
+"""Tests for the binary context cache."""
+
+import json
+import os
+
+from arcgispro_cli import cache
+from arcgispro_cli.paths import load_context_files
+
+
+def test_cache_entry_written_and_reused(tmp_path, monkeypatch, make_export):
+    """Second load is served from the cache without parsing JSON."""
+    arcgispro = make_export(tmp_path, layers=[{"name": "Parcels"}])
+
+    assert load_context_files(arcgispro)["layers"] == [{"name": "Parcels"}]
+    assert (arcgispro / "cache" / "context.layers.json.pickle").exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("JSON should not be parsed on a cache hit")
+
+    monkeypatch.setattr(cache.json, "loads", fail)
+    assert load_context_files(arcgispro)["layers"] == [{"name": "Parcels"}]
+
+
+def test_cache_invalidated_when_source_changes(tmp_path, make_export):
+    """Rewriting a context file invalidates its cache entry."""
+    arcgispro = make_export(tmp_path, layers=[{"name": "Parcels"}])
+    load_context_files(arcgispro)
+
+    layers_file = arcgispro / "context" / "layers.json"
+    layers_file.write_text(json.dumps([{"name": "Roads"}, {"name": "Zoning"}]), encoding="utf-8")
+    st = layers_file.stat()
+    os.utime(layers_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert [l["name"] for l in load_context_files(arcgispro)["layers"]] == ["Roads", "Zoning"]
+
+
+def test_cache_disabled_by_env(tmp_path, monkeypatch, make_export):
+    """ARCGISPRO_CLI_NO_CACHE skips writing cache entries."""
+    monkeypatch.setenv("ARCGISPRO_CLI_NO_CACHE", "1")
+    arcgispro = make_export(tmp_path, layers=[{"name": "Parcels"}])
+
+    assert load_context_files(arcgispro)["layers"] == [{"name": "Parcels"}]
+    assert not (arcgispro / "cache").exists()
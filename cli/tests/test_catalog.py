@@ -0,0 +1,40 @@
+"""Tests for .aprx discovery (catalog.scan_aprx)."""
+
+from arcgispro_cli.catalog import DEFAULT_IGNORE, get_catalog_path, scan_aprx
+from arcgispro_cli.paths import find_aprx_files
+
+
+def _tree(tmp_path):
+    for rel in ("Main.aprx", "a/Sub.aprx", "a/b/c/Deep.aprx", "Data.gdb/No.aprx", ".backup/No.aprx", "a/notes.txt"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+    return tmp_path
+
+
+def test_scan_depth_and_ignore(tmp_path):
+    root = _tree(tmp_path)
+    names = lambda result: [p.name for p in result.paths]
+
+    assert names(scan_aprx(root)) == ["Sub.aprx", "Main.aprx"]
+    assert names(scan_aprx(root, max_depth=3)) == ["Deep.aprx", "Sub.aprx", "Main.aprx"]
+    assert names(scan_aprx(root, max_depth=0)) == ["Main.aprx"]
+    assert names(scan_aprx(root, max_depth=3, ignore=DEFAULT_IGNORE + ("a",))) == ["Main.aprx"]
+    assert [p.name for p in find_aprx_files(root)] == ["Sub.aprx", "Main.aprx"]
+
+
+def test_catalog_reuses_unchanged_folders(tmp_path):
+    root = _tree(tmp_path / "share")
+
+    first = scan_aprx(root, max_depth=3, use_catalog=True)
+    assert (first.scanned, first.reused) == (4, 0)
+    assert get_catalog_path().exists()
+
+    second = scan_aprx(root, max_depth=3, use_catalog=True)
+    assert (second.scanned, second.reused) == (0, 4)
+    assert second.paths == first.paths
+
+    (root / "a" / "b" / "New.aprx").write_bytes(b"x")
+    third = scan_aprx(root, max_depth=3, use_catalog=True)
+    assert (third.scanned, third.reused) == (1, 3)
+    assert "New.aprx" in [p.name for p in third.paths]
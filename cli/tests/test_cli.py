@@ -152,3 +152,9 @@ def test_layer_shows_active_map_flag():
         result = runner.invoke(main, ["layer", "Layer 1"])
         assert result.exit_code == 0
         assert "Active map: Yes" in result.output
+
+        # Without maps.json there is nothing to say about active maps
+        Path(".arcgispro/context/maps.json").unlink()
+        result = runner.invoke(main, ["layer", "Layer 1"])
+        assert result.exit_code == 0
+        assert "Map: Map A" in result.output and "Active map" not in result.output
@@ -0,0 +1,89 @@
+"""Tests for the resident query daemon (arcgis serve)."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+from arcgispro_cli.daemon import QueryServer, RemoteContext, get_daemon_info_path, open_context
+from arcgispro_cli.paths import HEAVY_RECORD_KEYS, LazyContext
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="exercises the Unix socket transport")
+
+
+@pytest.fixture
+def served(tmp_path, write_json):
+    arcgispro = tmp_path / ".arcgispro"
+    write_json(arcgispro / "context" / "maps.json", [{"name": "Map A", "isActiveMap": True}])
+    write_json(
+        arcgispro / "context" / "layers.json",
+        [{"id": "p1", "name": "Parcels", "mapName": "Map A", "fields": [{"name": "PIN"}], "sampleData": []}],
+    )
+
+    server = QueryServer(arcgispro, poll_interval=3600)
+    server.warm()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    info_path = get_daemon_info_path(arcgispro)
+    for _ in range(200):
+        if info_path.exists():
+            break
+        threading.Event().wait(0.01)
+    yield arcgispro, server
+    server.stop()
+    thread.join(timeout=5)
+
+
+def test_queries_go_through_daemon(served):
+    arcgispro, _ = served
+    context = open_context(arcgispro)
+    assert isinstance(context, RemoteContext)
+
+    assert context.index.active_map()["name"] == "Map A"
+    assert context.index.layer_by_id("p1")["fields"] == [{"name": "PIN"}]
+    assert list(context.records("layers", exclude=HEAVY_RECORD_KEYS)) == [
+        {"id": "p1", "name": "Parcels", "mapName": "Map A"}
+    ]
+    assert context.get("tables") is None
+
+
+def test_daemon_picks_up_reexport(served, write_json):
+    arcgispro, server = served
+    layers_file = arcgispro / "context" / "layers.json"
+    write_json(layers_file, [{"id": "r1", "name": "Roads", "mapName": "Map A"}])
+    stat = layers_file.stat()
+    os.utime(layers_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert server.poll() == ["layers"]
+    context = open_context(arcgispro)
+    assert [l["id"] for l in context.index.layers_in_map("Map A")] == ["r1"]
+
+
+def test_falls_back_when_daemon_stops(served):
+    """A daemon that goes away after the ping doesn't fail the command."""
+    arcgispro, server = served
+    context = open_context(arcgispro)
+    assert isinstance(context, RemoteContext)
+    server.stop()
+
+    assert context.index.layer_by_id("p1")["name"] == "Parcels"
+    assert isinstance(context.local, LazyContext)
+    assert list(context.records("layers", exclude=HEAVY_RECORD_KEYS)) == [
+        {"id": "p1", "name": "Parcels", "mapName": "Map A"}
+    ]
+    assert context["maps"] == [{"name": "Map A", "isActiveMap": True}]
+
+
+def test_falls_back_without_daemon(served, monkeypatch):
+    arcgispro, server = served
+    monkeypatch.setenv("ARCGISPRO_CLI_NO_DAEMON", "1")
+    assert isinstance(open_context(arcgispro), LazyContext)
+
+    monkeypatch.delenv("ARCGISPRO_CLI_NO_DAEMON")
+    server.stop()
+    for _ in range(200):
+        if not get_daemon_info_path(arcgispro).exists():
+            break
+        threading.Event().wait(0.01)
+    assert isinstance(open_context(arcgispro), LazyContext)
@@ -0,0 +1,83 @@
+"""Tests for snapshot diffs (arcgis diff)."""
+
+import copy
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from arcgispro_cli.cli import main
+from arcgispro_cli.diff import diff_snapshots, resolve_snapshot
+
+MAPS = [{"id": "m1", "name": "Map A", "mapType": "Map"}]
+LAYERS = [
+    {"id": "l1", "name": "Parcels", "mapName": "Map A", "definitionQuery": None, "selectionCount": 0,
+     "fields": [{"name": "PARCEL_ID", "alias": "Parcel"}, {"name": "ACRES", "fieldType": "Double"}],
+     "sampleData": [{"attributes": {"PARCEL_ID": 1}}]},
+    {"id": "l2", "name": "Roads", "mapName": "Map A", "fields": []},
+    {"name": "Wells", "mapName": "Map A"},
+]
+
+
+@pytest.fixture
+def changed_pair(tmp_path, make_export):
+    old = make_export(tmp_path / "a", maps=MAPS, layers=LAYERS)
+    layers = copy.deepcopy(LAYERS)
+    parcels = layers[0]
+    parcels["name"] = "Parcels 2025"
+    parcels["selectionCount"] = 12
+    parcels["sampleData"] = []
+    parcels["fields"][0]["alias"] = "Parcel ID"
+    parcels["fields"].append({"name": "OWNER"})
+    del parcels["fields"][1]
+    layers[1]["fields"] = []
+    del layers[2]
+    layers.append({"id": "l3", "name": "Zoning", "mapName": "Map A"})
+    new = make_export(tmp_path / "b", maps=MAPS, layers=layers)
+    return old, new
+
+
+def test_diff_snapshots(tmp_path, changed_pair):
+    old, new = changed_pair
+    result = diff_snapshots(old, new)
+
+    layers = result.kinds["layers"]
+    assert [r["name"] for r in layers.added] == ["Zoning"]
+    assert [r["name"] for r in layers.removed] == ["Wells"]
+    assert layers.unchanged == 1
+    (change,) = layers.changed
+    assert (change.key, [(c.key, c.old, c.new) for c in change.changes]) == (
+        "id:l1", [("name", "Parcels", "Parcels 2025")])
+    assert (change.fields_added, change.fields_removed) == (["OWNER"], ["ACRES"])
+    assert [(f.name, [(c.key, c.new) for c in f.changes]) for f in change.fields_changed] == [
+        ("PARCEL_ID", [("alias", "Parcel ID")])]
+    assert not result.kinds["maps"]
+    assert not result.kinds["tables"]
+
+    # Cached digests give the same answer
+    assert diff_snapshots(old, new).to_dict() == result.to_dict()
+    assert not diff_snapshots(old, old)
+    assert resolve_snapshot(tmp_path / "a") == old
+    assert resolve_snapshot(old / "context") == old
+    assert resolve_snapshot(tmp_path) is None
+
+
+def test_diff_cli(tmp_path, changed_pair):
+    runner = CliRunner()
+    a, b = str(tmp_path / "a"), str(tmp_path / "b")
+
+    result = runner.invoke(main, ["diff", a, b, "--json", "-k", "layers"])
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert data["summary"] == {"layers": {"added": 1, "removed": 1, "changed": 1,
+                                          "fieldsAdded": 1, "fieldsRemoved": 1, "fieldsChanged": 1}}
+    assert data["layers"]["changed"][0]["fields"]["added"] == ["OWNER"]
+
+    result = runner.invoke(main, ["diff", a, b, "--ignore", "alias"])
+    assert result.exit_code == 0, result.output
+    assert "+ field OWNER" in result.output and "PARCEL_ID" not in result.output
+
+    assert runner.invoke(main, ["diff", a, b, "--exit-code", "--summary"]).exit_code == 1
+    result = runner.invoke(main, ["diff", a, a, "--exit-code"])
+    assert (result.exit_code, "No differences" in result.output) == (0, True)
+    assert runner.invoke(main, ["diff", a, str(tmp_path)]).exit_code == 1
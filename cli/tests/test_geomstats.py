@@ -0,0 +1,84 @@
+"""Tests for the geometry complexity report (arcgis geom-stats)."""
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from arcgispro_cli import geomstats
+from arcgispro_cli.cli import main
+from arcgispro_cli.geomstats import geometry_reports, parse_size, sample_stats
+
+SQUARE = [[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]
+HOLE = [[0.5, 0.5], [1, 0.5], [1, 1], [0.5, 0.5]]
+
+
+def _layers(parcels_rows=None):
+    return [
+        {"id": "p", "name": "Parcels", "mapName": "Map A", "geometryType": "Polygon", "featureCount": 1_000_000,
+         "sampleData": parcels_rows or [
+             {"geometry": {"type": "Polygon", "coordinates": [SQUARE, HOLE]}},
+             {"geometry": {"type": "Polygon", "coordinates": [SQUARE]}},
+         ]},
+        {"id": "w", "name": "Wells", "mapName": "Map A", "geometryType": "Point", "featureCount": 10,
+         "sampleData": [{"geometry": {"type": "Point", "coordinates": [5, 5]}}]},
+        {"id": "t", "name": "Notes", "mapName": "Map B", "sampleData": [{"attributes": {"A": 1}}]},
+    ]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_sample_stats(monkeypatch, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(geomstats, "optional_numpy", lambda: None)
+    elif geomstats.optional_numpy() is None:
+        pytest.skip("numpy not installed")
+
+    stats = sample_stats([
+        {"type": "Polygon", "coordinates": [SQUARE, HOLE]},
+        {"type": "MultiLineString", "coordinates": [[[0, 0, 1], [3, 1, 1]], [[5, 5, 2], [6, 6, "z"]]]},
+        None,
+    ])
+    assert (stats.sampled, stats.vertices_max, stats.parts_max) == (2, 9, 2)
+    assert (stats.vertices_mean, stats.area_mean) == (6.5, (4 + 36) / 2)
+    # 40 + 4 * parts + 16 * vertices, plus 8 per z value and a 16-byte z range
+    assert stats.bytes_max == 40 + 8 + 16 * 9
+    assert stats.bytes_mean == (192 + (40 + 8 + 24 * 4 + 16)) / 2
+    assert sample_stats([{"type": "Point"}]) is None
+
+
+def test_reports_extrapolate_and_cache(tmp_path, monkeypatch, make_export):
+    arcgispro_path = make_export(tmp_path, layers=_layers())
+
+    reports = geometry_reports(arcgispro_path, budget=parse_size("100MB"))
+    by_name = {r.name: r for r in reports}
+    assert by_name["Parcels"].estimated_bytes == (40 + 8 + 16 * 9 + 40 + 4 + 16 * 5) // 2 * 1_000_000
+    assert by_name["Parcels"].over_budget
+    assert (by_name["Wells"].estimated_bytes, by_name["Wells"].over_budget) == (200, False)
+    assert by_name["Notes"].stats is None
+
+    # Only the layer whose sample geometries changed is measured again
+    layers = arcgispro_path / "context" / "layers.json"
+    make_export(tmp_path, layers=_layers(parcels_rows=[{"geometry": {"type": "Polygon", "coordinates": [SQUARE]}}]))
+    stat = layers.stat()
+    os.utime(layers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    measured = []
+    monkeypatch.setattr(geomstats, "sample_stats", lambda g: measured.append(g) or sample_stats(g))
+    reports = geometry_reports(arcgispro_path)
+    assert len(measured) == 1
+    assert reports[0].stats.vertices_max == 5
+
+
+def test_geom_stats_cli(tmp_path, make_export):
+    make_export(tmp_path, layers=_layers())
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["geom-stats", "-p", str(tmp_path), "--over", "--json", "-b", "1MB"])
+    assert result.exit_code == 0, result.output
+    assert [(r["name"], r["key"], r["partsMax"]) for r in json.loads(result.output)] == [("Parcels", "id:p", 2)]
+
+    result = runner.invoke(main, ["geom-stats", "-p", str(tmp_path)], env={"ARCGISPRO_CLI_GEOM_BUDGET": "1GB"})
+    assert result.exit_code == 0, result.output
+    assert "Parcels" in result.output and "⚠" not in result.output
+
+    assert runner.invoke(main, ["geom-stats", "-p", str(tmp_path), "-b", "lots"]).exit_code == 2
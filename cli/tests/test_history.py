@@ -0,0 +1,100 @@
+"""Tests for the snapshot history (arcgis history)."""
+
+import json
+
+from click.testing import CliRunner
+
+from arcgispro_cli.cli import main
+from arcgispro_cli.history import History
+from arcgispro_cli.paths import load_context_files
+
+LAYERS = [{"id": f"l{i}", "name": f"Layer {i}", "mapName": "Map A", "fields": [{"name": "A"}], "sampleData": []}
+          for i in range(5)]
+EXPORT = {"project": {"name": "Demo"}, "maps": [{"id": "m1", "name": "Map A"}]}
+
+
+def test_history_save_dedupes_and_restores(tmp_path, make_export):
+    arcgispro = make_export(tmp_path, layers=LAYERS, **EXPORT)
+    history = History(arcgispro)
+
+    first = history.save("first")
+    assert (first.records, first.new_blobs, first.unchanged) == (7, 7, False)
+    assert history.save().unchanged
+
+    # One changed layer costs one blob; the manifest is small
+    layers = [dict(r) for r in LAYERS]
+    layers[2]["name"] = "Renamed"
+    make_export(tmp_path, layers=layers, **EXPORT)
+    second = history.save()
+    assert (second.new_blobs, second.unchanged) == (1, False)
+    assert [e.id for e in history.entries()] == [first.entry.id, second.entry.id]
+    assert history.resolve("~1") == history.resolve(first.entry.id[:6]) == first.entry
+    assert history.resolve("@latest") == second.entry
+    assert history.summary(first.entry.id) == {"maps": 1, "layers": 5}
+
+    # Compacting the export changes its layout, not its records
+    from arcgispro_cli.shards import compact_kind
+
+    compact_kind(arcgispro, "layers")
+    assert history.save().unchanged
+
+    # A checkout reads back the original records
+    checkout = history.checkout(first.entry.id)
+    assert load_context_files(checkout).get("layers") == LAYERS
+    assert history.checkout(first.entry.id) == checkout
+
+    (arcgispro / "context" / "tables.json").write_text("[]", encoding="utf-8")
+    history.restore(first.entry.id)
+    context = load_context_files(arcgispro)
+    assert context.get("layers") == LAYERS
+    assert context.get("project") == {"name": "Demo"}
+    assert not (arcgispro / "context" / "tables.json").exists()
+
+
+def test_history_cli(tmp_path, make_export):
+    arcgispro = make_export(tmp_path, layers=LAYERS, **EXPORT)
+    runner = CliRunner()
+    p = ["-p", str(tmp_path)]
+
+    assert runner.invoke(main, ["history", "show", *p]).exit_code == 1  # nothing saved yet
+    result = runner.invoke(main, ["history", "save", *p, "-m", "before", "--json"])
+    assert result.exit_code == 0, result.output
+    saved = json.loads(result.output)
+    assert (saved["label"], saved["project"], saved["newBlobs"]) == ("before", "Demo", 7)
+
+    make_export(tmp_path, layers=LAYERS[:3], **EXPORT)
+    assert runner.invoke(main, ["history", "save", *p]).exit_code == 0
+
+    listed = json.loads(runner.invoke(main, ["history", "list", *p, "--json"]).output)
+    assert [e["label"] for e in listed] == [None, "before"]
+    shown = json.loads(runner.invoke(main, ["history", "show", "~1", *p, "--json"]).output)
+    assert shown["id"] == saved["id"] and shown["records"]["layers"] == 5
+
+    result = runner.invoke(main, ["diff", "@~1", "@latest", *p, "--json", "--summary"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["layers"]["removed"] == 2
+    assert runner.invoke(main, ["diff", "@nope", ".", *p]).exit_code == 1
+
+    result = runner.invoke(main, ["history", "restore", saved["id"], *p, "-y"])
+    assert result.exit_code == 0, result.output
+    assert len(load_context_files(arcgispro).get("layers")) == 5
+    # The export being replaced was saved first
+    assert runner.invoke(main, ["history", "list", *p, "--json"]).output.count('"id"') == 3
+
+
+def test_history_survives_a_new_snapshot(tmp_path, make_export):
+    """The add-in deletes .arcgispro on every Snapshot; the store is outside it."""
+    import shutil
+
+    arcgispro = make_export(tmp_path, layers=LAYERS, **EXPORT)
+    first = History(arcgispro).save()
+    assert CliRunner().invoke(main, ["clean", "--all", "-y", "-p", str(tmp_path)]).exit_code == 0
+
+    shutil.rmtree(arcgispro)
+    make_export(tmp_path, layers=LAYERS[:1], **EXPORT)
+    history = History(arcgispro)
+    assert not history.save().unchanged
+    assert [e.id for e in history.entries()][0] == first.entry.id
+
+    history.restore(first.entry.id)
+    assert load_context_files(arcgispro).get("layers") == LAYERS
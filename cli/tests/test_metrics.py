@@ -0,0 +1,54 @@
+"""Tests for the per-invocation metrics ring and its aggregation."""
+
+from click.testing import CliRunner
+
+from arcgispro_cli import metrics
+from arcgispro_cli.cli import main
+
+
+def test_invocations_are_recorded(tmp_path, monkeypatch, make_export):
+    monkeypatch.setenv("ARCGISPRO_CLI_NO_DAEMON", "1")
+    monkeypatch.delenv("ARCGISPRO_CLI_NO_METRICS", raising=False)
+    arcgispro = make_export(tmp_path, layers=[{"name": "Parcels", "mapName": "Map A"}])
+
+    runner = CliRunner()
+    for args in (["layers"], ["layer", "Parcels"], ["layer", "Parcels"], ["layer", "Missing"]):
+        runner.invoke(main, [*args, "--path", str(tmp_path)])
+    runner.invoke(main, ["metrics", "--path", str(tmp_path)])  # not recorded
+
+    records = list(metrics.iter_records(arcgispro))
+    assert [(r["command"], r["exit"]) for r in records] == [("layers", 0), ("layer", 0), ("layer", 0), ("layer", 1)]
+    assert records[0]["bytesRead"] > 0
+    # `layers` parsed the file whole and warmed the cache for `layer`
+    assert (records[0]["cacheMisses"], records[1]["cacheHits"], records[2]["cacheHits"]) == (1, 1, 1)
+    assert records[0]["contextBytes"] == (arcgispro / "context" / "layers.json").stat().st_size
+
+    result = runner.invoke(main, ["metrics", "--path", str(tmp_path), "--openmetrics", "-c", "layer"])
+    assert 'arcgis_cli_command_duration_seconds_count{project="%s",command="layer"} 3' % tmp_path in result.output
+    assert 'arcgis_cli_command_errors{project="%s",command="layer"} 1' % tmp_path in result.output
+    assert 'command="layers"' not in result.output
+    assert result.output.endswith("# EOF\n")
+
+    # Recorded outside the export; clean is not recorded and leaves nothing behind
+    assert not (arcgispro / "metrics").exists()
+    assert runner.invoke(main, ["clean", "--all", "-y", "--path", str(tmp_path)]).exit_code == 0
+    assert not arcgispro.exists() or not any(arcgispro.iterdir())
+
+
+def test_ring_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "SEGMENT_BYTES", 200)
+    folder = metrics.get_metrics_folder(tmp_path)
+    for i in range(50):
+        metrics.append_record(folder, {"command": "maps", "seconds": i / 1000, "ts": i})
+
+    records = list(metrics.iter_records(tmp_path))
+    assert sorted(p.name for p in folder.iterdir()) == [metrics.PREVIOUS_FILENAME, metrics.METRICS_FILENAME]
+    assert sum(p.stat().st_size for p in folder.iterdir()) < 2 * 200 + 100
+    assert records[-1]["ts"] == 49 and [r["ts"] for r in records] == sorted(r["ts"] for r in records)
+
+
+def test_summarize_percentiles():
+    records = [{"command": "maps", "seconds": s / 100, "exit": 0, "ts": s} for s in range(1, 101)]
+    (summary,) = metrics.summarize(iter(records))
+    assert summary["runs"] == 100
+    assert summary["quantiles"] == {"0.5": 0.5, "0.95": 0.95, "0.99": 0.99}
@@ -0,0 +1,181 @@
+"""Tests for context loading helpers in arcgispro_cli.paths."""
+
+import json
+
+import pytest
+
+from arcgispro_cli.paths import CONTEXT_FILES, HEAVY_RECORD_KEYS, iter_json_records, load_context_files
+
+
+def test_context_loads_files_on_first_access(tmp_path, write_json):
+    """Only the files whose keys are read get parsed."""
+    arcgispro = tmp_path / ".arcgispro"
+    write_json(arcgispro / "context" / "project.json", {"name": "Demo"})
+    write_json(arcgispro / "context" / "layers.json", [{"name": "Parcels"}])
+
+    context = load_context_files(arcgispro)
+    assert context.touched == []
+
+    assert context.get("project") == {"name": "Demo"}
+    assert context.touched == ["project"]
+
+    assert context.get("tables") is None
+    assert context.get("not-a-file") is None
+    assert context.touched == ["project", "tables"]
+
+
+def test_context_is_dict_compatible(tmp_path, write_json):
+    """Iteration and dict() expose every context key."""
+    arcgispro = tmp_path / ".arcgispro"
+    write_json(arcgispro / "meta.json", {"exportedAt": "2026-01-01T00:00:00Z"})
+
+    context = load_context_files(arcgispro)
+    as_dict = dict(context)
+
+    assert list(as_dict) == list(CONTEXT_FILES)
+    assert as_dict["meta"] == {"exportedAt": "2026-01-01T00:00:00Z"}
+    assert sum(1 for v in context.values() if v is not None) == 1
+
+
+def test_index_lookups(tmp_path, write_json):
+    """The context index answers name, id, map and partial-name lookups."""
+    arcgispro = tmp_path / ".arcgispro"
+    write_json(
+        arcgispro / "context" / "maps.json",
+        [{"name": "Map A", "isActiveMap": False}, {"name": "Map B", "isActiveMap": True}],
+    )
+    write_json(
+        arcgispro / "context" / "layers.json",
+        [
+            {"id": "a1", "name": "Parcels", "mapName": "Map A"},
+            {"id": "b1", "name": "Parcels", "mapName": "Map B"},
+            {"id": "b2", "name": "Parcel Fabric", "mapName": "Map B"},
+            {"id": "b3", "name": "Roads", "mapName": "Map B"},
+        ],
+    )
+
+    context = load_context_files(arcgispro)
+    index = context.index
+    assert index.active_map()["name"] == "Map B"
+    assert context.touched == ["maps"]  # map lookups don't build the layer part
+    assert index.map_named("map a")["name"] == "Map A"
+    assert [l["id"] for l in index.layers_named("PARCELS")] == ["a1", "b1"]
+    assert [l["id"] for l in index.find_layers("arcel")] == ["a1", "b1", "b2"]
+    assert [l["id"] for l in index.find_layers("ro")] == ["b3"]
+    assert index.find_layers("missing") == []
+    assert index.layer_by_id("b2")["name"] == "Parcel Fabric"
+    assert [l["id"] for l in index.layers_in_map("MAP B")] == ["b1", "b2", "b3"]
+
+    # A fresh load reuses the persisted index
+    assert (arcgispro / "cache" / "index.layers.pickle").exists()
+    assert [l["id"] for l in load_context_files(arcgispro).index.find_layers("fabric")] == ["b2"]
+
+    # ...and counts without parsing layers.json
+    context = load_context_files(arcgispro)
+    assert context.index.layer_count("map b") == 3
+    assert "layers" not in context.touched
+
+
+def test_iter_json_records_projects_away_heavy_keys(tmp_path):
+    """Streaming yields one record at a time without the excluded keys."""
+    records = [
+        {
+            "name": 'Tricky "name" \\ ]}',
+            "featureCount": i,
+            "isBroken": i % 2 == 0,
+            "fields": [{"name": "A", "alias": "}]"}],
+            "sampleData": [{"attributes": {"A": "\\\""}, "geometry": {"type": "Point", "coordinates": [1.5, -2e3]}}],
+            "extra": None,
+        }
+        for i in range(5)
+    ]
+    layers_file = tmp_path / "layers.json"
+    layers_file.write_text(json.dumps(records, indent=2), encoding="utf-8")
+
+    # A tiny chunk size forces every token to straddle chunk boundaries
+    streamed = list(iter_json_records(layers_file, exclude=HEAVY_RECORD_KEYS, chunk_size=3))
+    assert streamed == [{k: v for k, v in r.items() if k not in HEAVY_RECORD_KEYS} for r in records]
+    assert list(iter_json_records(layers_file, chunk_size=5)) == records
+    assert list(iter_json_records(tmp_path / "missing.json")) == []
+
+    truncated = tmp_path / "truncated.json"
+    truncated.write_text('[{"a": 1}, {"b": [1, 2', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_records(truncated, chunk_size=4))
+
+
+def test_context_records_use_the_parse_cache(tmp_path, monkeypatch, write_json):
+    """records() parses small or cached files whole and streams only large uncached ones."""
+    from arcgispro_cli import paths
+
+    arcgispro = tmp_path / ".arcgispro"
+    layers = [{"name": "Parcels", "fields": [{"name": "A"}]}, {"name": "Roads"}]
+    write_json(arcgispro / "context" / "layers.json", layers)
+    expected = [{"name": "Parcels"}, {"name": "Roads"}]
+
+    # Large and uncached: streamed, nothing kept in memory
+    monkeypatch.setattr(paths, "STREAM_THRESHOLD", 0)
+    context = load_context_files(arcgispro)
+    assert list(context.records("layers", exclude=HEAVY_RECORD_KEYS)) == expected
+    assert context.touched == []
+
+    # Once the parse cache is warm, the cached value is used instead
+    assert load_context_files(arcgispro).get("layers") == layers
+    monkeypatch.setattr(paths, "iter_json_records", lambda *a, **k: pytest.fail("streamed"))
+    context = load_context_files(arcgispro)
+    assert list(context.records("layers", exclude=HEAVY_RECORD_KEYS)) == expected
+    assert context.touched == ["layers"]
+
+
+def test_context_records_stream_realistic_exports(tmp_path, make_export):
+    """A few-MB layers.json is streamed, not materialized, when there's no cache entry."""
+    from arcgispro_cli import paths
+
+    rows = [{"attributes": {"NOTE": "x" * 200}} for _ in range(50)]
+    layers = [{"name": f"Layer {i}", "fields": [{"name": "NOTE"}], "sampleData": rows} for i in range(150)]
+    arcgispro = make_export(tmp_path, layers=layers)
+    assert (arcgispro / "context" / "layers.json").stat().st_size > paths.STREAM_THRESHOLD
+
+    context = load_context_files(arcgispro)
+    assert sum(1 for _ in context.records("layers", exclude=HEAVY_RECORD_KEYS)) == 150
+    assert context.touched == []
+
+
+def test_find_arcgispro_folder_resolution(tmp_path, monkeypatch):
+    """Discovery honours ARCGISPRO_DIR, memoizes and reuses the per-user cache."""
+    from arcgispro_cli import paths
+
+    project = tmp_path / "project"
+    nested = project / "a" / "b"
+    nested.mkdir(parents=True)
+    (project / ".arcgispro").mkdir()
+    found = paths.find_arcgispro_folder(nested)
+    assert found == (project / ".arcgispro").resolve()
+
+    with monkeypatch.context() as m:
+        # Memoized: no walk, no stat
+        m.setattr(paths, "_find_arcgispro_folder", lambda start: pytest.fail("walked"))
+        assert paths.find_arcgispro_folder(nested) == found
+
+        # New process (memo cleared): served from the per-user file
+        paths.forget_resolved()
+        assert paths.find_arcgispro_folder(nested) == found
+    entries = json.loads((paths.get_user_cache_folder() / paths.RESOLVE_CACHE_FILENAME).read_text())["entries"]
+    assert str(nested) in entries
+
+    # A closer export in an intermediate directory makes the cache entry stale
+    paths.forget_resolved()
+    (project / "a" / ".arcgispro").mkdir()
+    assert paths.find_arcgispro_folder(nested) == (project / "a" / ".arcgispro").resolve()
+
+    # ... and so does one in the start directory itself
+    paths.forget_resolved()
+    (nested / ".arcgispro").mkdir()
+    assert paths.find_arcgispro_folder(nested) == (nested / ".arcgispro").resolve()
+
+    # ARCGISPRO_DIR applies when no start path is given (project or .arcgispro folder)
+    monkeypatch.setenv("ARCGISPRO_DIR", str(project))
+    assert paths.find_arcgispro_folder() == (project / ".arcgispro").absolute()
+    monkeypatch.setenv("ARCGISPRO_DIR", str(tmp_path / "missing"))
+    assert paths.find_arcgispro_folder() is None
+    assert paths.find_arcgispro_folder(nested) == (nested / ".arcgispro").resolve()
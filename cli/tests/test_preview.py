@@ -0,0 +1,40 @@
+"""Tests for the cached half-block map preview renderer."""
+
+import os
+
+from PIL import Image
+
+from arcgispro_cli.tui.preview import HALF_BLOCK, clear_preview_cache, render_image
+
+
+def test_identical_cells_merge_into_one_span(tmp_path):
+    image_path = tmp_path / "map_Test.png"
+    # Horizontal bands: every text row is uniform
+    img = Image.new("RGB", (400, 400), (255, 0, 0))
+    img.paste((0, 0, 255), (0, 200, 400, 400))
+    img.save(image_path)
+    clear_preview_cache()
+
+    text = render_image(image_path, width=20)
+    rows = text.plain.splitlines()
+    assert len(rows) == 5  # 20 wide, square -> 10 pixel rows -> 5 text rows
+    assert all(row == HALF_BLOCK * 20 for row in rows)
+    assert len(text.spans) == len(rows)
+    assert str(text.spans[0].style) == "rgb(255,0,0) on rgb(255,0,0)"
+
+
+def test_render_is_cached_until_the_image_changes(tmp_path):
+    image_path = tmp_path / "map_Test.png"
+    Image.new("RGB", (100, 100), (0, 128, 0)).save(image_path)
+    clear_preview_cache()
+
+    first = render_image(image_path, width=10)
+    assert render_image(image_path, width=10) is first
+    assert render_image(image_path, width=12) is not first
+
+    Image.new("RGB", (100, 100), (0, 0, 0)).save(image_path)
+    stat = image_path.stat()
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = render_image(image_path, width=10)
+    assert second is not first
+    assert str(second.spans[0].style) == "rgb(0,0,0) on rgb(0,0,0)"
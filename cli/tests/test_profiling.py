@@ -0,0 +1,33 @@
+"""Tests for the --profile phase instrumentation."""
+
+import json
+
+from click.testing import CliRunner
+
+from arcgispro_cli import profiling
+from arcgispro_cli.cli import main
+
+
+def test_span_is_noop_without_profiler():
+    assert profiling.span("anything") is profiling._NULL_SPAN
+    assert profiling.stop_profiling() is None
+
+
+def test_profile_output(tmp_path, monkeypatch, make_export):
+    monkeypatch.setenv("ARCGISPRO_CLI_NO_DAEMON", "1")
+    make_export(tmp_path, layers=[{"name": "Parcels", "mapName": "Map A"}])
+    out = tmp_path / "profile.jsonl"
+
+    runner = CliRunner()
+    for args in (["layers", "--json"], ["layer", "Missing"]):
+        runner.invoke(main, ["--profile-output", str(out), *args, "--path", str(tmp_path)])
+
+    first, second = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    names = [p["name"] for p in first["phases"]]
+    assert {"discover", "load layers", "parse json", "filter", "serialize", "render"} <= set(names)
+    assert first["peakBytes"] is None
+    assert sum(p["seconds"] for p in first["phases"] if p["depth"] == 0) <= first["wallSeconds"]
+
+    # Failing commands (SystemExit) are still reported
+    assert "index" in [p["name"] for p in second["phases"]]
+    assert profiling._active is None
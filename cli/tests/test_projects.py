@@ -0,0 +1,73 @@
+"""Tests for cross-project queries (arcgis layers --recursive)."""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from arcgispro_cli.cli import main
+from arcgispro_cli.projects import find_exports, iter_project_records, query_projects
+
+
+MAPS = [{"name": "Map A", "isActiveMap": True}]
+
+
+@pytest.fixture
+def share(tmp_path, make_export):
+    make_export(tmp_path / "north", maps=MAPS, layers=[
+        {"name": "Parcels", "mapName": "Map A", "fields": [{"name": "PIN"}]},
+        {"name": "Roads", "mapName": "Map B", "isBroken": True},
+    ])
+    make_export(tmp_path / "south" / "2025", maps=MAPS, layers=[{"name": "Wells", "mapName": "Map A"}])
+    make_export(tmp_path / ".trash" / "old", maps=MAPS, layers=[{"name": "Hidden", "mapName": "Map A"}])
+    (tmp_path / "bad" / ".arcgispro" / "context").mkdir(parents=True)
+    (tmp_path / "bad" / ".arcgispro" / "context" / "layers.json").write_text("[{", encoding="utf-8")
+    return tmp_path
+
+
+def test_query_projects(share):
+    root = share
+    assert sorted(p.parent.name for p in find_exports(root)) == ["2025", "bad", "north"]
+    assert [p.parent.name for p in find_exports(root, max_depth=1)] == ["bad", "north"]
+
+    results = {r.project.name: r for r in query_projects(root, "layers", workers=2)}
+    assert results["bad"].error and results["bad"].records == []
+    assert [l["name"] for l in results["north"].records] == ["Parcels", "Roads"]
+    assert "fields" not in results["north"].records[0]
+
+    records = list(iter_project_records(root, "layers", active=True, details=True))
+    assert sorted((r["project"], r["name"]) for r in records) == [
+        (str(root / "north"), "Parcels"),
+        (str(root / "south" / "2025"), "Wells"),
+    ]
+    assert all("fields" in r for r in records if r["name"] == "Parcels")
+
+
+def test_layers_recursive_cli(share):
+    root = share
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["layers", "--recursive", str(root), "--broken", "--json"])
+    assert result.exit_code == 0
+    layers = json.loads(result.stdout)
+    assert [(l["project"], l["name"]) for l in layers] == [(str(root / "north"), "Roads")]
+
+    result = runner.invoke(main, ["tables", "--recursive", str(root / "north" / ".arcgispro" / "context")])
+    assert result.exit_code == 1
+
+
+def test_recursive_queries_skip_the_export_caches(share, monkeypatch):
+    """Pickles in other people's exports are never loaded, and none are written."""
+    import pickle
+
+    from arcgispro_cli.paths import load_context_files
+
+    root = share
+    north = root / "north" / ".arcgispro"
+    load_context_files(north).index.find_layers("parcel")  # the owner's own caches
+    assert list((north / "cache").glob("*.pickle"))
+    monkeypatch.setattr(pickle, "load", lambda f: pytest.fail("unpickled an export cache"))
+
+    records = list(iter_project_records(root, "layers", active=True))
+    assert sorted(r["name"] for r in records) == ["Parcels", "Wells"]
+    assert not (root / "south" / "2025" / ".arcgispro" / "cache").exists()
@@ -0,0 +1,118 @@
+"""Tests for sample row extraction (arcgis samples)."""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from arcgispro_cli.cli import main
+from arcgispro_cli.samples import collect_schema, iter_sample_batches
+
+
+FIELDS = [
+    {"name": "OBJECTID", "fieldType": "OID"},
+    {"name": "Shape", "fieldType": "Geometry"},
+    {"name": "PARCEL_ID", "fieldType": "String"},
+    {"name": "ACRES", "fieldType": "Double"},
+    {"name": "UPDATED", "fieldType": "Date"},
+]
+LAYERS = [
+    {"name": "Parcels", "mapName": "Map A", "fields": FIELDS, "sampleData": [
+        {"attributes": {"OBJECTID": 1, "PARCEL_ID": 1001, "ACRES": "2.5",
+                        "UPDATED": "2025-03-01T12:00:00.0000000Z"},
+         "geometry": {"type": "Point", "coordinates": [1, 2]}},
+        {"attributes": {"OBJECTID": 2, "PARCEL_ID": "A-7", "ACRES": None}, "geometry": None},
+    ]},
+    {"name": "Roads", "mapName": "Map B", "fields": [{"name": "ROUTE", "fieldType": "Integer"}],
+     "sampleData": [{"attributes": {"ROUTE": 66}}]},
+    {"name": "Empty", "mapName": "Map B", "fields": FIELDS, "sampleData": []},
+]
+
+
+def test_batches_are_typed_and_projected(tmp_path, make_export, write_json):
+    arcgispro_path = make_export(tmp_path, layers=LAYERS)
+
+    (batch,) = iter_sample_batches(arcgispro_path, name="parcels")
+    assert list(batch.columns) == ["_map", "_name", "OBJECTID", "PARCEL_ID", "ACRES", "UPDATED"]
+    assert batch.columns["PARCEL_ID"] == ["1001", "A-7"]
+    assert batch.columns["ACRES"] == [2.5, None]
+
+    batches = list(iter_sample_batches(arcgispro_path, columns=["acres", "route"], geometry=True))
+    assert [b.name for b in batches] == ["Parcels", "Roads"]
+    assert list(batches[0].columns) == ["_map", "_name", "acres", "route", "_geometry"]
+    assert batches[1].columns["route"] == [66]
+    assert batches[0].columns["_geometry"][0] == {"type": "Point", "coordinates": [1, 2]}
+
+    # Attributes without a field entry are part of the schema (and every format's header)
+    layers = json.loads((arcgispro_path / "context" / "layers.json").read_text())
+    layers[1]["sampleData"][0]["attributes"]["LANES"] = 4
+    write_json(arcgispro_path / "context" / "layers.json", layers)
+    assert [(c.name, c.type) for c in collect_schema(arcgispro_path)][-2:] == [("ROUTE", "int"), ("LANES", "string")]
+    (batch,) = iter_sample_batches(arcgispro_path, name="roads")
+    assert batch.columns["LANES"] == ["4"]
+
+
+def test_samples_cli_csv_and_ndjson(tmp_path, make_export):
+    make_export(tmp_path, layers=LAYERS)
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["samples", "-p", str(tmp_path), "--all", "-c", "PARCEL_ID,ROUTE"])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == [
+        "_map,_name,PARCEL_ID,ROUTE",
+        "Map A,Parcels,1001,",
+        "Map A,Parcels,A-7,",
+        "Map B,Roads,,66",
+    ]
+
+    out = tmp_path / "rows.ndjson"
+    result = runner.invoke(main, ["samples", "-p", str(tmp_path), "Roads", "-o", str(out)])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line) for line in out.read_text().splitlines()] == [
+        {"_map": "Map B", "_name": "Roads", "ROUTE": 66}
+    ]
+
+    result = runner.invoke(main, ["samples", "-p", str(tmp_path)])
+    assert result.exit_code == 2
+
+
+def test_samples_cli_broken_pipe(tmp_path, monkeypatch, make_export):
+    from arcgispro_cli import samples
+
+    def closed_pipe(batches, schema, out):
+        raise BrokenPipeError(32, "Broken pipe")
+
+    make_export(tmp_path, layers=LAYERS)
+    monkeypatch.setattr(samples, "write_csv", closed_pipe)
+    result = CliRunner().invoke(main, ["samples", "-p", str(tmp_path), "--all"])
+    assert result.exit_code == 1 and "✗" not in result.output
+
+
+def test_samples_parquet(tmp_path, make_export):
+    pq = pytest.importorskip("pyarrow.parquet")
+    make_export(tmp_path, layers=LAYERS)
+    out = tmp_path / "rows.parquet"
+
+    result = CliRunner().invoke(main, ["samples", "-p", str(tmp_path), "--all", "-o", str(out)])
+    assert result.exit_code == 0, result.output
+    table = pq.read_table(out)
+    assert table.num_rows == 3
+    assert str(table.schema.field("ACRES").type) == "double"
+    assert str(table.schema.field("UPDATED").type) == "timestamp[us]"
+    assert table.column("ROUTE").to_pylist() == [None, None, 66]
+
+
+def test_samples_cli_errors_are_not_mislabelled(tmp_path, monkeypatch, make_export):
+    from arcgispro_cli import samples
+
+    layers = tmp_path / ".arcgispro" / "context" / "layers.json"
+    layers.parent.mkdir(parents=True)
+    layers.write_text("[{", encoding="utf-8")
+    result = CliRunner().invoke(main, ["samples", "-p", str(tmp_path), "--all"])
+    assert result.exit_code == 1 and "layers.json is not valid JSON" in result.output
+
+    # A writer's own ValueError is not reported as a JSON problem
+    make_export(tmp_path, layers=LAYERS)
+    monkeypatch.setattr(samples, "write_csv", lambda *a: (_ for _ in ()).throw(ValueError("bad cell")))
+    result = CliRunner().invoke(main, ["samples", "-p", str(tmp_path), "--all"])
+    assert isinstance(result.exception, ValueError) and "not valid JSON" not in result.output
@@ -0,0 +1,58 @@
+"""Tests for ranked search (arcgis search)."""
+
+import json
+import os
+
+from click.testing import CliRunner
+
+from arcgispro_cli.cli import main
+from arcgispro_cli.search import load_search_index, tokenize
+
+
+EXPORT = {
+    "layers": [
+        {"name": "Parcels", "mapName": "Map A", "dataSourcePath": "C:/GIS/Cadastre.gdb/Parcels",
+         "fields": [{"name": "PARCEL_ID", "alias": "Parcel ID"}, {"name": "OwnerName", "domainName": "Owners"}]},
+        {"name": "Roads", "mapName": "Map A", "definitionQuery": "STATUS = 'Active'",
+         "fields": [{"name": "ROAD_NAME"}]},
+    ],
+    "notebooks": [{"name": "Cleanup", "description": "Fix parcel geometry"}],
+}
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("PARCEL_ID") == ["parcel", "id", "parcelid"]
+    assert tokenize("OwnerNames") == ["owner", "name", "ownername"]
+    assert tokenize("Parcels status") == ["parcel", "status"]
+    assert tokenize("HTTPServer2") == ["http", "server", "2", "httpserver2"]
+
+
+def test_search_ranks_and_rebuilds(tmp_path, make_export, write_json):
+    arcgispro_path = make_export(tmp_path, **EXPORT)
+    index = load_search_index(arcgispro_path)
+
+    hits = index.search("parcel id")
+    assert (hits[0].kind, hits[0].name, hits[0].owner) == ("field", "PARCEL_ID", "Parcels")
+    assert {h.kind for h in hits} == {"field", "layer", "notebook"}
+    assert [h.name for h in index.search("owner name")][:1] == ["OwnerName"]
+    assert [h.name for h in index.search("activ", kinds=["layer"])] == ["Roads"]
+    assert (arcgispro_path / "cache" / "search.layers.pickle").exists()
+
+    # Only the changed segment is rebuilt
+    notebooks_entry = arcgispro_path / "cache" / "search.notebooks.pickle"
+    before = notebooks_entry.stat().st_mtime_ns
+    layers = arcgispro_path / "context" / "layers.json"
+    write_json(layers, [{"name": "Wells", "mapName": "Map A"}])
+    stat = layers.stat()
+    os.utime(layers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    index = load_search_index(arcgispro_path)
+    assert [h.name for h in index.search("wells")] == ["Wells"]
+    assert index.search("roads") == []
+    assert notebooks_entry.stat().st_mtime_ns == before
+
+
+def test_search_cli(tmp_path, make_export):
+    make_export(tmp_path, **EXPORT)
+    result = CliRunner().invoke(main, ["search", "-p", str(tmp_path), "-k", "field", "--json", "road"])
+    assert result.exit_code == 0, result.output
+    assert [(h["name"], h["owner"]) for h in json.loads(result.output)] == [("ROAD_NAME", "Roads")]
@@ -0,0 +1,94 @@
+"""Tests for the sharded layer/table layout and the compact command."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from arcgispro_cli.cli import main
+
+
+def test_compact_then_query_reads_shards(write_json):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        write_json(
+            Path(".arcgispro/context/layers.json"),
+            [
+                {
+                    "id": "abc",
+                    "name": "Parcels",
+                    "mapName": "Map A",
+                    "fields": [{"name": "PARCEL_ID", "fieldType": "String"}],
+                    "sampleData": [{"attributes": {"PARCEL_ID": "1"}}],
+                },
+                {"name": "Roads", "mapName": "Map A", "fields": [], "sampleData": []},
+            ],
+        )
+
+        result = runner.invoke(main, ["compact", "--prune"])
+        assert result.exit_code == 0
+
+        context = Path(".arcgispro/context")
+        assert not (context / "layers.json").exists()
+        index = json.loads((context / "layers.index.json").read_text(encoding="utf-8"))
+        assert [r["shard"] for r in index][0] == "abc"
+        assert all("fields" not in r and "sampleData" not in r for r in index)
+        assert (context / "layers" / "abc.json").exists()
+
+        result = runner.invoke(main, ["fields", "Parcels", "--json"])
+        assert result.exit_code == 0
+        assert json.loads(result.output) == [{"name": "PARCEL_ID", "fieldType": "String"}]
+
+        result = runner.invoke(main, ["layers"])
+        assert result.exit_code == 0
+        assert "Roads" in result.output
+
+
+def test_stale_index_falls_back_to_layers_json(write_json):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        layers_file = Path(".arcgispro/context/layers.json")
+        write_json(layers_file, [{"id": "a", "name": "Old", "mapName": "M"}])
+        assert runner.invoke(main, ["compact"]).exit_code == 0
+
+        # A newer Snapshot rewrites layers.json
+        write_json(layers_file, [{"id": "b", "name": "New", "mapName": "M"}])
+        index_file = Path(".arcgispro/context/layers.index.json")
+        st = index_file.stat()
+        os.utime(layers_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        result = runner.invoke(main, ["layers"])
+        assert "New" in result.output
+        assert "Old" not in result.output
+
+
+def test_failed_compact_keeps_previous_layout(tmp_path, monkeypatch):
+    """An error while writing shards leaves the previous index and shards intact."""
+    from arcgispro_cli import shards
+
+    arcgispro = tmp_path / ".arcgispro"
+    layers_file = arcgispro / "context" / "layers.json"
+    layers_file.parent.mkdir(parents=True)
+    layers_file.write_text(json.dumps([{"id": "a", "name": "A", "fields": [{"name": "F"}]}]), encoding="utf-8")
+    shards.compact_kind(arcgispro, "layers")
+    index_path = shards.get_shard_index_path(arcgispro, "layers")
+    before = index_path.read_text(encoding="utf-8")
+
+    layers_file.write_text(json.dumps([{"id": "b", "name": "B"}, {"id": "c", "name": "C"}]), encoding="utf-8")
+    real_write = shards._write_json_atomic
+
+    def fail_second(path, obj, calls=[]):
+        calls.append(path)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        real_write(path, obj)
+
+    monkeypatch.setattr(shards, "_write_json_atomic", fail_second)
+    with pytest.raises(OSError):
+        shards.compact_kind(arcgispro, "layers")
+
+    assert index_path.read_text(encoding="utf-8") == before
+    assert sorted(p.name for p in (arcgispro / "context" / "layers").iterdir()) == ["a.json"]
+    assert sorted(p.name for p in (arcgispro / "context").iterdir()) == ["layers", "layers.index.json", "layers.json"]
@@ -0,0 +1,95 @@
+"""Tests for the spatial index (layers --bbox, maps --intersects)."""
+
+import json
+import random
+
+from click.testing import CliRunner
+
+from arcgispro_cli import spatial
+from arcgispro_cli.cli import main
+from arcgispro_cli.spatial import STRTree, geometry_bbox, load_spatial_index, transform_bbox
+
+
+EXPORT = {
+    "maps": [
+        {"name": "City", "extent": {"xMin": 0, "yMin": 0, "xMax": 10, "yMax": 10, "spatialReferenceWkid": 3857}},
+        {"name": "World", "extent": {"xMin": -180, "yMin": -90, "xMax": 180, "yMax": 90}, "spatialReferenceWkid": 4326},
+        {"name": "Empty"},
+    ],
+    "layers": [
+        {"name": "Parcels", "mapName": "City", "sampleData": [
+            {"geometry": {"type": "Polygon", "coordinates": [[[1, 1], [3, 1], [3, 3], [1, 1]]]}},
+            {"geometry": {"type": "Point", "coordinates": [4, 4]}},
+        ]},
+        {"name": "Roads", "mapName": "City", "sampleData": [
+            {"geometry": {"type": "LineString", "coordinates": [[7, 7], [9, 8]]}},
+        ]},
+        {"name": "Countries", "mapName": "World", "sampleData": [
+            {"geometry": {"type": "Point", "coordinates": [0.00005, 0.00005]}},
+        ]},
+        {"name": "Table-like", "mapName": "City", "sampleData": [{"attributes": {"A": 1}}]},
+    ],
+}
+
+
+def _brute_force(boxes, q):
+    return [i for i, b in enumerate(boxes) if b[0] <= q[2] and b[2] >= q[0] and b[1] <= q[3] and b[3] >= q[1]]
+
+
+def test_tree_matches_brute_force(monkeypatch):
+    rng = random.Random(7)
+    boxes = []
+    for _ in range(1000):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        boxes.append((x, y, x + rng.uniform(0, 5), y + rng.uniform(0, 5)))
+    queries = [(x, y, x + 10, y + 10) for x, y in ((rng.uniform(-5, 100), rng.uniform(-5, 100)) for _ in range(50))]
+
+    trees = [STRTree(boxes, capacity=8)]
+    monkeypatch.setattr(spatial, "optional_numpy", lambda: None)
+    trees.append(STRTree(boxes, capacity=8))
+
+    for tree in trees:
+        assert [len(level[0]) for level in tree.levels] == [1000, 125, 16, 2, 1]
+        for q in queries:
+            assert tree.query(q) == _brute_force(boxes, q)
+    assert STRTree([]).query((0, 0, 1, 1)) == []
+
+
+def test_geometry_helpers():
+    assert geometry_bbox([{"type": "MultiPolygon", "coordinates": [[[[0, 5], [2, -1, 9]]], [[[8, 3]]]]},
+                          None, {"type": "Point", "coordinates": None}]) == (0, -1, 8, 5)
+    assert geometry_bbox([]) is None
+    x0, y0, x1, y1 = transform_bbox((-180, 0, 0, 45), 4326, 102100)
+    assert round(x0) == -20037508 and round(y1) == 5621521
+    assert transform_bbox((0, 0, 1, 1), 3857, 102100) == (0, 0, 1, 1)
+    assert transform_bbox((0, 0, 1, 1), 2193, 4326) is None
+
+
+def test_spatial_index_is_cached(tmp_path, make_export):
+    arcgispro_path = make_export(tmp_path, **EXPORT)
+    index = load_spatial_index(arcgispro_path)
+    assert index.counts == {"maps": 3, "layers": 4, "mapsIndexed": 2, "layersIndexed": 3}
+    assert index.layers_intersecting((2, 2, 5, 5)) == [0]
+    assert (arcgispro_path / "cache" / "spatial.pickle").exists()
+    assert load_spatial_index(arcgispro_path).maps_intersecting((9, 9, 20, 20)) == [0, 1]
+
+
+def test_bbox_cli(tmp_path, make_export):
+    make_export(tmp_path, **EXPORT)
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["layers", "-p", str(tmp_path), "--bbox", "3.5,3.5,8,8", "--json"])
+    assert result.exit_code == 0, result.output
+    assert [l["name"] for l in json.loads(result.output)] == ["Parcels", "Roads"]
+
+    # A WGS84 box at the origin is converted for the Web Mercator map (~11 m square)
+    result = runner.invoke(main, ["layers", "-p", str(tmp_path), "--bbox", "0,0,0.0001,0.0001", "--wkid", "4326"])
+    assert result.exit_code == 0, result.output
+    assert "Parcels" in result.output and "Countries" in result.output and "Roads" in result.output
+
+    result = runner.invoke(main, ["maps", "-p", str(tmp_path), "--intersects", "100,50,120,60", "--json"])
+    assert result.exit_code == 0, result.output
+    assert [m["name"] for m in json.loads(result.output)] == ["World"]
+
+    result = runner.invoke(main, ["layers", "-p", str(tmp_path), "--bbox", "5,5,1,1"])
+    assert result.exit_code == 2
@@ -0,0 +1,114 @@
+"""Tests for the SQLite context database (arcgis index / arcgis sql)."""
+
+import json
+import os
+
+from click.testing import CliRunner
+
+from arcgispro_cli.cli import main
+from arcgispro_cli.sqlindex import build_index, connect
+
+
+EXPORT = {
+    "maps": [
+        {"name": "Map A", "isActiveMap": True, "extent": {"xMin": 0, "yMin": 0, "xMax": 10, "yMax": 10}},
+        {"name": "Map B"},
+    ],
+    "layers": [
+        {"name": "Parcels", "mapName": "Map A", "featureCount": 2_500_000,
+         "fields": [{"name": "OBJECTID"}, {"name": "PARCEL_ID", "fieldType": "String"}],
+         "sampleData": [{"attributes": {"PARCEL_ID": "1"}}]},
+        {"name": "Parcels 2019", "mapName": "Map B", "featureCount": 900_000,
+         "fields": [{"name": "PARCEL_ID"}]},
+        {"name": "Roads", "mapName": "Map B", "isBroken": True, "fields": [{"name": "NAME"}]},
+    ],
+    "layouts": [
+        {"name": "Layout", "mapFrames": [{"name": "Frame", "mapName": "Map A"}]},
+    ],
+    "geoprocessing": {"count": 1, "history": [{"toolName": "Buffer", "succeeded": True}]},
+}
+
+
+def test_build_and_query(tmp_path, make_export, write_json):
+    arcgispro_path = make_export(tmp_path, **EXPORT)
+
+    db_path, rebuilt = build_index(arcgispro_path)
+    assert rebuilt and db_path.exists()
+    assert build_index(arcgispro_path) == (db_path, False)
+
+    conn = connect(arcgispro_path)
+    rows = conn.execute(
+        "SELECT map_name, layer_name FROM layer_fields WHERE field_name = 'parcel_id' AND feature_count > 1000000"
+    ).fetchall()
+    assert rows == [("Map A", "Parcels")]
+    assert conn.execute(
+        "SELECT m.name FROM map_frames f JOIN maps m ON m.id = f.map_id"
+    ).fetchall() == [("Map A",)]
+    assert conn.execute("SELECT tool_name, succeeded FROM geoprocessing").fetchall() == [("Buffer", 1)]
+    conn.close()
+
+    # A re-export rebuilds on the next query
+    layers = arcgispro_path / "context" / "layers.json"
+    write_json(layers, [{"name": "Wells", "mapName": "Map A"}])
+    stat = layers.stat()
+    os.utime(layers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    conn = connect(arcgispro_path)
+    assert conn.execute("SELECT name FROM layers").fetchall() == [("Wells",)]
+    conn.close()
+
+
+def test_sql_cli_formats(tmp_path, make_export):
+    make_export(tmp_path, **EXPORT)
+    runner = CliRunner()
+    query = "SELECT name, is_broken FROM layers ORDER BY name"
+
+    result = runner.invoke(main, ["sql", "-p", str(tmp_path), "--csv", query])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == ["name,is_broken", "Parcels,", "Parcels 2019,", "Roads,1"]
+
+    result = runner.invoke(main, ["sql", "-p", str(tmp_path), "--json", "SELECT name FROM layers WHERE is_broken"])
+    assert json.loads(result.output) == [{"name": "Roads"}]
+
+    result = runner.invoke(main, ["sql", "-p", str(tmp_path), "DELETE FROM layers"])
+    assert result.exit_code == 1
+    assert "readonly" in result.output
+
+    # Nothing outside the database can be created or written
+    for statement in (f"ATTACH '{tmp_path / 'x.db'}' AS x", f"VACUUM INTO '{tmp_path / 'v.db'}'"):
+        assert runner.invoke(main, ["sql", "-p", str(tmp_path), statement]).exit_code == 1
+    assert not (tmp_path / "x.db").exists() and not (tmp_path / "v.db").exists()
+
+
+
+def test_out_of_range_values_are_stored_as_text(tmp_path, make_export, monkeypatch):
+    """Valid JSON that SQLite can't bind doesn't break the database."""
+    import sqlite3
+
+    from arcgispro_cli import sqlindex
+
+    arcgispro_path = make_export(tmp_path, maps=[{"name": "Map A", "extent": [0, 0]}], layers=[
+        {"name": "Huge", "mapName": "Map A", "featureCount": 10**23, "fields": [{"name": "A", "length": {"n": 1}}]},
+    ])
+    runner = CliRunner()
+    result = runner.invoke(main, ["sql", "-p", str(tmp_path), "--json", "SELECT name, feature_count FROM layers"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == [{"name": "Huge", "feature_count": 1e23}]
+    result = runner.invoke(main, ["sql", "-p", str(tmp_path), "--csv", "SELECT length FROM fields"])
+    assert result.output.splitlines() == ["length", '"{""n"": 1}"']
+
+    # Any other build failure is reported, and not retried in memory
+    calls = []
+
+    def broken(conn, context):
+        calls.append(conn)
+        raise sqlite3.IntegrityError("constraint failed")
+
+    monkeypatch.setattr(sqlindex, "populate", broken)
+    layers = arcgispro_path / "context" / "layers.json"
+    stat = layers.stat()
+    os.utime(layers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    result = runner.invoke(main, ["sql", "-p", str(tmp_path), "SELECT 1"])
+    assert result.exit_code == 1 and "constraint failed" in result.output
+    assert len(calls) == 1
+    result = runner.invoke(main, ["index", "-p", str(tmp_path)])
+    assert result.exit_code == 1 and "constraint failed" in result.output
@@ -0,0 +1,64 @@
+"""Startup cost regression tests for the lazily loaded CLI."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import arcgispro_cli
+from arcgispro_cli.cli import LAZY_COMMANDS, main
+
+# Cumulative import time budget for `import arcgispro_cli.cli` (microseconds).
+# Importing every command module eagerly (Textual, Pillow, Rich tables) costs
+# several times this.
+STARTUP_BUDGET_US = 200_000
+
+# Modules that only specific subcommands need
+HEAVY_MODULES = ("textual", "rich", "PIL")
+
+
+def _import_times():
+    """Run `python -X importtime` on the CLI module and parse the report."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(Path(arcgispro_cli.__file__).resolve().parent.parent)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import arcgispro_cli.cli"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative.strip())
+        except ValueError:
+            continue  # header row
+    return times
+
+
+def test_startup_does_not_import_heavy_modules():
+    """Importing the CLI must not pull in Textual, Rich or Pillow."""
+    imported = _import_times()
+    heavy = sorted(n for n in imported if n.split(".")[0] in HEAVY_MODULES)
+    assert heavy == []
+
+
+def test_startup_within_budget():
+    """`import arcgispro_cli.cli` stays within the startup budget (best of 3)."""
+    best = min(_import_times()["arcgispro_cli.cli"] for _ in range(3))
+    assert best < STARTUP_BUDGET_US, f"CLI import took {best / 1000:.1f} ms"
+
+
+def test_lazy_help_matches_commands():
+    """Static help strings in LAZY_COMMANDS match the commands' own help."""
+    import click
+
+    ctx = click.Context(main)
+    for name, (_, short_help) in LAZY_COMMANDS.items():
+        cmd = main.get_command(ctx, name)
+        assert cmd is not None, name
+        assert cmd.get_short_help_str(limit=200) == short_help, name
@@ -0,0 +1,80 @@
+"""Tests for TUI node handles and their resolution against the context."""
+
+import os
+
+from arcgispro_cli.tui.state import NodeRef, TUIState
+
+
+def test_resolve_handles(tmp_path, make_export, write_json):
+    arcgispro = make_export(
+        tmp_path,
+        maps=[{"id": "m1", "name": "Map A"}],
+        layers=[
+            {"id": "l1", "name": "Parcels", "mapName": "Map A", "fields": [{"name": "PIN"}, {"name": "OWNER"}]},
+            {"name": "Roads", "mapName": "Map A", "fields": []},
+        ],
+    )
+    state = TUIState(repo_path=str(tmp_path))
+
+    assert state.resolve(NodeRef("map", "id:m1"))["name"] == "Map A"
+    assert state.resolve(NodeRef("layer", "name:Map A/Roads"))["name"] == "Roads"
+    assert state.resolve(NodeRef("field", "id:l1", 1)) == {"_layer": "Parcels", "name": "OWNER"}
+    assert state.resolve(NodeRef("field", "id:l1", 2)) is None
+    assert state.resolve(NodeRef("table", "id:t1")) is None
+
+    # A re-export drops stale handles
+    layers_file = arcgispro / "context" / "layers.json"
+    write_json(layers_file, [{"id": "l1", "name": "Parcels", "mapName": "Map A"}])
+    stat = layers_file.stat()
+    os.utime(layers_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert state.poll_changes() == ["layers"]
+    assert state.resolve(NodeRef("layer", "name:Map A/Roads")) is None
+    assert state.resolve(NodeRef("field", "id:l1", 0)) is None
+
+
+def test_state_is_serialized_across_threads(tmp_path, make_export):
+    """Worker threads wait for the main thread's use of the caches to finish."""
+    import threading
+
+    make_export(tmp_path, layers=[{"id": "l1", "name": "Parcels"}])
+    state = TUIState(repo_path=str(tmp_path))
+    results = []
+    worker = threading.Thread(target=lambda: results.append(state.resolve(NodeRef("layer", "id:l1"))))
+    with state._lock:
+        worker.start()
+        worker.join(0.1)
+        assert worker.is_alive() and results == []
+    worker.join(5)
+    assert results == [{"id": "l1", "name": "Parcels"}]
+
+
+def test_selection_resolves_off_the_ui_thread(tmp_path, make_export, monkeypatch):
+    """Highlighting a node passes its handle on; the panels' workers resolve it."""
+    import asyncio
+    import threading
+
+    from arcgispro_cli.tui.app import ArcGISProCLIApp
+    from arcgispro_cli.tui.panels.project_tree import ProjectTree
+
+    make_export(tmp_path, maps=[{"id": "m1", "name": "Map A"}],
+                layers=[{"id": "l1", "name": "Parcels", "mapName": "Map A"}])
+    threads = []
+    resolve = TUIState.resolve
+
+    def recording_resolve(self, ref):
+        threads.append(threading.current_thread())
+        return resolve(self, ref)
+
+    monkeypatch.setattr(TUIState, "resolve", recording_resolve)
+
+    async def run():
+        app = ArcGISProCLIApp(repo_path=str(tmp_path), show_banner=False, watch=False)
+        async with app.run_test():
+            threads.clear()
+            app.on_project_tree_item_selected(ProjectTree.ItemSelected("layer", NodeRef("layer", "id:l1")))
+            assert threads == []
+            await app.workers.wait_for_complete()
+            assert threads and threading.main_thread() not in threads
+            assert "hidden" not in app.query_one("#map-preview").classes
+
+    asyncio.run(run())
@@ -0,0 +1,58 @@
+"""Tests for context change detection and record diffing."""
+
+import json
+import os
+
+from arcgispro_cli.paths import load_context_files
+from arcgispro_cli.watch import ContextWatcher, diff_records, keyed_records
+
+
+def _write_json(path, obj):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj), encoding="utf-8")
+    # Force a new mtime even on coarse-grained filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_watcher_reports_and_invalidates_changed_keys(tmp_path):
+    arcgispro = tmp_path / ".arcgispro"
+    _write_json(arcgispro / "context" / "maps.json", [{"name": "Map A"}])
+    _write_json(arcgispro / "context" / "layers.json", [{"id": "a", "name": "Parcels"}])
+
+    context = load_context_files(arcgispro)
+    watcher = ContextWatcher(context)
+    assert context.get("layers") == [{"id": "a", "name": "Parcels"}]
+    assert watcher.poll() == []
+
+    _write_json(arcgispro / "context" / "layers.json", [{"id": "a", "name": "Parcels 2"}])
+    _write_json(arcgispro / "context" / "tables.json", [])
+    assert watcher.poll_and_invalidate() == ["layers", "tables"]
+    assert context.get("layers") == [{"id": "a", "name": "Parcels 2"}]
+    assert watcher.poll() == []
+
+
+def test_diff_records_by_stable_id():
+    old = keyed_records(
+        [
+            {"id": "a", "name": "Parcels"},
+            {"id": "b", "name": "Roads"},
+            {"name": "Untracked", "mapName": "Map A"},
+            {"name": "Untracked", "mapName": "Map A"},
+        ]
+    )
+    new = keyed_records(
+        [
+            {"id": "b", "name": "Roads", "isVisible": False},
+            {"id": "c", "name": "Zoning"},
+            {"id": "a", "name": "Parcels"},
+            {"name": "Untracked", "mapName": "Map A"},
+        ]
+    )
+    assert list(old) == ["id:a", "id:b", "name:Map A/Untracked", "name:Map A/Untracked#1"]
+
+    diff = diff_records(old, new)
+    assert diff.added == ["id:c"]
+    assert diff.removed == ["name:Map A/Untracked#1"]
+    assert diff.changed == ["id:b"]
+    assert not diff_records(new, new)